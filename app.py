@@ -1,213 +1,490 @@
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit, join_room, leave_room
-from poker_game import PokerGame
-from player import Player
+from typing import Optional
+from flask import Flask, Response, abort, render_template, request
+from flask_socketio import SocketIO
 from hand_evaluator import HandEvaluator
+from table_manager import TableManager, Table, DEFAULT_TABLE_ID, ROOM_PREFIX
+from hand_log import HandLogWriter
+from snapshot import SnapshotStore
+from table_engine import TableEngine
+from metrics import Metrics, SIZE_BUCKETS
+from cluster import Cluster, create_manager
+from bots import ChartBot
+from itertools import count
 import json
 import logging
+import os
+import re
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.environ.get('POKER_LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
+# Off unless POKER_METRICS is set; served on /metrics to local clients only
+metrics = Metrics(enabled=os.environ.get('POKER_METRICS', '') not in ('', '0'))
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+# Table ids name the table's snapshot files, so they stay short and plain
+TABLE_ID_PATTERN = re.compile(r'[A-Za-z0-9 _.-]{1,64}')
+# Largest bet a client may send: the hand log stores amounts as 32-bit unsigned
+MAX_AMOUNT = 2 ** 32 - 1
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
-# Game state
-game = None
-players = {}
-MAX_PLAYERS = 6
+# Workers of a multi-process deployment share a message queue and split the
+# tables between them; a single worker needs neither
+WORKERS = int(os.environ.get('POKER_WORKERS', 1))
+WORKER = int(os.environ.get('POKER_WORKER', 0))
+manager = create_manager(os.environ.get('POKER_MESSAGE_QUEUE', ''))
+cluster = Cluster(WORKER, WORKERS, manager)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet', client_manager=manager)
+
+# Append-only record of every hand played, for audits and replay
+hand_log = HandLogWriter(os.environ.get('POKER_HAND_LOG_DIR', 'hand_logs'),
+                         prefix='hands' if WORKERS == 1 else f'worker{WORKER}-hands')
+socketio.start_background_task(hand_log.flush_periodically, socketio.sleep)
+
+# Latest state of every table, so a restarted server resumes where it
+# stopped and other workers can take tables over; shared by all workers
+snapshots = SnapshotStore(os.environ.get('POKER_SNAPSHOT_DIR', 'snapshots'))
+
+# Every table hosted by this process
+tables = TableManager(hand_log=hand_log, snapshots=snapshots)
+tables.restore(owns=cluster.is_local)
+metrics.gauge('poker_active_tables', lambda: len(tables.tables))
+metrics.gauge('poker_seated_sockets', lambda: len(tables.sid_tables))
+
+# Plays every bot seat. Its decisions are table lookups, so bots cost a few
+# microseconds per action; the tables are built here rather than while a
+# table waits on its first bot.
+bot_policy = ChartBot()
+
+def emit_now(event: str, data, to):
+    """Emit to a socket, room or list of sockets, counting recipients and payload bytes when metrics are on"""
+    socketio.emit(event, data, to=to)
+    if metrics.enabled:
+        if isinstance(to, list):
+            recipients = len(to)
+        else:
+            recipients = sum(1 for _ in socketio.server.manager.get_participants('/', to))
+        metrics.inc('poker_emits_total', event=event)
+        metrics.inc('poker_emit_recipients_total', recipients, event=event)
+        metrics.observe('poker_emit_payload_bytes', len(json.dumps(data, default=str)), SIZE_BUCKETS, event=event)
+
+def send(event: str, data=None, to=None):
+    """
+    Send to a socket or a table's room. While the table's jobs are running
+    the message waits in its outbox, so each recipient gets everything from
+    the batch in one frame.
+    """
+    table_id = to[len(ROOM_PREFIX):] if to.startswith(ROOM_PREFIX) else tables.sid_tables.get(to)
+    outbox = engine.outbox(table_id) if table_id is not None else None
+    if outbox is None:
+        emit_now(event, data, to)
+    elif to.startswith(ROOM_PREFIX):
+        table = tables.get(table_id)
+        outbox.add(event, data, list(table.players) if table else [])
+    else:
+        outbox.add(event, data, [to])
+    if metrics.enabled:
+        metrics.inc('poker_messages_total', event=event)
+
+def send_snapshot(table: Table, sid: str):
+    """Full state for one socket, including its own hole cards"""
+    snapshot = table.sync.snapshot()
+    seat = table.seat_of(sid)
+    private = table.view.private_state(table.game, seat) if snapshot and seat is not None else None
+    table.view.mark_sent(sid, private)
+    send('game_state', dict(snapshot, private=private) if snapshot else None, to=sid)
+
+def broadcast_state(table: Table):
+    """
+    Send the table's new state: the shared public part once to the whole room
+    (as a patch whenever possible), then each player's own cards only to them
+    and only when they changed.
+    """
+    patch = table.sync.publish(table.view.public_state(table.game))
+    if patch is None:
+        for sid in table.players:
+            send_snapshot(table, sid)
+        return
+    if patch['changes']:
+        send('game_state_patch', patch, to=table.room)
+    if table.game:
+        for sid, private in table.view.private_updates(table.game, table.players):
+            send('private_state', private, to=sid)
+
+def notify_current_player(table: Table):
+    """Tell the player whose turn it is to act"""
+    game = table.game
+    if game and game.is_hand_in_progress and game.current_player_index is not None:
+        sid = table.sid_for(game.players[game.current_player_index].name)
+        if sid is not None:
+            send('your_turn', to=sid)
+
+def finish_batch(table: Table):
+    """Runs once after each batch of table jobs that changed the game"""
+    with metrics.timer('poker_broadcast_seconds'):
+        broadcast_state(table)
+    notify_current_player(table)
+    schedule_bot_turn(table)
+
+def schedule_bot_turn(table: Table):
+    """
+    When a bot is due to act, queue its action as a job of its own, so each
+    bot action gets its own broadcast and events from humans are not held up
+    """
+    game = table.game
+    if not game or not game.is_hand_in_progress or game.current_player_index is None:
+        return
+    seat, version = game.current_player_index, game.version
+    bot = table.bots.get(game.players[seat].name)
+    if bot is None:
+        return
+
+    def job() -> bool:
+        if table.game is not game or game.version != version:
+            return False  # the turn moved on meanwhile
+        with metrics.timer('poker_bot_decision_seconds'):
+            action, amount = bot.decide(game, seat)
+        if not apply_action(table, seat, action, amount):
+            logger.warning('Bot %s chose an invalid action: %s %s', game.players[seat].name, action, amount)
+            act_for_stalled_player(table, seat)
+        return True
+
+    engine.submit(table.table_id, job)
+
+def finish_hand(table: Table):
+    """Pay out every pot, announce the winners and end the hand"""
+    game = table.game
+    with metrics.timer('poker_pay_out_seconds'):
+        payouts = game.pay_out()
+    contested = any(strength is not None for _, _, strength in payouts)
+    if not contested:
+        amount, winners, _ = payouts[0]
+        send('game_message', f'{winners[0].name} wins ${amount} (everyone else folded)', to=table.room)
+    for i, (amount, winners, strength) in enumerate(payouts if contested else []):
+        winner_names = ', '.join(w.name for w in winners)
+        pot_name = 'the main pot' if i == 0 else f'side pot {i}'
+        winning_hand_name = HandEvaluator.get_hand_name(HandEvaluator.decode_strength(strength)[0])
+        send('game_message', f'{winner_names} win(s) {pot_name} (${amount}) with {winning_hand_name}', to=table.room)
+    game.end_hand()
+
+def apply_action(table: Table, player_index: int, action: str, amount: int) -> bool:
+    """Apply a player's action and move the hand on; False if it was rejected"""
+    game = table.game
+    with metrics.timer('poker_process_action_seconds'):
+        accepted = game.process_action(player_index, action, amount)
+    if not accepted:
+        return False
+    advance_hand(table)
+    return True
+
+def advance_hand(table: Table):
+    """Deal the next streets and pay out as far as the finished betting rounds allow"""
+    game = table.game
+    # Once fewer than two players can act, each street is complete as soon as
+    # it is dealt, so the board runs out to the showdown
+    while game.is_betting_round_complete():
+        logger.debug('Betting round %d is complete.', game.current_betting_round)
+        if len(game.get_active_players()) <= 1 or game.current_betting_round == 3:
+            logger.debug('Hand complete, paying out.')
+            finish_hand(table)
+            break
+
+        logger.debug('Betting round complete, dealing next community card(s).')
+        if len(game.community_cards) == 0:
+            game.deal_community_cards(3)
+            send('game_message', 'Dealing the Flop', to=table.room)
+        elif len(game.community_cards) == 3:
+            game.deal_community_cards(1)
+            send('game_message', 'Dealing the Turn', to=table.room)
+        elif len(game.community_cards) == 4:
+            game.deal_community_cards(1)
+            send('game_message', 'Dealing the River', to=table.room)
+
+def act_for_stalled_player(table: Table, player_index: int):
+    """Turn deadline passed: check if that is free, otherwise fold"""
+    game = table.game
+    action = 'check' if game.amount_to_call(player_index) == 0 else 'fold'
+    send('game_message', f'{game.players[player_index].name} ran out of time and {action}s', to=table.room)
+    apply_action(table, player_index, action, 0)
+
+# One mailbox per table: its events are handled in order on a background
+# task, so they never interleave and a busy table never blocks another.
+# Messages from each batch of events reach every socket as one frame.
+engine = TableEngine(
+    tables, on_batch=finish_batch, on_timeout=act_for_stalled_player,
+    turn_timeout=float(os.environ.get('POKER_TURN_TIMEOUT', 30)),
+    spawn=socketio.start_background_task,
+    create_queue=socketio.server.eio.create_queue,
+    queue_empty=socketio.server.eio.get_queue_empty_exception(),
+    emit=lambda event, data, sids: emit_now(event, data, sids[0] if len(sids) == 1 else sids))
+
+def submit(table_id: str, handler: str, job):
+    """
+    Queue a handler's job on its table, recording the handler's latency from
+    receiving the event to finishing the job when metrics are on
+    """
+    if not metrics.enabled:
+        engine.submit(table_id, job)
+        return
+    received = metrics.clock()
+
+    def timed_job() -> bool:
+        try:
+            return job()
+        finally:
+            metrics.observe('poker_handler_latency_seconds', metrics.clock() - received, handler=handler)
+
+    engine.submit(table_id, timed_job)
+
+# Table events run on the worker that owns the table. Each takes the table
+# id, the socket id and the event's data, and returns True when the table's
+# state should be broadcast.
+
+def join_table(table_id: str, sid: str, data) -> bool:
+    player_name = data['name']
+    try:
+        if tables.table_for(sid) is not None:
+            send('game_message', 'Already seated at a table', to=sid)
+            return False
+
+        table = tables.get(table_id)
+        # A restored table keeps its seats for their players to reclaim
+        reclaim = table is not None and table.is_unclaimed(player_name)
+        if table and table.is_full() and not reclaim:
+            send('game_message', 'Game is full', to=sid)
+            return False
+
+        if table and not reclaim and (player_name in table.sids or
+                                      table.game and table.game.seat_of(player_name) is not None):
+            send('game_message', 'Name already taken', to=sid)
+            return False
+
+        table = tables.join(sid, table_id, player_name)
+        cluster.locate(sid, table_id)
+        socketio.server.enter_room(sid, table.room, namespace='/')
+        send('game_message', f'{player_name} has joined the game', to=sid)
+
+        send('lobby_update', table.lobby(), to=table.room)
+        # Seat changes reshape the player list, so everyone gets a full snapshot
+        table.sync.publish(table.view.public_state(table.game))
+        for seated_sid in table.players:
+            send_snapshot(table, seated_sid)
+
+    except Exception as e:
+        logger.error('Error in join_game: %s', e)
+        send('game_message', 'An error occurred while joining the game', to=sid)
+    return False
+
+def leave_table(table_id: str, sid: str, data) -> bool:
+    table = tables.table_for(sid)
+    if table is None or table.table_id != table_id:
+        return False
+    had_game = table.game is not None
+    player_name = table.players[sid]
+    tables.leave(sid)
+    send('game_message', f'{player_name} has left the game', to=table.room)
+    if had_game and table.game is None:
+        send('game_message', 'Game reset due to insufficient players', to=table.room)
+    elif table.game is not None and table.game.is_hand_in_progress:
+        advance_hand(table)  # the player who left may have been the last one to act
+    send('lobby_update', table.lobby(), to=table.room)
+    return had_game and table.game is not None
+
+def sync_table(table_id: str, sid: str, data) -> bool:
+    table = tables.table_for(sid)
+    if table is not None:
+        send_snapshot(table, sid)
+    return False
+
+def start_table(table_id: str, sid: str, data) -> bool:
+    table = tables.table_for(sid)
+    game = table.game if table else None
+    if not game or table.players.get(sid) != game.players[0].name:
+        return False
+    if game.is_hand_in_progress:
+        return False
+    if sum(1 for player in game.players if player.chips > 0) < 2:
+        send('game_message', 'At least two players with chips are needed', to=sid)
+        return False
+    logger.debug('Starting new hand at table %s', table.table_id)
+    game.start_hand()
+    send('game_started', to=table.room)
+    return True
 
-def get_game_state():
-    """Convert game state to JSON-serializable format"""
-    global game
-    if not game:
+def add_bot_to_table(table_id: str, sid: str, data) -> bool:
+    table = tables.table_for(sid)
+    game = table.game if table else None
+    if not game or table.players.get(sid) != game.players[0].name or game.is_hand_in_progress:
+        return False
+    if table.is_full():
+        send('game_message', 'Game is full', to=sid)
+        return False
+    name = next(f'Bot {n}' for n in count(1) if f'Bot {n}' not in table.sids and game.seat_of(f'Bot {n}') is None)
+    table.seat_bot(name, bot_policy)
+    send('game_message', f'{name} has joined the game', to=table.room)
+    send('lobby_update', table.lobby(), to=table.room)
+    table.sync.publish(table.view.public_state(game))
+    for seated_sid in table.players:
+        send_snapshot(table, seated_sid)
+    return False
+
+def _chip_amount(value) -> Optional[int]:
+    """A client's bet amount as whole chips, or None when it is not a valid one"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= MAX_AMOUNT:
         return None
+    return value
+
+def act_at_table(table_id: str, sid: str, data) -> bool:
+    table = tables.table_for(sid)
+    player_index = table.seat_of(sid) if table else None
+    if player_index is None:
+        return False
+    amount = _chip_amount(data['amount']) if data['action'] == 'raise' else 0
+    if amount is None:
+        send('game_message', 'Invalid action. Bets must be a whole number of chips.', to=sid)
+        return False
+    if apply_action(table, player_index, data['action'], amount):
+        return True
+    if data['action'] == 'raise' and not table.game.can_raise(player_index):
+        send('game_message', 'Invalid action. The betting is not open to a raise from you.', to=sid)
+    else:
+        send('game_message', f'Invalid action. Minimum raise is ${table.game.min_raise(player_index)} '
+                             f'unless you go all in.', to=sid)
+    return False
+
+TABLE_EVENTS = {
+    'join_game': join_table,
+    'disconnect': leave_table,
+    'sync_state': sync_table,
+    'start_game': start_table,
+    'add_bot': add_bot_to_table,
+    'player_action': act_at_table,
+}
+
+def run_table_event(table_id: str, handler: str, sid: str, data):
+    """Queue an event routed to this worker on its table"""
+
+    def job() -> bool:
+        if not cluster.is_local(table_id):
+            cluster.route(table_id, handler, sid, data)  # handed off while queued
+            return False
+        return TABLE_EVENTS[handler](table_id, sid, data)
+
+    submit(table_id, handler, job)
 
-    return {
-        'pot': game.pot,
-        'community_cards': [
-            {'suit': card.suit.name, 'value': card.value}
-            for card in game.community_cards
-        ],
-        'players': [
-            {
-                'name': player.name,
-                'chips': player.chips,
-                'bet': player.bet,
-                'hand': [
-                    {'suit': card.suit.name, 'value': card.value}
-                    for card in player.hand
-                ] if not player.folded else [],
-                'is_current': i == game.current_player_index
-            }
-            for i, player in enumerate(game.players)
-        ],
-        'dealer_position': game.dealer_position,
-        'current_player_index': game.current_player_index,
-        'minimum_bet': game.minimum_bet
-    }
+def adopt_table(table_id: str, players, bots):
+    """Take over a table another worker handed off, resuming from its snapshot"""
+
+    def job() -> bool:
+        table = tables.adopt(table_id, players, {name: bot_policy for name in bots})
+        logger.info('Adopted table %s with %d players', table_id, len(players))
+        return table.game is not None
+
+    engine.submit(table_id, job)
+
+def hand_off_table(table_id: str, worker: int):
+    """Save a table this worker owns and give it to another worker"""
+
+    def job() -> bool:
+        table = tables.get(table_id)
+        if not cluster.is_local(table_id) or table is None:
+            return False
+        bots = list(table.bots)
+        cluster.hand_off(table_id, worker, tables.release(table_id), bots)
+        logger.info('Handed table %s off to worker %d', table_id, worker)
+        return False
+
+    engine.submit(table_id, job)
+
+cluster.on_event = run_table_event
+cluster.on_adopt = adopt_table
+cluster.start()
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/metrics')
+def metrics_endpoint():
+    if not metrics.enabled or request.remote_addr not in LOCAL_ADDRESSES:
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/tables/<table_id>/handoff/<int:worker>', methods=['POST'])
+def handoff_endpoint(table_id, worker):
+    """Move a table to another worker, e.g. before this one shuts down; local clients only"""
+    if request.remote_addr not in LOCAL_ADDRESSES or not 0 <= worker < cluster.workers:
+        abort(404)
+    if not cluster.is_local(table_id):
+        return {'owner': cluster.owner(table_id)}, 409
+    hand_off_table(table_id, worker)
+    return {'owner': worker}, 202
+
+# Socket handlers run on the worker holding the client's connection and
+# route each event to the worker that owns the client's table
+
 @socketio.on('connect')
 def handle_connect():
-    logger.debug(f'Client connected: {request.sid}')
+    logger.debug('Client connected: %s', request.sid)
+    metrics.adjust('poker_connected_sockets', 1)
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    global game, players
-    logger.debug(f'Client disconnected: {request.sid}')
-    if request.sid in players:
-        player_name = players[request.sid]
-        del players[request.sid]
-        emit('game_message', f'{player_name} has left the game', broadcast=True)
-
-        # If game exists, remove the player
-        if game:
-            game.players = [p for p in game.players if p.name != player_name]
-            if len(game.players) < 2:
-                game = None
-                emit('game_message', 'Game reset due to insufficient players', broadcast=True)
-            else:
-                emit('game_state', get_game_state(), broadcast=True)
-
-        lobby_players = [{'name': name, 'ready': False} for name in players.values()]
-        emit('lobby_update', lobby_players, broadcast=True)
+    logger.debug('Client disconnected: %s', request.sid)
+    metrics.adjust('poker_connected_sockets', -1)
+    sid = request.sid
+    table_id = cluster.locations.pop(sid, None)
+    if table_id is not None:
+        cluster.route(table_id, 'disconnect', sid)
 
 @socketio.on('join_game')
 def handle_join_game(data):
-    global game, players
-    logger.debug(f'Join game request from {request.sid}: {data}')
+    logger.debug('Join game request from %s: %s', request.sid, data)
+    sid = request.sid
+    if sid in cluster.locations:
+        send('game_message', 'Already seated at a table', to=sid)
+        return
     try:
-        if len(players) >= MAX_PLAYERS:
-            emit('game_message', 'Game is full')
-            return
-
-        player_name = data['name']
-        if player_name in players.values():
-            emit('game_message', 'Name already taken')
-            return
-
-        if game and any(p.name == player_name for p in game.players):
-            emit('game_message', 'Name already taken')
-            return
-
-        players[request.sid] = player_name
-
-        if not game:
-            game = PokerGame([Player(player_name)])
-            emit('game_message', f'{player_name} has joined the game')
-        else:
-            game.players.append(Player(player_name))
-            emit('game_message', f'{player_name} has joined the game')
-
-        lobby_players = [{'name': name, 'ready': game is not None and game.is_hand_in_progress} for name in players.values()]
-        emit('lobby_update', lobby_players, broadcast=True)
-        emit('game_state', get_game_state(), broadcast=True)
-
+        table_id = str(data.get('table') or DEFAULT_TABLE_ID)
+        player_name = str(data['name'])
     except Exception as e:
-        logger.error(f'Error in join_game: {str(e)}')
-        emit('game_message', 'An error occurred while joining the game')
+        logger.error('Error in join_game: %s', e)
+        send('game_message', 'An error occurred while joining the game', to=sid)
+        return
+    if not TABLE_ID_PATTERN.fullmatch(table_id):
+        send('game_message', 'Table names are 1-64 letters, digits, spaces, dots, dashes or underscores', to=sid)
+        return
+    cluster.route(table_id, 'join_game', sid, {'name': player_name})
+
+@socketio.on('sync_state')
+def handle_sync_state():
+    """Full snapshot for a client that missed a patch or just reconnected"""
+    table_id = cluster.locations.get(request.sid)
+    if table_id is not None:
+        cluster.route(table_id, 'sync_state', request.sid)
 
 @socketio.on('start_game')
 def handle_start_game():
-    global game
-    if not game or request.sid not in players:
-        return
+    table_id = cluster.locations.get(request.sid)
+    if table_id is not None:
+        cluster.route(table_id, 'start_game', request.sid)
 
-    player_name = players[request.sid]
-    if game.players[0].name != player_name:
-        return
-
-    if len(game.players) >= 2 and not game.is_hand_in_progress:
-        logger.debug('Starting new hand with two players')
-        game.start_hand()
-        emit('game_started', broadcast=True)
-        emit('game_state', get_game_state(), broadcast=True)
-        first_player = game.players[game.current_player_index]
-        for sid, name in players.items():
-            if name == first_player.name:
-                emit('your_turn', room=sid)
-                break
+@socketio.on('add_bot')
+def handle_add_bot():
+    table_id = cluster.locations.get(request.sid)
+    if table_id is not None:
+        cluster.route(table_id, 'add_bot', request.sid)
 
 @socketio.on('player_action')
 def handle_player_action(data):
-    global game
-    if not game or request.sid not in players:
-        return
-
-    player_name = players[request.sid]
-    player_index = next(i for i, p in enumerate(game.players) if p.name == player_name)
-    action = data['action']
-    amount = data.get('amount', 0)
-
-    if game.process_action(player_index, action, amount):
-        if game.is_betting_round_complete():
-            logger.debug(f'Betting round {game.current_betting_round} is complete.')
-            active_players_in_hand = [p for p in game.players if not p.folded]
-
-            if len(active_players_in_hand) <= 1:
-                winner = active_players_in_hand[0]
-                winner.chips += game.pot
-                emit('game_message', f'{winner.name} wins ${game.pot} (everyone else folded)', broadcast=True)
-                game.end_hand()
-                emit('game_state', get_game_state(), broadcast=True)
-
-            elif game.current_betting_round == 3:
-                logger.debug('River betting round complete, evaluating hands.')
-                winners = game.get_winners()
-                if winners:
-                    pot_per_winner = game.pot // len(winners)
-                    winner_names = ', '.join([w.name for w in winners])
-                    winning_hand_rank, winning_hand_kickers = HandEvaluator.evaluate_hand(winners[0].hand, game.community_cards)
-                    winning_hand_name = HandEvaluator.get_hand_name(winning_hand_rank)
-                    emit('game_message', f'{winner_names} win(s) ${pot_per_winner} each with {winning_hand_name}', broadcast=True)
-                    for winner in winners:
-                        winner.chips += pot_per_winner
-                else:
-                    emit('game_message', 'No active players to determine a winner.', broadcast=True)
-                game.end_hand()
-                emit('game_state', get_game_state(), broadcast=True)
-
-            else:
-                logger.debug('Betting round complete, dealing next community card(s).')
-                if len(game.community_cards) == 0:
-                    game.deal_community_cards(3)
-                    emit('game_message', 'Dealing the Flop', broadcast=True)
-                elif len(game.community_cards) == 3:
-                    game.deal_community_cards(1)
-                    emit('game_message', 'Dealing the Turn', broadcast=True)
-                elif len(game.community_cards) == 4:
-                    game.deal_community_cards(1)
-                    emit('game_message', 'Dealing the River', broadcast=True)
-
-                emit('game_state', get_game_state(), broadcast=True)
-                if game.current_player_index is not None:
-                    next_player = game.players[game.current_player_index]
-                    for sid, name in players.items():
-                        if name == next_player.name:
-                            emit('your_turn', room=sid)
-                            break
-
-        else:
-            logger.debug('Betting round not complete, moving to next player.')
-            emit('game_state', get_game_state(), broadcast=True)
-            if game.current_player_index is not None:
-                next_player = game.players[game.current_player_index]
-                for sid, name in players.items():
-                    if name == next_player.name:
-                        emit('your_turn', room=sid)
-                        break
-    else:
-        highest_bet = max(p.bet for p in game.players) if game.players else 0
-        min_raise = highest_bet + (highest_bet - game.players[player_index].bet)
-        if game.current_betting_round == 0 and highest_bet == game.big_blind:
-            min_raise = game.big_blind
-        emit('game_message', f'Invalid action. Minimum raise is ${min_raise}.')
+    table_id = cluster.locations.get(request.sid)
+    if table_id is not None:
+        cluster.route(table_id, 'player_action', request.sid,
+                      {'action': data['action'], 'amount': data.get('amount', 0)})
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True)
\ No newline at end of file
+    socketio.run(app, port=int(os.environ.get('POKER_PORT', 5000)), debug=True)
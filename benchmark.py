@@ -0,0 +1,195 @@
+"""
+Benchmarks for the hot paths: hand evaluation, deck handling, hand
+lifecycles and game state serialization.
+
+    python benchmark.py                       # run and print JSON results
+    python benchmark.py --save FILE           # also write the results to FILE
+    python benchmark.py --compare [FILE]      # fail if slower than FILE allows
+
+Each benchmark reports the best time per operation over several repeats,
+which is the figure least disturbed by other load on the machine.
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from card import Card, Deck
+from hand_evaluator import HandEvaluator
+from player import Player
+from poker_game import PokerGame
+from bots import CallingStation
+from simulator import HandSimulator
+from state_view import StateView, public_state
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 1.25
+
+# One seven-card hand per category, as hole cards + board
+CATEGORY_HANDS = {
+    'royal_flush': 'Ah Kh Qh Jh Th 2c 3d',
+    'straight_flush': '9s 8s 7s 6s 5s Ad Kc',
+    'four_of_a_kind': 'Qc Qd Qh Qs 7d 3c 2h',
+    'full_house': 'Jc Jd Jh 4s 4d 9c 2h',
+    'flush': 'Ad Jd 8d 5d 2d Kc 3s',
+    'straight': '9c Td Jh Qs Kd 2c 2h',
+    'three_of_a_kind': '7c 7d 7h Ks 9d 4c 2h',
+    'two_pair': 'Tc Td 6h 6s Ad 4c 2h',
+    'one_pair': '5c 5d Ah Ks 9d 7c 2h',
+    'high_card': 'Ac Qd Th 8s 6d 4c 2h',
+}
+
+
+def _cards(text: str) -> List[Card]:
+    return [Card.from_str(token) for token in text.split()]
+
+
+def _time(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Best seconds per call over `repeat` runs of `number` calls"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+class Results(dict):
+    """Seconds per op by benchmark name; benchmarks that `only` filters out are never timed"""
+
+    def __init__(self, only: Optional[str] = None):
+        super().__init__()
+        self.only = only
+
+    def time(self, name: str, func: Callable[[], object], number: int, repeat: int = 5, ops: int = 1):
+        """Record _time(func, number, repeat) / ops under `name`, if it is wanted"""
+        if self.only is None or self.only in name:
+            self[name] = _time(func, number, repeat) / ops
+
+
+def bench_evaluator(results: Results):
+    for name, text in CATEGORY_HANDS.items():
+        cards = _cards(text)
+        hole, board = cards[:2], cards[2:]
+        results.time(f'evaluate_hand.{name}', lambda: HandEvaluator.evaluate_hand(hole, board), 20000)
+        results.time(f'hand_strength.{name}', lambda: HandEvaluator.hand_strength(cards), 50000)
+        # Every call after the first is a cache hit
+        results.time(f'evaluate_hand_cached.{name}', lambda: HandEvaluator.evaluate_hand_cached(hole, board), 20000)
+
+    import numpy as np
+    rng = np.random.default_rng(0)
+    rows = np.argsort(rng.random((100000, 52)), axis=1)[:, :7]
+    hole, board = rows[:, :2], rows[:, 2:]
+    results.time('evaluate_batch.per_hand', lambda: HandEvaluator.evaluate_batch(hole, board), 1, 3, len(rows))
+
+
+def bench_deck(results: Results):
+    deck = Deck()
+    results.time('deck.reset', deck.reset, 20000)
+
+    def reset_and_deal():
+        deck.reset()
+        for _ in range(6):
+            deck.deal(2)
+        deck.deal(3)
+        deck.deal(1)
+        deck.deal(1)
+    results.time('deck.reset_and_deal_6_players', reset_and_deal, 10000)
+
+    deck = Deck(random.Random(0), partial=True)
+    results.time('deck.partial_reset_and_deal_6_players', reset_and_deal, 10000)
+
+
+def bench_hand_lifecycle(results: Results):
+    for seats in (2, 6):
+        simulator = HandSimulator([CallingStation() for _ in range(seats)], seed=0)
+        results.time(f'hand_lifecycle.{seats}_players', simulator.play_hand, 500)
+
+
+def bench_game_state(results: Results):
+    for seats in (2, 6):
+        game = PokerGame([Player(f'Player {i + 1}') for i in range(seats)])
+        game.start_hand()
+        game.deal_community_cards(3)
+        view = StateView()
+        results.time(f'public_state.{seats}_players', lambda: public_state(game), 20000)
+        results.time(f'public_state_json.{seats}_players', lambda: json.dumps(public_state(game)), 10000)
+        # One state version seen by every seat, as after a single action
+        results.time(f'state_view_all_seats.{seats}_players',
+            lambda: [view.view_for(game, seat) for seat in range(seats)], 20000)
+
+
+def bench_ranges(results: Results):
+    from hand_range import HandRange, range_equity
+    hero, villain = HandRange.parse('QQ+, AKs, AQo 50%'), HandRange.parse('22+, A2s+, KTo+, 76s-54s')
+    flop, river = _cards('2h 7c Jh'), _cards('2h 7c Jh 3d 9s')
+    results.time('range_equity.flop_5000_samples', lambda: range_equity(hero, villain, flop, samples=5000, seed=0), 20)
+    results.time('range_equity.river_exact', lambda: range_equity(hero, villain, river), 50)
+
+
+def bench_bots(results: Results):
+    from bots import ChartBot
+    bot = ChartBot()
+    game = PokerGame([Player(f'Player {i + 1}') for i in range(6)])
+    game.start_hand()
+    seat = game.current_player_index
+    results.time('chart_bot.preflop_decision', lambda: bot.decide(game, seat), 20000)
+    game.deal_community_cards(3)
+    seat = game.current_player_index
+    results.time('chart_bot.flop_decision', lambda: bot.decide(game, seat), 20000)
+
+
+BENCHMARKS = [bench_evaluator, bench_deck, bench_hand_lifecycle, bench_game_state, bench_ranges, bench_bots]
+
+
+def run_benchmarks(only: Optional[str] = None) -> Dict[str, float]:
+    """Run every benchmark (or those whose name contains `only`) and return seconds per op"""
+    random.seed(0)
+    results = Results(only)
+    for bench in BENCHMARKS:
+        bench(results)
+    return dict(results)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Names of benchmarks more than `tolerance` times slower than the baseline"""
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        if name in baseline and seconds > baseline[name] * tolerance:
+            regressions.append(f"{name}: {seconds * 1e6:.2f}us vs baseline {baseline[name] * 1e6:.2f}us "
+                               f"({seconds / baseline[name]:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--save', metavar='FILE', help='write results to FILE')
+    parser.add_argument('--compare', metavar='FILE', nargs='?', const=DEFAULT_BASELINE,
+                        help=f'compare against a saved baseline (default {DEFAULT_BASELINE})')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown factor before a benchmark counts as a regression')
+    parser.add_argument('--only', help='only keep benchmarks whose name contains this text')
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'unit': 'seconds_per_op',
+        'results': run_benchmarks(args.only),
+    }
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+from typing import List, Optional, Sequence, Tuple
+from abc import ABC, abstractmethod
+import random
+import numpy as np
+from card import Card
+from hand_evaluator import HandEvaluator
+from poker_game import PokerGame
+from preflop import CLASSES, hand_class
+
+
+class Bot(ABC):
+    """
+    Base class for automated players.
+    decide() is called when it is the bot's turn and returns an
+    (action, amount) pair accepted by PokerGame.process_action.
+    """
+
+    @abstractmethod
+    def decide(self, game: PokerGame, player_index: int) -> Tuple[str, int]:
+        """The (action, amount) to play for the player in `player_index`"""
+
+
+class CallingStation(Bot):
+    """Never folds or raises: checks when possible, otherwise calls"""
+
+    def decide(self, game: PokerGame, player_index: int) -> Tuple[str, int]:
+        if game.amount_to_call(player_index) == 0:
+            return "check", 0
+        return "call", 0
+
+
+class RandomBot(Bot):
+    """Picks uniformly among folding, calling and min-raising"""
+
+    def __init__(self, fold: float = 0.2, raise_: float = 0.2, seed: Optional[int] = None):
+        self.fold = fold
+        self.raise_ = raise_
+        self.rng = random.Random(seed)
+
+    def decide(self, game: PokerGame, player_index: int) -> Tuple[str, int]:
+        player = game.players[player_index]
+        to_call = game.amount_to_call(player_index)
+        roll = self.rng.random()
+        if roll < self.raise_ and game.can_raise(player_index):
+            # A short stack goes all in for less
+            return "raise", min(game.min_raise(player_index), player.chips + player.bet)
+        if roll < self.raise_ + self.fold and to_call > 0:
+            return "fold", 0
+        return ("check", 0) if to_call == 0 else ("call", 0)
+
+
+# Made-hand and draw buckets for postflop decisions, weakest first
+NOTHING, DRAW, WEAK_PAIR, TOP_PAIR, STRONG, NUTTED = range(6)
+
+# Rough heads-up equity of each bucket. A bot calls when the price
+# (to_call / (pot + to_call)) is below it and bets or raises above
+# BET_EQUITY and RAISE_EQUITY; each extra opponent scales it by MULTIWAY.
+BUCKET_EQUITY = (0.1, 0.3, 0.4, 0.6, 0.8, 0.92)
+BET_EQUITY = 0.55
+RAISE_EQUITY = 0.75
+MULTIWAY = 0.85
+
+# Preflop: share of starting hands (by combos) opened with, by the number of
+# opponents still in the hand, then the hands that reraise and that call a raise
+OPEN_SHARE = (1.0, 0.8, 0.5, 0.35, 0.28, 0.22, 0.18, 0.15, 0.12, 0.1)
+RERAISE_PERCENTILE = 0.94
+CALL_PERCENTILE = 0.7
+CHEAP_CALL_PERCENTILE = 0.45  # facing a raise of at most CHEAP_PRICE
+CHEAP_PRICE = 0.2
+
+# Monte Carlo runouts per hand class when building the preflop chart
+CHART_SAMPLES = 4000
+_CHART: List[np.ndarray] = []
+
+
+def preflop_chart() -> np.ndarray:
+    """
+    Percentile (0-1, by combos) of each of the 169 starting-hand classes,
+    ranked by all-in equity against one random hand. Built once per process
+    from HandEvaluator.evaluate_batch with a fixed seed, in about a second.
+    """
+    if not _CHART:
+        rng = np.random.default_rng(0)
+        holes = np.empty((CLASSES, 2), dtype=np.intp)
+        combos = np.empty(CLASSES)
+        for index in range(CLASSES):
+            row, col = divmod(index, 13)
+            high, low = max(row, col), min(row, col)
+            suited = row > col
+            holes[index] = high * 4, low * 4 + (0 if suited else 1)
+            combos[index] = 6 if high == low else 4 if suited else 12
+        # Villain cards and board: the 7 smallest keys among the cards left.
+        # Every class shares the same keys, so their estimates err alike and
+        # the ranking is steadier than the equities themselves.
+        shared_keys = rng.random((CHART_SAMPLES, 52), dtype=np.float32)
+        equity = np.empty(CLASSES)
+        for index in range(CLASSES):
+            hero = np.broadcast_to(holes[index], (CHART_SAMPLES, 2))
+            keys = shared_keys.copy()
+            keys[:, holes[index]] = 2.0
+            drawn = np.argpartition(keys, 6, axis=1)[:, :7]
+            hero_strength = HandEvaluator.evaluate_batch(hero, drawn[:, :5])
+            villain_strength = HandEvaluator.evaluate_batch(drawn[:, 5:], drawn[:, :5])
+            equity[index] = ((hero_strength > villain_strength).mean() +
+                             0.5 * (hero_strength == villain_strength).mean())
+
+        # Percentile: combos in weaker classes plus half of the class's own
+        order = np.argsort(equity, kind='stable')
+        below = np.cumsum(combos[order]) - combos[order] / 2
+        chart = np.empty(CLASSES)
+        chart[order] = below / combos.sum()
+        _CHART.append(chart)
+    return _CHART[0]
+
+
+def _value_mask(values: List[int]) -> int:
+    """Bit per value present, with an ace also at 1 where it plays low (as in the wheel)"""
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    if mask & (1 << 14):
+        mask |= 1 << 1
+    return mask
+
+
+def _has_draw(values: List[int], suits: List[int], hole: List[int]) -> bool:
+    """Four to a flush or to a straight that uses a hole card"""
+    for suit in set(suits[:2]):
+        if suits.count(suit) == 4:
+            return True
+    present, held = _value_mask(values), _value_mask(hole)
+    for low in range(1, 11):
+        window = (present >> low) & 0b11111
+        if bin(window).count('1') == 4 and (held >> low) & 0b11111:
+            return True
+    return False
+
+
+def postflop_bucket(hole: Sequence[Card], board: Sequence[Card]) -> int:
+    """Bucket of a hand on a flop, turn or river board, counting only what the hole cards add"""
+    rank, _ = HandEvaluator.evaluate_hand_cached(list(hole), list(board))
+    hole_values = [int(card) // 4 + 2 for card in hole]
+    board_values = [int(card) // 4 + 2 for card in board]
+    if rank >= HandEvaluator.STRAIGHT and (len(board) < 5 or HandEvaluator.evaluate_strength(
+            list(hole), list(board)) > HandEvaluator.hand_strength(list(board))):
+        return NUTTED
+
+    pocket = hole_values[0] == hole_values[1]
+    hits = [value for value in hole_values if value in board_values]
+    top = max(board_values)
+    if pocket and hole_values[0] in board_values:
+        return STRONG  # a set
+    if len(set(hits)) == 2 or any(board_values.count(value) >= 2 for value in hits):
+        return STRONG  # two pair or trips with a hole card
+    if (pocket and hole_values[0] > top) or top in hits:
+        return TOP_PAIR
+    if hits or pocket:
+        return WEAK_PAIR
+    if len(board) < 5 and _has_draw(hole_values + board_values,
+                                    [int(card) & 3 for card in list(hole) + list(board)], hole_values):
+        return DRAW
+    return NOTHING
+
+
+class ChartBot(Bot):
+    """
+    Baseline bot that decides from lookup tables only: the preflop chart
+    and thresholds on its postflop bucket against the price of calling.
+    A decision costs a few microseconds, so one process can run many.
+    """
+
+    def __init__(self, bet_fraction: float = 0.6):
+        self.bet_fraction = bet_fraction
+        self.chart = preflop_chart()
+
+    def decide(self, game: PokerGame, player_index: int) -> Tuple[str, int]:
+        player = game.players[player_index]
+        to_call = game.amount_to_call(player_index)
+        price = to_call / (game.pot + to_call) if to_call else 0.0
+        opponents = sum(1 for p in game.players if not p.folded and p is not player)
+
+        if not game.community_cards:
+            percentile = self.chart[hand_class(*player.hand)]
+            if game.highest_bet_in_round <= game.big_blind:
+                if percentile >= 1 - OPEN_SHARE[min(opponents, len(OPEN_SHARE) - 1)]:
+                    return self._raise(game, player_index, 3 * game.big_blind)
+            elif percentile >= RERAISE_PERCENTILE:
+                return self._raise(game, player_index, 3 * game.highest_bet_in_round)
+            elif to_call and (percentile >= CALL_PERCENTILE or
+                              (price <= CHEAP_PRICE and percentile >= CHEAP_CALL_PERCENTILE)):
+                return "call", 0
+        else:
+            equity = BUCKET_EQUITY[postflop_bucket(player.hand, game.community_cards)]
+            equity *= MULTIWAY ** max(opponents - 1, 0)
+            if equity >= (RAISE_EQUITY if to_call else BET_EQUITY):
+                size = game.highest_bet_in_round + int(self.bet_fraction * (game.pot + to_call))
+                return self._raise(game, player_index, size)
+            if to_call and price <= equity:
+                return "call", 0
+        return ("check", 0) if to_call == 0 else ("fold", 0)
+
+    @staticmethod
+    def _raise(game: PokerGame, player_index: int, amount: int) -> Tuple[str, int]:
+        """Raise to `amount`, at least the minimum and at most all in; check or call when raising is closed"""
+        player = game.players[player_index]
+        if not game.can_raise(player_index):
+            return ("check", 0) if game.amount_to_call(player_index) == 0 else ("call", 0)
+        return "raise", min(max(amount, game.min_raise(player_index)), player.chips + player.bet)
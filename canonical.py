@@ -0,0 +1,77 @@
+"""
+Suit-isomorphic canonical forms of card groups.
+
+Relabelling the four suits never changes what a hand is worth, so hands that
+differ only by such a relabelling can share cached results. Each suit is
+described by its signature: the 13-bit mask of values it holds in every
+group (e.g. hole cards, board). Sorting the four signatures gives a key that
+is equal for two sets of groups exactly when one is a suit relabelling of
+the other; suits with equal signatures are interchangeable, so any order
+among them gives the same key.
+"""
+from typing import List, Sequence, Tuple
+from itertools import permutations
+from card import Card, CARDS
+
+# Every relabelling of the four suits
+SUIT_PERMUTATIONS: List[Tuple[int, ...]] = list(permutations(range(4)))
+
+Signature = Tuple[int, ...]
+CanonicalKey = Tuple[Signature, Signature, Signature, Signature]
+
+
+def permute_suits(card: int, permutation: Sequence[int]) -> int:
+    """Card id with its suit relabelled by `permutation` (old suit -> new suit)"""
+    return (card & ~3) | permutation[card & 3]
+
+
+def suit_signatures(*groups: Sequence[int]) -> List[Signature]:
+    """Per suit, the value mask it holds in each group"""
+    masks = [[0] * len(groups) for _ in range(4)]
+    for g, group in enumerate(groups):
+        for card in group:
+            masks[card & 3][g] |= 1 << (card >> 2)
+    return [tuple(suit) for suit in masks]
+
+
+def canonical_key(*groups: Sequence[int]) -> CanonicalKey:
+    """Key shared by exactly the suit relabellings of these card groups"""
+    return tuple(sorted(suit_signatures(*groups), reverse=True))
+
+
+# Value bit of each card shifted into a 16-bit lane for its suit; summing
+# these over a hand gives all four suit masks in one int
+_SUIT_LANE_BIT = [1 << ((card >> 2) + 16 * (card & 3)) for card in range(52)]
+
+
+def canonical_hand_key(cards: Sequence[int]) -> Tuple[int, int, int, int]:
+    """
+    canonical_key for a single group, as the four suit masks in descending
+    order. Cheap enough to sit in front of hand evaluation.
+    """
+    lanes = 0
+    for card in cards:
+        lanes += _SUIT_LANE_BIT[card]
+    masks = [lanes & 0xFFFF, lanes >> 16 & 0xFFFF, lanes >> 32 & 0xFFFF, lanes >> 48]
+    masks.sort(reverse=True)
+    return tuple(masks)
+
+
+def canonical_permutation(*groups: Sequence[int]) -> List[int]:
+    """Suit relabelling (old suit -> new suit) that maps the groups to their canonical form"""
+    signatures = suit_signatures(*groups)
+    order = sorted(range(4), key=signatures.__getitem__, reverse=True)
+    permutation = [0] * 4
+    for new_suit, old_suit in enumerate(order):
+        permutation[old_suit] = new_suit
+    return permutation
+
+
+def canonicalize(*groups: Sequence[int]) -> List[List[Card]]:
+    """
+    The canonical representative of the groups: every group relabelled by
+    canonical_permutation, so isomorphic inputs come out identical.
+    """
+    permutation = canonical_permutation(*groups)
+    return [sorted((CARDS[permute_suits(card, permutation)] for card in group), reverse=True)
+            for group in groups]
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List, Optional
 import random
 
 class Suit(Enum):
@@ -7,43 +8,134 @@ class Suit(Enum):
     CLUBS = "♣"
     SPADES = "♠"
 
-class Card:
-    def __init__(self, suit: Suit, value: int):
-        self.suit = suit
-        self.value = value
-        
+SUITS = list(Suit)
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+FACE_NAMES = {11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+VALUE_NAMES = {10: 'T', 11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+SUIT_LETTERS = {Suit.HEARTS: 'h', Suit.DIAMONDS: 'd', Suit.CLUBS: 'c', Suit.SPADES: 's'}
+
+class Card(int):
+    """
+    A playing card packed into an int in the range 0-51.
+    The id is (value - 2) * 4 + suit index, so value is id >> 2 and the suit
+    index is id & 3. There is exactly one instance per card: constructing a
+    Card returns the shared singleton, so dealing never allocates.
+    """
+    __slots__ = ()
+
+    def __new__(cls, suit: Suit, value: int):
+        return CARDS[(value - 2) * 4 + SUIT_INDEX[suit]]
+
+    @staticmethod
+    def from_id(card_id: int) -> 'Card':
+        """Return the card with the given packed id"""
+        return CARDS[card_id]
+
+    @staticmethod
+    def from_str(text: str) -> 'Card':
+        """Parse a card written as value and suit letter, e.g. 'Ah' or 'Td'"""
+        value_char, suit_char = text[0].upper(), text[1].lower()
+        value = next((v for v, name in VALUE_NAMES.items() if name == value_char), None)
+        if value is None:
+            value = int(value_char) if value_char.isdigit() and value_char not in '01' else None
+        suit = next((s for s, letter in SUIT_LETTERS.items() if letter == suit_char), None)
+        if value is None or suit is None or len(text) != 2:
+            raise ValueError(f"Invalid card: {text!r}")
+        return Card(suit, value)
+
+    @property
+    def suit(self) -> Suit:
+        return SUITS[self & 3]
+
+    @property
+    def value(self) -> int:
+        return (self >> 2) + 2
+
+    def to_str(self) -> str:
+        """Short ASCII form, e.g. 'Ah', accepted by from_str"""
+        return _SHORT_NAMES[self]
+
+    def __getnewargs__(self):
+        return self.suit, self.value
+
     def __str__(self):
-        value_str = {
-            11: 'J',
-            12: 'Q',
-            13: 'K',
-            14: 'A'
-        }.get(self.value, str(self.value))
-        return f"{value_str}{self.suit.value}"
-    
+        return _NAMES[self]
+
     def __repr__(self):
         return self.__str__()
 
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+CARDS = tuple(int.__new__(Card, i) for i in range(52))
+_NAMES = tuple(
+    f"{FACE_NAMES.get(card.value, str(card.value))}{card.suit.value}"
+    for card in CARDS
+)
+_SHORT_NAMES = tuple(
+    f"{VALUE_NAMES.get(card.value, str(card.value))}{SUIT_LETTERS[card.suit]}"
+    for card in CARDS
+)
+
 class Deck:
-    def __init__(self):
-        self.cards = []
+    """
+    A deck dealt from the end of `cards`.
+    `rng` is any random.Random-like source: random.Random(seed) for
+    reproducible simulations, secrets.SystemRandom() for live tables, or by
+    default the module-level generator. With `partial` set, reset only
+    refills the deck and each card is drawn at random as it is dealt, so a
+    hand pays for the cards it uses instead of a full shuffle.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, partial: bool = False):
+        self.rng = rng if rng is not None else random
+        self.partial = partial
+        self.cards: List[Card] = []
+        self._unshuffled = False  # order still undecided; cards are drawn at random on deal
         self.reset()
-    
+
     def reset(self):
-        """Reset the deck to a full set of cards"""
-        self.cards = [
-            Card(suit, value)
-            for suit in Suit
-            for value in range(2, 15)  # 2-14 (Ace is 14)
-        ]
-        self.shuffle()
-    
+        """Refill the deck in place and shuffle it (or leave the shuffling to deal in partial mode)"""
+        self.cards[:] = CARDS
+        if self.partial:
+            self._unshuffled = True
+        else:
+            self.shuffle()
+
     def shuffle(self):
-        """Shuffle the deck"""
-        random.shuffle(self.cards)
-    
-    def deal(self, num_cards: int = 1) -> list[Card]:
+        """Shuffle every card left in the deck"""
+        self.rng.shuffle(self.cards)
+        self._unshuffled = False
+
+    def fix_order(self):
+        """Settle the dealing order now, so `cards` is exactly the order cards will come out"""
+        if self._unshuffled:
+            self.shuffle()
+
+    def set_order(self, cards: List[Card]):
+        """Deal from a known order, e.g. a recorded deck being replayed (last card first)"""
+        self.cards[:] = cards
+        self._unshuffled = False
+
+    def remove(self, cards: List[Card]):
+        """Remove specific cards (e.g. known hole cards) from the deck"""
+        known = set(cards)
+        self.cards = [card for card in self.cards if card not in known]
+
+    def deal(self, num_cards: int = 1) -> List[Card]:
         """Deal a specified number of cards from the deck"""
-        if len(self.cards) < num_cards:
+        cards = self.cards
+        if len(cards) < num_cards:
             raise ValueError("Not enough cards in deck")
-        return [self.cards.pop() for _ in range(num_cards)] 
\ No newline at end of file
+        if not self._unshuffled:
+            return [cards.pop() for _ in range(num_cards)]
+        # One Fisher-Yates step per card: swap a random remaining card to the end
+        rand = self.rng.random
+        dealt = []
+        for _ in range(num_cards):
+            j = int(rand() * len(cards))
+            card = cards[j]
+            cards[j] = cards[-1]
+            cards.pop()
+            dealt.append(card)
+        return dealt
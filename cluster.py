@@ -0,0 +1,312 @@
+"""
+Running the server as several worker processes.
+
+Tables are sharded across workers by a stable hash of their id, and every
+event for a table runs on the worker that owns it, whichever worker holds
+the client's connection. Workers talk through a Socket.IO message queue:
+the same channel that fans emits out to clients connected elsewhere also
+carries table events to their owner, seat locations back to the worker
+holding each socket, and table handoffs. Handing a table off saves its
+snapshot to the shared SnapshotStore; the new owner restores it from there.
+
+The queue is pluggable. LocalManager keeps everything in one process (for
+tests and tools), UnixSocketManager connects to the small broker in this
+module (python cluster.py broker PATH), and RedisManager uses Redis.
+"""
+from typing import Callable, Dict, Iterator, List, Optional
+from abc import ABC, abstractmethod
+import importlib
+import logging
+import os
+import socket
+import sys
+import threading
+import zlib
+import socketio
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'poker'
+SUBSCRIBE, PUBLISH = b'SUBSCRIBE\n', b'PUBLISH\n'
+
+
+def table_shard(table_id: str, workers: int) -> int:
+    """Worker that owns a table unless it was handed off; the same in every process"""
+    return zlib.crc32(table_id.encode('utf-8')) % workers
+
+
+class ClusterManager(ABC):
+    """
+    Mixin for a Socket.IO PubSubManager whose channel also carries the
+    cluster's own messages. Transports implement `_publish` and `_receive`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.handlers: Dict[str, Callable[[Dict], None]] = {}
+
+    def start(self):
+        """Subscribe now instead of on the first connection, so routed events are never missed"""
+        if not self.server.manager_initialized:
+            self.server.manager_initialized = True
+            self.initialize()
+
+    def publish(self, method: str, **fields):
+        self._publish(dict(fields, method=method, host_id=self.host_id))
+
+    @abstractmethod
+    def _receive(self) -> Iterator:
+        """Messages from the channel, as dicts or JSON, in order"""
+
+    def _listen(self) -> Iterator:
+        for message in self._receive():
+            data = message if isinstance(message, dict) else self.json.loads(message)
+            handler = self.handlers.get(data.get('method'))
+            if handler is None:
+                yield data
+            elif data.get('host_id') != self.host_id:
+                handler(data)
+
+    def _green(self, module: str):
+        """Standard library module, or its eventlet version when the server runs on eventlet"""
+        if self.server.eio.async_mode == 'eventlet':
+            return importlib.import_module('eventlet.green.' + module)
+        return importlib.import_module(module)
+
+
+class LocalBroker:
+    """In-process stand-in for a message queue: every message reaches every subscriber"""
+
+    def __init__(self):
+        self.subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, inbox):
+        with self._lock:
+            self.subscribers.append(inbox)
+
+    def publish(self, message: str):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for inbox in subscribers:
+            inbox.put(message)
+
+
+class LocalManager(ClusterManager, socketio.PubSubManager):
+    """Client manager for several servers in one process sharing a LocalBroker"""
+    name = 'local'
+
+    def __init__(self, broker: LocalBroker, channel: str = CHANNEL, write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.broker = broker
+        self.inbox = None
+
+    def initialize(self):
+        if not self.write_only:
+            self.inbox = self.server.eio.create_queue()
+            self.broker.subscribe(self.inbox)
+        super().initialize()
+
+    def _publish(self, data):
+        self.broker.publish(self.json.dumps(data))
+
+    def _receive(self):
+        while True:
+            yield self.inbox.get()
+
+
+class UnixSocketManager(ClusterManager, socketio.PubSubManager):
+    """Client manager that goes through the broker run by `python cluster.py broker PATH`"""
+    name = 'unix'
+
+    def __init__(self, path: str, channel: str = CHANNEL, write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = path
+        self._publisher = None
+        self._subscriber = None
+        self._lock = None
+
+    def initialize(self):
+        if not self.write_only:
+            self._subscriber = self._connect(SUBSCRIBE)  # before anything can be published to us
+        super().initialize()
+
+    def _connect(self, role: bytes):
+        connection = self._green('socket').socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(self.path)
+        connection.sendall(role)
+        return connection
+
+    def _publish(self, data):
+        if self._lock is None:
+            self._lock = self._green('threading').Lock()
+        line = self.json.dumps(data).encode('utf-8') + b'\n'
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect(PUBLISH)
+                    self._publisher.sendall(line)
+                    return
+                except OSError:
+                    self._publisher = None
+                    if attempt:
+                        raise
+
+    def _receive(self):
+        subscriber, self._subscriber = self._subscriber or self._connect(SUBSCRIBE), None
+        with subscriber, subscriber.makefile('rb') as stream:
+            for line in stream:
+                yield line
+
+
+class RedisManager(ClusterManager, socketio.RedisManager):
+    """Client manager on a Redis pub/sub channel"""
+
+    def _receive(self):
+        return socketio.RedisManager._listen(self)
+
+
+# Shared by every LocalManager created from a local:// url in this process
+LOCAL_BROKER = LocalBroker()
+
+
+def create_manager(url: str) -> Optional[ClusterManager]:
+    """
+    Client manager for POKER_MESSAGE_QUEUE: local:// (servers in this
+    process), unix:///path/to/broker.sock or redis://host:port/db
+    """
+    if not url:
+        return None
+    if url == 'local://':
+        return LocalManager(LOCAL_BROKER)
+    if url.startswith('unix://'):
+        return UnixSocketManager(url[len('unix://'):])
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisManager(url, channel=CHANNEL)
+    raise ValueError(f"Unsupported message queue: {url}")
+
+
+class Cluster:
+    """
+    This worker's view of the cluster: which worker owns each table, where
+    this worker's sockets are seated, and the messages between workers.
+    With a single worker and no manager everything stays local.
+    """
+
+    def __init__(self, worker: int = 0, workers: int = 1, manager: Optional[ClusterManager] = None):
+        if not 0 <= worker < workers:
+            raise ValueError(f"Worker {worker} is not one of {workers}")
+        if workers > 1 and manager is None:
+            raise ValueError("Several workers need a message queue")
+        self.worker = worker
+        self.workers = workers
+        self.manager = manager
+        self.owners: Dict[str, int] = {}  # tables handed off away from their shard
+        self.locations: Dict[str, str] = {}  # sid -> table id, for sockets connected here
+        # Set by the server: run a table event here, and take over a handed-off table
+        self.on_event: Callable[[str, str, str, object], None] = lambda table_id, handler, sid, data: None
+        self.on_adopt: Callable[[str, Dict[str, str], List[str]], None] = lambda table_id, players, bots: None
+        if manager is not None:
+            manager.handlers.update(poker_event=self._receive_event, poker_owner=self._receive_owner,
+                                    poker_locate=self._receive_locate)
+
+    def start(self):
+        if self.manager is not None:
+            self.manager.start()
+
+    def owner(self, table_id: str) -> int:
+        return self.owners.get(table_id, table_shard(table_id, self.workers))
+
+    def is_local(self, table_id: str) -> bool:
+        return self.owner(table_id) == self.worker
+
+    def route(self, table_id: str, handler: str, sid: str, data=None):
+        """Run a table event on the worker that owns the table"""
+        owner = self.owner(table_id)
+        if owner == self.worker:
+            self.on_event(table_id, handler, sid, data)
+        else:
+            self.manager.publish('poker_event', worker=owner, table=table_id, handler=handler, sid=sid, data=data)
+
+    def _receive_event(self, message: Dict):
+        if message['worker'] == self.worker:
+            # Handed off again while in flight: pass it on
+            self.route(message['table'], message['handler'], message['sid'], message['data'])
+
+    def locate(self, sid: str, table_id: Optional[str]):
+        """Record where a socket is seated (None once it leaves) on the worker holding its connection"""
+        if self.manager is None or self.manager.is_connected(sid, '/'):
+            self._set_location(sid, table_id)
+        else:
+            self.manager.publish('poker_locate', sid=sid, table=table_id)
+
+    def _receive_locate(self, message: Dict):
+        if self.manager.is_connected(message['sid'], '/'):
+            self._set_location(message['sid'], message['table'])
+
+    def _set_location(self, sid: str, table_id: Optional[str]):
+        if table_id is None:
+            self.locations.pop(sid, None)
+        else:
+            self.locations[sid] = table_id
+
+    def hand_off(self, table_id: str, worker: int, players: Dict[str, str], bots: List[str] = ()):
+        """
+        Give a table this worker has just released (its snapshot saved) to
+        another worker, along with its seated sockets (sid -> name) and the
+        names of its bot seats
+        """
+        self.owners[table_id] = worker
+        if worker == self.worker:
+            self.on_adopt(table_id, players, list(bots))
+        else:
+            self.manager.publish('poker_owner', table=table_id, worker=worker, players=players, bots=list(bots))
+
+    def _receive_owner(self, message: Dict):
+        table_id, worker = message['table'], message['worker']
+        self.owners[table_id] = worker
+        if worker == self.worker:
+            self.on_adopt(table_id, message['players'], message.get('bots', []))
+
+
+def run_broker(path: str):
+    """
+    Minimal message broker on a Unix socket: connections say whether they
+    publish or subscribe, and every line published goes to every subscriber
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    subscribers = []
+    lock = threading.Lock()
+
+    def serve(connection: socket.socket):
+        stream = connection.makefile('rb')
+        role = stream.readline()
+        if role == SUBSCRIBE:
+            with lock:
+                subscribers.append(connection)
+            return
+        for line in stream:
+            with lock:
+                for subscriber in list(subscribers):
+                    try:
+                        subscriber.sendall(line)
+                    except OSError:
+                        subscribers.remove(subscriber)
+        connection.close()
+
+    logger.info('Broker listening on %s', path)
+    while True:
+        connection, _ = server.accept()
+        threading.Thread(target=serve, args=(connection,), daemon=True).start()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'broker':
+        sys.exit('usage: python cluster.py broker PATH')
+    logging.basicConfig(level=logging.INFO)
+    run_broker(sys.argv[2])
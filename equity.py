@@ -0,0 +1,317 @@
+from typing import List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from math import comb
+from statistics import NormalDist
+import os
+import time
+import numpy as np
+from card import Card, Deck
+from hand_evaluator import HandEvaluator, RANK_KEY, SUIT_NIBBLE, SUIT_MASK_BIT, SUIT_COUNT_BASE
+
+# Hole cards per player; None marks a player whose cards are unknown
+Hands = Sequence[Optional[Sequence[Card]]]
+
+# Under a time budget, chunks are sized to take at most this share of the
+# time left (judging by the rate so far), and never fewer runouts than MIN_CHUNK
+CHUNK_TIME_SHARE = 0.25
+MIN_CHUNK = 1000
+
+
+class EquityResult:
+    """Aggregated showdown outcomes for each player over a number of runouts"""
+
+    def __init__(self, players: int):
+        self.samples = 0
+        # Total weight of the outcomes counted; the same as samples unless
+        # they were weighted (as in exact range-vs-range equity)
+        self.weight = 0
+        self.wins = np.zeros(players, dtype=np.int64)
+        self.ties = np.zeros(players, dtype=np.int64)
+        self.shares = np.zeros(players, dtype=np.float64)
+        self.shares_squared = np.zeros(players, dtype=np.float64)
+
+    def add(self, samples: int, wins, ties, shares, shares_squared, weight: Optional[int] = None):
+        """Merge the counts from one batch of runouts, each of weight 1 unless `weight` totals them"""
+        self.samples += samples
+        self.weight += samples if weight is None else weight
+        self.wins += wins
+        self.ties += ties
+        self.shares += shares
+        self.shares_squared += shares_squared
+
+    @property
+    def win(self) -> List[float]:
+        """Probability that each player wins the whole pot"""
+        return (self.wins / max(self.weight, 1)).tolist()
+
+    @property
+    def tie(self) -> List[float]:
+        """Probability that each player splits the pot"""
+        return (self.ties / max(self.weight, 1)).tolist()
+
+    @property
+    def lose(self) -> List[float]:
+        """Probability that each player wins nothing"""
+        return (1 - (self.wins + self.ties) / max(self.weight, 1)).tolist()
+
+    @property
+    def equity(self) -> List[float]:
+        """Expected share of the pot for each player"""
+        return (self.shares / max(self.weight, 1)).tolist()
+
+    def confidence_intervals(self, confidence: float = 0.95) -> List[Tuple[float, float]]:
+        """Normal-approximation confidence interval on each player's equity"""
+        if self.samples == 0:
+            return [(0.0, 1.0)] * len(self.wins)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        mean = self.shares / self.weight
+        variance = np.maximum(self.shares_squared / self.weight - mean ** 2, 0.0)
+        margin = z * np.sqrt(variance / self.samples)
+        return [(max(0.0, m - e), min(1.0, m + e)) for m, e in zip(mean.tolist(), margin.tolist())]
+
+    def __repr__(self):
+        equity = ', '.join(f"{e:.3f}" for e in self.equity)
+        return f"EquityResult(samples={self.samples}, equity=[{equity}])"
+
+
+class EquityCalculator:
+    """
+    Monte Carlo all-in equity estimator.
+    Runouts are simulated in fixed-size chunks. Each chunk draws from its own
+    child of the seed's SeedSequence, so a seeded estimate with a sample
+    budget gives the same result whatever the number of workers. With more
+    than one worker the chunks run on a ProcessPoolExecutor that is created
+    on first use and kept for later estimates; call close() when done.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 25000):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def estimate(self, hands: Hands, board: Sequence[Card] = (), dead: Sequence[Card] = (),
+                 samples: Optional[int] = 100000, time_budget: Optional[float] = None,
+                 seed: Optional[int] = None) -> EquityResult:
+        """
+        Estimate win/tie/lose probabilities for each player.
+        Stops after `samples` runouts or `time_budget` seconds, whichever
+        comes first; at least one of the two must be given. A time budget is
+        a ceiling: chunks shrink as it runs out and those still running at
+        the deadline are dropped.
+        """
+        if samples is None and time_budget is None:
+            raise ValueError("Either samples or time_budget is required")
+        hands, board, remaining = prepare_runouts(hands, board, dead)
+        result = EquityResult(len(hands))
+        started = time.monotonic()
+        deadline = started + time_budget if time_budget is not None else None
+        seeds = _chunk_seeds(seed)
+
+        def chunk_sizes():
+            left = samples
+            while left is None or left > 0:
+                size = self.chunk_size
+                if deadline is not None:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        return
+                    # Under a time budget, size each chunk from the rate so far
+                    # so that it takes a fraction of the time left
+                    rate = result.samples / (now - started) / self.workers if result.samples else 0
+                    size = max(MIN_CHUNK, min(size, int(rate * (deadline - now) * CHUNK_TIME_SHARE)))
+                if left is not None:
+                    size = min(size, left)
+                    left -= size
+                yield size
+
+        if self.workers == 1:
+            for size in chunk_sizes():
+                result.add(*simulate_runouts(hands, board, remaining, size, next(seeds)))
+            return result
+
+        def timeout():
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        executor = self._get_executor()
+        pending = set()
+        for size in chunk_sizes():
+            pending.add(executor.submit(simulate_runouts, hands, board, remaining, size, next(seeds)))
+            if len(pending) >= 2 * self.workers:
+                done, pending = wait(pending, timeout=timeout(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    result.add(*future.result())
+        done, pending = wait(pending, timeout=timeout())
+        for future in done:
+            result.add(*future.result())
+        # Chunks still running when the time is up are left to finish unseen
+        for future in pending:
+            future.cancel()
+        return result
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def estimate_equity(hands: Hands, board: Sequence[Card] = (), dead: Sequence[Card] = (),
+                    samples: Optional[int] = 100000, time_budget: Optional[float] = None,
+                    seed: Optional[int] = None, workers: Optional[int] = None) -> EquityResult:
+    """One-off Monte Carlo estimate; reuse an EquityCalculator for repeated queries"""
+    with EquityCalculator(workers) as calculator:
+        return calculator.estimate(hands, board, dead, samples, time_budget, seed)
+
+
+def runout_count(board: Sequence[Card] = (), known: int = 0) -> int:
+    """Number of distinct board completions given the board and how many other cards are known"""
+    return comb(52 - len(board) - known, 5 - len(board))
+
+
+def exact_equity(hands: Sequence[Sequence[Card]], board: Sequence[Card] = (),
+                 dead: Sequence[Card] = ()) -> EquityResult:
+    """
+    Enumerate every remaining board completion and return exact equities.
+    All hole cards must be known. Each player's rank key, suit counts and
+    suit masks are summed once for the hole cards and known board, and then
+    extended one card at a time as the walk descends, so cards shared by a
+    board prefix are never re-added.
+    """
+    if any(hand is None for hand in hands):
+        raise ValueError("Exact enumeration needs every player's hole cards")
+    hands, board, remaining = prepare_runouts(hands, board, dead)
+    players = len(hands)
+    wins = [0] * players
+    ties = [0] * players
+    shares = [0.0] * players
+    shares_squared = [0.0] * players
+    resolve = HandEvaluator.resolve_strength
+
+    def keys_for(cards):
+        return (sum(RANK_KEY[c] for c in cards),
+                SUIT_COUNT_BASE + sum(SUIT_NIBBLE[c] for c in cards),
+                sum(SUIT_MASK_BIT[c] for c in cards))
+
+    def showdown(states):
+        strengths = [resolve(*state) for state in states]
+        best = max(strengths)
+        winners = [i for i, strength in enumerate(strengths) if strength == best]
+        if len(winners) == 1:
+            wins[winners[0]] += 1
+            shares[winners[0]] += 1.0
+            shares_squared[winners[0]] += 1.0
+        else:
+            share = 1.0 / len(winners)
+            for i in winners:
+                ties[i] += 1
+                shares[i] += share
+                shares_squared[i] += share * share
+
+    def walk(states, start, left):
+        if left == 0:
+            showdown(states)
+            return
+        for index in range(start, len(remaining) - left + 1):
+            card = remaining[index]
+            rank_key, nibble, mask = RANK_KEY[card], SUIT_NIBBLE[card], SUIT_MASK_BIT[card]
+            walk([(r + rank_key, s + nibble, m + mask) for r, s, m in states], index + 1, left - 1)
+
+    walk([keys_for(hand + board) for hand in hands], 0, 5 - len(board))
+
+    result = EquityResult(players)
+    result.add(comb(len(remaining), 5 - len(board)), wins, ties, shares, shares_squared)
+    return result
+
+
+def calculate_equity(hands: Hands, board: Sequence[Card] = (), dead: Sequence[Card] = (),
+                     max_exact: int = 50000, **estimate_options) -> EquityResult:
+    """
+    Exact equity when every hand is known and at most `max_exact` runouts
+    remain, otherwise fall back to a Monte Carlo estimate.
+    """
+    known = sum(2 for hand in hands if hand is not None) + len(dead)
+    if all(hand is not None for hand in hands) and runout_count(board, known) <= max_exact:
+        return exact_equity(hands, board, dead)
+    return estimate_equity(hands, board, dead, **estimate_options)
+
+
+def prepare_runouts(hands: Hands, board: Sequence[Card],
+                    dead: Sequence[Card]) -> Tuple[List[Optional[List[int]]], List[int], List[int]]:
+    """Validate the known cards and return them as ids with the cards left in the deck"""
+    if len(hands) < 2:
+        raise ValueError("At least two players are required")
+    if len(board) > 5:
+        raise ValueError("The board has at most five cards")
+    hands = [None if hand is None else [int(card) for card in hand] for hand in hands]
+    if any(hand is not None and len(hand) != 2 for hand in hands):
+        raise ValueError("Each known hand must have exactly two cards")
+    board = [int(card) for card in board]
+    known = [card for hand in hands if hand for card in hand] + board + [int(card) for card in dead]
+    if len(set(known)) != len(known):
+        raise ValueError("The same card appears more than once")
+
+    deck = Deck()
+    deck.remove(known)
+    remaining = sorted(int(card) for card in deck.cards)
+    if 5 - len(board) + 2 * hands.count(None) > len(remaining):
+        raise ValueError("Not enough cards left to complete the runouts")
+    return hands, board, remaining
+
+
+def simulate_runouts(hands: List[Optional[List[int]]], board: List[int], remaining: List[int],
+                     samples: int, seed) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Simulate random runouts and return (samples, wins, ties, shares, shares_squared)"""
+    rng = np.random.default_rng(seed)
+    missing = 5 - len(board)
+    unknown = [i for i, hand in enumerate(hands) if hand is None]
+    draw = missing + 2 * len(unknown)
+
+    if draw:
+        # Keep the `draw` smallest of one uniform key per remaining card and
+        # order them by key, which gives a uniformly random ordered sample.
+        keys = rng.random((samples, len(remaining)))
+        picked = np.argpartition(keys, draw - 1, axis=1)[:, :draw]
+        order = np.argsort(np.take_along_axis(keys, picked, axis=1), axis=1)
+        drawn = np.asarray(remaining)[np.take_along_axis(picked, order, axis=1)]
+    else:
+        drawn = np.empty((samples, 0), dtype=np.intp)
+
+    runout = np.concatenate([np.broadcast_to(np.asarray(board, dtype=np.intp), (samples, len(board))),
+                             drawn[:, :missing]], axis=1)
+    strengths = np.empty((len(hands), samples), dtype=np.int64)
+    for i, hand in enumerate(hands):
+        if hand is None:
+            start = missing + 2 * unknown.index(i)
+            hole = drawn[:, start:start + 2]
+        else:
+            hole = np.broadcast_to(np.asarray(hand, dtype=np.intp), (samples, 2))
+        strengths[i] = HandEvaluator.evaluate_batch(hole, runout)
+    return (samples,) + tally_showdowns(strengths)
+
+
+def tally_showdowns(strengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Count wins, ties and pot shares from a (players, runouts) strength matrix"""
+    best = strengths == strengths.max(axis=0)
+    winners = best.sum(axis=0)
+    shares = best / winners
+    wins = (best & (winners == 1)).sum(axis=1)
+    ties = (best & (winners > 1)).sum(axis=1)
+    return wins, ties, shares.sum(axis=1), (shares ** 2).sum(axis=1)
+
+
+def _chunk_seeds(seed: Optional[int]):
+    """Yield an independent SeedSequence for each chunk of runouts"""
+    root = np.random.SeedSequence(seed)
+    while True:
+        yield from root.spawn(64)
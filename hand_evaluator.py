@@ -1,6 +1,34 @@
-from typing import List, Tuple
-from card import Card
-from collections import Counter
+from typing import Dict, List, Tuple
+from functools import lru_cache
+from itertools import combinations_with_replacement
+import numpy as np
+from canonical import canonical_hand_key
+from card import Card, CARDS
+
+# A hand strength is a single comparable integer: the hand rank sits above
+# bit 20 and up to five 4-bit kickers (card values 2-14) fill the bits below,
+# most significant kicker first. Comparing two strengths compares rank first
+# and then kickers, exactly like comparing (rank, kickers) tuples.
+KICKER_BITS = 4
+RANK_SHIFT = 5 * KICKER_BITS
+
+# Each card adds 5 ** (value - 2) to the rank key, so the key encodes how many
+# cards of each value a hand holds (never more than four) independent of order.
+VALUE_KEY = {value: 5 ** (value - 2) for value in range(2, 15)}
+
+# Each card adds one to its suit's nibble. The nibbles start at 3, so a nibble
+# reaches 8 (its high bit) exactly when the suit holds five or more cards.
+SUIT_COUNT_BASE = 0x3333
+FLUSH_BITS = 0x8888
+
+# Per-card lookups indexed by the packed card id (see card.Card)
+RANK_KEY = [VALUE_KEY[card.value] for card in CARDS]
+SUIT_NIBBLE = [1 << (4 * (card & 3)) for card in CARDS]
+VALUE_BIT = [1 << (card.value - 2) for card in CARDS]
+# Value bit shifted into a 16-bit lane per suit, so summing these over a hand
+# yields the value mask of every suit at once
+SUIT_MASK_BIT = [VALUE_BIT[card] << (16 * (card & 3)) for card in CARDS]
+
 
 class HandEvaluator:
     # Hand rankings from highest to lowest
@@ -15,90 +43,131 @@ class HandEvaluator:
     ONE_PAIR = 2
     HIGH_CARD = 1
 
+    # Number of kickers that follow each rank in a packed strength
+    KICKER_COUNTS = {
+        ROYAL_FLUSH: 1,
+        STRAIGHT_FLUSH: 1,
+        FOUR_OF_A_KIND: 2,
+        FULL_HOUSE: 2,
+        FLUSH: 5,
+        STRAIGHT: 1,
+        THREE_OF_A_KIND: 3,
+        TWO_PAIR: 3,
+        ONE_PAIR: 4,
+        HIGH_CARD: 5
+    }
+
     @staticmethod
     def evaluate_hand(hole_cards: List[Card], community_cards: List[Card]) -> Tuple[int, List[int]]:
         """
         Evaluate a poker hand and return its rank and kickers
         Returns: (hand_rank, kickers)
         """
-        all_cards = hole_cards + community_cards
-        values = [card.value for card in all_cards]
-        suits = [card.suit for card in all_cards]
-        
-        # Check for flush
-        flush_cards = HandEvaluator._get_flush_cards(all_cards)
-        if flush_cards:
-            # Check for straight flush
-            straight_flush = HandEvaluator._get_straight_cards(flush_cards)
-            if straight_flush:
-                # Check for royal flush
-                if straight_flush[0].value == 14:
-                    return HandEvaluator.ROYAL_FLUSH, [14]
-                return HandEvaluator.STRAIGHT_FLUSH, [straight_flush[0].value]
-            return HandEvaluator.FLUSH, sorted([card.value for card in flush_cards[:5]], reverse=True)
-        
-        # Check for straight
-        straight = HandEvaluator._get_straight_cards(all_cards)
-        if straight:
-            return HandEvaluator.STRAIGHT, [straight[0].value]
-        
-        # Check for other hands
-        value_counts = Counter(values)
-        counts = value_counts.most_common()
-        
-        # Four of a kind
-        if counts[0][1] == 4:
-            kicker = max(v for v in values if v != counts[0][0])
-            return HandEvaluator.FOUR_OF_A_KIND, [counts[0][0], kicker]
-        
-        # Full house
-        if counts[0][1] == 3 and counts[1][1] >= 2:
-            return HandEvaluator.FULL_HOUSE, [counts[0][0], counts[1][0]]
-        
-        # Three of a kind
-        if counts[0][1] == 3:
-            kickers = sorted([v for v in values if v != counts[0][0]], reverse=True)[:2]
-            return HandEvaluator.THREE_OF_A_KIND, [counts[0][0]] + kickers
-        
-        # Two pair
-        if counts[0][1] == 2 and counts[1][1] == 2:
-            kicker = max(v for v in values if v not in [counts[0][0], counts[1][0]])
-            return HandEvaluator.TWO_PAIR, [counts[0][0], counts[1][0], kicker]
-        
-        # One pair
-        if counts[0][1] == 2:
-            kickers = sorted([v for v in values if v != counts[0][0]], reverse=True)[:3]
-            return HandEvaluator.ONE_PAIR, [counts[0][0]] + kickers
-        
-        # High card
-        return HandEvaluator.HIGH_CARD, sorted(values, reverse=True)[:5]
+        return HandEvaluator.decode_strength(HandEvaluator.hand_strength(hole_cards + community_cards))
+
+    @staticmethod
+    def evaluate_strength(hole_cards: List[Card], community_cards: List[Card]) -> int:
+        """Evaluate a poker hand and return its packed, comparable strength"""
+        return HandEvaluator.hand_strength(hole_cards + community_cards)
+
+    @staticmethod
+    def evaluate_hand_cached(hole_cards: List[Card], community_cards: List[Card]) -> Tuple[int, List[int]]:
+        """
+        evaluate_hand through a bounded LRU cache keyed on the suit-isomorphic
+        form of the cards, so hands that differ only by suit relabelling share
+        one entry. See cache_info() for hits and misses.
+        """
+        rank, kickers = _canonical_evaluation(canonical_hand_key(hole_cards + community_cards))
+        return rank, list(kickers)
+
+    @staticmethod
+    def cache_info():
+        """Hits, misses and size of the evaluate_hand_cached cache"""
+        return _canonical_evaluation.cache_info()
+
+    @staticmethod
+    def cache_clear():
+        _canonical_evaluation.cache_clear()
+
+    @staticmethod
+    def hand_strength(cards: List[Card]) -> int:
+        """
+        Return the strength of the best five-card hand among 5-7 cards.
+        Cards may be Card instances or plain packed card ids.
+        """
+        rank_key = 0
+        suit_counts = SUIT_COUNT_BASE
+        for card in cards:
+            rank_key += RANK_KEY[card]
+            suit_counts += SUIT_NIBBLE[card]
+
+        flush_bits = suit_counts & FLUSH_BITS
+        if flush_bits:
+            # With at most seven cards a flush outranks every hand that the
+            # remaining cards could make, so only the suited cards matter.
+            flush_suit = flush_bits.bit_length() // 4 - 1
+            mask = 0
+            for card in cards:
+                if card & 3 == flush_suit:
+                    mask |= VALUE_BIT[card]
+            return _FLUSH_TABLE[mask]
+        return _RANK_TABLE[rank_key]
+
+    @staticmethod
+    def resolve_strength(rank_key: int, suit_counts: int, suit_masks: int) -> int:
+        """
+        Return the strength of a hand from its summed per-card keys:
+        RANK_KEY, SUIT_NIBBLE (on top of SUIT_COUNT_BASE) and SUIT_MASK_BIT.
+        Lets callers build the sums incrementally, e.g. across a shared board.
+        """
+        flush_bits = suit_counts & FLUSH_BITS
+        if flush_bits:
+            flush_suit = flush_bits.bit_length() // 4 - 1
+            return _FLUSH_TABLE[(suit_masks >> (16 * flush_suit)) & 0x1FFF]
+        return _RANK_TABLE[rank_key]
 
     @staticmethod
-    def _get_flush_cards(cards: List[Card]) -> List[Card]:
-        """Get cards that form a flush, if any"""
-        suit_counts = Counter(card.suit for card in cards)
-        flush_suit = next((suit for suit, count in suit_counts.items() if count >= 5), None)
-        if flush_suit:
-            return sorted([card for card in cards if card.suit == flush_suit],
-                        key=lambda x: x.value, reverse=True)
-        return []
+    def evaluate_batch(hole: np.ndarray, board: np.ndarray) -> np.ndarray:
+        """
+        Evaluate N hands at once from packed card ids.
+        hole has shape (N, 2); board has shape (N, k) or (k,) to share one
+        board across all hands, with 3 <= k <= 5. Returns an int64 array of
+        strengths identical to hand_strength for each row.
+        """
+        hole = np.asarray(hole, dtype=np.intp)
+        board = np.asarray(board, dtype=np.intp)
+        if hole.ndim != 2:
+            raise ValueError("hole must have shape (N, cards)")
+        if board.ndim == 1:
+            board = np.broadcast_to(board, (hole.shape[0], board.shape[0]))
+        cards = np.concatenate([hole, board], axis=1)
+        if not 5 <= cards.shape[1] <= 7:
+            raise ValueError("Hands must have between 5 and 7 cards")
+
+        tables = _batch_tables()
+        rank_keys = tables["rank_key"][cards].sum(axis=1)
+        flush_bits = (tables["suit_nibble"][cards].sum(axis=1) + SUIT_COUNT_BASE) & FLUSH_BITS
+
+        strengths = tables["rank_strengths"][np.searchsorted(tables["rank_keys"], rank_keys)]
+        if flush_bits.any():
+            suits = cards & 3
+            value_bits = tables["value_bit"][cards]
+            for suit in range(4):
+                rows = np.nonzero(flush_bits & (8 << (4 * suit)))[0]
+                if rows.size:
+                    masks = np.where(suits[rows] == suit, value_bits[rows], 0).sum(axis=1)
+                    strengths[rows] = tables["flush"][masks]
+        return strengths
 
     @staticmethod
-    def _get_straight_cards(cards: List[Card]) -> List[Card]:
-        """Get cards that form a straight, if any"""
-        values = sorted(set(card.value for card in cards), reverse=True)
-        
-        # Check for Ace-low straight (A-5-4-3-2)
-        if set([14, 2, 3, 4, 5]).issubset(values):
-            return [card for card in cards if card.value in [14, 2, 3, 4, 5]]
-        
-        # Check for regular straights
-        for i in range(len(values) - 4):
-            if values[i] - values[i + 4] == 4:
-                straight_values = values[i:i + 5]
-                return [card for card in cards if card.value in straight_values]
-        
-        return []
+    def decode_strength(strength: int) -> Tuple[int, List[int]]:
+        """Split a packed strength back into (hand_rank, kickers)"""
+        rank = strength >> RANK_SHIFT
+        kickers = []
+        for i in range(HandEvaluator.KICKER_COUNTS[rank]):
+            shift = RANK_SHIFT - KICKER_BITS * (i + 1)
+            kickers.append((strength >> shift) & 0xF)
+        return rank, kickers
 
     @staticmethod
     def get_hand_name(rank: int) -> str:
@@ -114,4 +183,121 @@ class HandEvaluator:
             HandEvaluator.TWO_PAIR: "Two Pair",
             HandEvaluator.ONE_PAIR: "One Pair",
             HandEvaluator.HIGH_CARD: "High Card"
-        }[rank] 
\ No newline at end of file
+        }[rank]
+
+
+EVALUATION_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=EVALUATION_CACHE_SIZE)
+def _canonical_evaluation(key: Tuple[int, int, int, int]) -> Tuple[int, Tuple[int, ...]]:
+    """(rank, kickers) of the canonical hand a key stands for"""
+    cards = [(value << 2) | suit for suit, mask in enumerate(key) for value in range(13) if mask >> value & 1]
+    rank, kickers = HandEvaluator.decode_strength(HandEvaluator.hand_strength(cards))
+    return rank, tuple(kickers)
+
+
+def _pack(rank: int, kickers: List[int]) -> int:
+    """Pack a rank and its kickers into a single comparable integer"""
+    strength = rank
+    for kicker in kickers:
+        strength = (strength << KICKER_BITS) | kicker
+    return strength << KICKER_BITS * (5 - len(kickers))
+
+
+def _straight_high(mask: int) -> int:
+    """Return the high card of the best straight in a value bitmask, or 0"""
+    for high in range(14, 5, -1):
+        run = 0x1F << (high - 6)
+        if mask & run == run:
+            return high
+    wheel = (1 << 12) | 0xF  # A, 2, 3, 4, 5
+    if mask & wheel == wheel:
+        return 5
+    return 0
+
+
+def _score_flush(mask: int) -> int:
+    """Score a hand whose suited cards have the given value bitmask"""
+    high = _straight_high(mask)
+    if high == 14:
+        return _pack(HandEvaluator.ROYAL_FLUSH, [14])
+    if high:
+        return _pack(HandEvaluator.STRAIGHT_FLUSH, [high])
+    values = [value for value in range(14, 1, -1) if mask & (1 << (value - 2))]
+    return _pack(HandEvaluator.FLUSH, values[:5])
+
+
+def _score_ranks(counts: Dict[int, int]) -> int:
+    """Score a hand without a flush from its count of cards per value"""
+    values = sorted(counts, reverse=True)
+    mask = 0
+    for value in values:
+        mask |= 1 << (value - 2)
+
+    # Highest count first, higher value first among equal counts
+    groups = sorted(values, key=lambda v: (counts[v], v), reverse=True)
+    top = counts[groups[0]]
+
+    if top == 4:
+        kicker = max(v for v in values if v != groups[0])
+        return _pack(HandEvaluator.FOUR_OF_A_KIND, [groups[0], kicker])
+
+    if top == 3 and counts[groups[1]] >= 2:
+        return _pack(HandEvaluator.FULL_HOUSE, [groups[0], groups[1]])
+
+    high = _straight_high(mask)
+    if high:
+        return _pack(HandEvaluator.STRAIGHT, [high])
+
+    if top == 3:
+        kickers = [v for v in values if v != groups[0]][:2]
+        return _pack(HandEvaluator.THREE_OF_A_KIND, [groups[0]] + kickers)
+
+    if top == 2 and counts[groups[1]] == 2:
+        kicker = max(v for v in values if v not in (groups[0], groups[1]))
+        return _pack(HandEvaluator.TWO_PAIR, [groups[0], groups[1], kicker])
+
+    if top == 2:
+        kickers = [v for v in values if v != groups[0]][:3]
+        return _pack(HandEvaluator.ONE_PAIR, [groups[0]] + kickers)
+
+    return _pack(HandEvaluator.HIGH_CARD, values[:5])
+
+
+def _build_tables() -> Tuple[List[int], Dict[int, int]]:
+    """Precompute strengths for every flush value mask and every 5-7 card value multiset"""
+    flush_table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= 5:
+            flush_table[mask] = _score_flush(mask)
+
+    rank_table = {}
+    for size in (5, 6, 7):
+        for values in combinations_with_replacement(range(2, 15), size):
+            counts = {}
+            for value in values:
+                counts[value] = counts.get(value, 0) + 1
+            if max(counts.values()) > 4:
+                continue
+            rank_table[sum(VALUE_KEY[v] for v in values)] = _score_ranks(counts)
+    return flush_table, rank_table
+
+
+_FLUSH_TABLE, _RANK_TABLE = _build_tables()
+_BATCH_TABLES: Dict[str, np.ndarray] = {}
+
+
+def _batch_tables() -> Dict[str, np.ndarray]:
+    """NumPy copies of the lookup tables, built on first use by evaluate_batch"""
+    if not _BATCH_TABLES:
+        rank_keys = np.array(sorted(_RANK_TABLE), dtype=np.int64)
+        _BATCH_TABLES.update(
+            rank_key=np.array(RANK_KEY, dtype=np.int64),
+            suit_nibble=np.array(SUIT_NIBBLE, dtype=np.int64),
+            value_bit=np.array(VALUE_BIT, dtype=np.int64),
+            flush=np.array(_FLUSH_TABLE, dtype=np.int64),
+            rank_keys=rank_keys,
+            rank_strengths=np.array([_RANK_TABLE[k] for k in rank_keys.tolist()], dtype=np.int64),
+        )
+    return _BATCH_TABLES
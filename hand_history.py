@@ -0,0 +1,354 @@
+"""
+Plain-text hand histories and a streaming analyzer for them.
+
+HandHistoryWriter is a PokerGame listener that writes one block per hand:
+
+    Hand #12: Table 'main' ($5/$10) - 2026-10-18 12:00:00
+    Seat 1: alice ($1000 in chips) [BTN]
+    Seat 2: bob ($995 in chips) [SB]
+    Seat 3: carol ($1010 in chips) [BB]
+    bob: posts small blind $5
+    carol: posts big blind $10
+    *** HOLE CARDS ***
+    Dealt to alice [Ah Kd]
+    alice: raises to $30
+    bob: folds
+    carol: calls
+    *** FLOP *** [2c 7d Jh]
+    carol: checks
+    ...
+    *** SHOW DOWN ***
+    alice: shows [Ah Kd] (One Pair)
+    *** SUMMARY ***
+    alice: net +40
+    carol: net -30
+
+followed by a blank line. The analyzer reads these files line by line, so
+memory stays constant however large they get, and can split the work across
+a process pool by byte ranges aligned to hand boundaries.
+"""
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import os
+import re
+import sys
+from hand_evaluator import HandEvaluator
+from poker_game import PokerGame
+
+STREETS = {3: 'FLOP', 4: 'TURN', 5: 'RIVER'}
+ACTION_VERBS = {'fold': 'folds', 'check': 'checks', 'call': 'calls', 'raise': 'raises'}
+
+
+def position_names(players: int) -> List[str]:
+    """Position of each seat counted clockwise from the button"""
+    if players == 2:
+        return ['BTN', 'BB']
+    late = ['UTG', 'MP', 'HJ', 'CO']
+    extra = players - 3
+    names = late[-extra:] if 0 < extra <= len(late) else []
+    if extra > len(late):
+        names = ['UTG'] + [f'UTG+{i}' for i in range(1, extra - 3)] + late[1:]
+    return ['BTN', 'SB', 'BB'] + names
+
+
+def _cards(cards) -> str:
+    return ' '.join(card.to_str() for card in cards)
+
+
+class HandHistoryWriter:
+    """PokerGame listener that writes plain-text hand histories to a stream"""
+
+    def __init__(self, stream: IO[str], table_id: str = ''):
+        self.stream = stream
+        self.table_id = table_id
+        self.hand_number = 0
+        self._start_chips: List[int] = []
+
+    def attach(self, game: PokerGame):
+        game.add_listener(self)
+
+    def __call__(self, game: PokerGame, event: str, details: Dict):
+        getattr(self, f'_on_{event}')(game, details)
+
+    def _write(self, line: str):
+        self.stream.write(line + '\n')
+
+    def _on_start_hand(self, game: PokerGame, details: Dict):
+        self.hand_number += 1
+        players = details['players']
+        self._start_chips = [chips for _, chips in players]
+        # Positions go round the seats dealt in; busted players sit out
+        sb_pos, bb_pos, heads_up = game.blind_seats()
+        dealt = [i for i, player in enumerate(game.players) if player.hand]
+        positions = position_names(len(dealt))
+        button = dealt.index(sb_pos) - (0 if heads_up else 1)
+        position_of = {seat: positions[(k - button) % len(dealt)] for k, seat in enumerate(dealt)}
+        stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._write(f"Hand #{self.hand_number}: Table '{self.table_id}' "
+                    f"(${details['small_blind']}/${details['big_blind']}) - {stamp}")
+        for i, (name, chips) in enumerate(players):
+            if i in position_of:
+                self._write(f"Seat {i + 1}: {name} (${chips} in chips) [{position_of[i]}]")
+            else:
+                self._write(f"Seat {i + 1}: {name} (${chips} in chips) is sitting out")
+        # A short stack posts only what it has
+        self._write(f"{players[sb_pos][0]}: posts small blind ${game.contributions[sb_pos]}")
+        self._write(f"{players[bb_pos][0]}: posts big blind ${game.contributions[bb_pos]}")
+        self._write('*** HOLE CARDS ***')
+        for player in game.players:
+            if player.hand:
+                self._write(f"Dealt to {player.name} [{_cards(player.hand)}]")
+
+    def _on_action(self, game: PokerGame, details: Dict):
+        name = game.players[details['seat']].name
+        if details['action'] == 'raise':
+            self._write(f"{name}: raises to ${details['amount']}")
+        else:
+            self._write(f"{name}: {ACTION_VERBS[details['action']]}")
+
+    def _on_deal(self, game: PokerGame, details: Dict):
+        board = game.community_cards
+        street = STREETS.get(len(board), 'BOARD')
+        dealt = details['count']
+        if len(board) > dealt:
+            self._write(f"*** {street} *** [{_cards(board[:-dealt])}] [{_cards(board[-dealt:])}]")
+        else:
+            self._write(f"*** {street} *** [{_cards(board)}]")
+
+    def _on_end_hand(self, game: PokerGame, details: Dict):
+        active = game.get_active_players()
+        if len(active) > 1 and len(game.community_cards) == 5:
+            self._write('*** SHOW DOWN ***')
+            for player in active:
+                rank, _ = HandEvaluator.evaluate_hand_cached(player.hand, game.community_cards)
+                self._write(f"{player.name}: shows [{_cards(player.hand)}] ({HandEvaluator.get_hand_name(rank)})")
+        self._write('*** SUMMARY ***')
+        for player, before, after in zip(game.players, self._start_chips, details['chips']):
+            if player.hand:
+                self._write(f"{player.name}: net {after - before:+d}")
+        self._write('')
+
+
+class PlayerStats:
+    """Running totals for one player; all counters merge by addition"""
+
+    def __init__(self):
+        self.hands = 0
+        self.vpip_hands = 0
+        self.pfr_hands = 0
+        self.postflop_raises = 0
+        self.postflop_calls = 0
+        self.net_big_blinds = 0.0
+        self.hands_by_position: Counter = Counter()
+        self.net_big_blinds_by_position: Counter = Counter()
+        self.showdown_hands: Counter = Counter()
+
+    @property
+    def vpip(self) -> float:
+        """Share of hands where the player voluntarily put chips in preflop"""
+        return self.vpip_hands / self.hands if self.hands else 0.0
+
+    @property
+    def pfr(self) -> float:
+        """Share of hands where the player raised preflop"""
+        return self.pfr_hands / self.hands if self.hands else 0.0
+
+    @property
+    def aggression_factor(self) -> Optional[float]:
+        """Postflop bets and raises per call; None until the player has called"""
+        if not self.postflop_calls:
+            return None
+        return self.postflop_raises / self.postflop_calls
+
+    def win_rate(self, position: Optional[str] = None) -> float:
+        """Big blinds won per 100 hands, overall or from one position"""
+        if position is None:
+            hands, net = self.hands, self.net_big_blinds
+        else:
+            hands, net = self.hands_by_position[position], self.net_big_blinds_by_position[position]
+        return 100 * net / hands if hands else 0.0
+
+    def merge(self, other: 'PlayerStats'):
+        self.hands += other.hands
+        self.vpip_hands += other.vpip_hands
+        self.pfr_hands += other.pfr_hands
+        self.postflop_raises += other.postflop_raises
+        self.postflop_calls += other.postflop_calls
+        self.net_big_blinds += other.net_big_blinds
+        self.hands_by_position.update(other.hands_by_position)
+        self.net_big_blinds_by_position.update(other.net_big_blinds_by_position)
+        self.showdown_hands.update(other.showdown_hands)
+
+    def summary(self) -> Dict:
+        return {
+            'hands': self.hands,
+            'vpip': round(self.vpip, 4),
+            'pfr': round(self.pfr, 4),
+            'aggression_factor': None if self.aggression_factor is None else round(self.aggression_factor, 3),
+            'bb_per_100': round(self.win_rate(), 2),
+            'bb_per_100_by_position': {pos: round(self.win_rate(pos), 2) for pos in sorted(self.hands_by_position)},
+            'showdown_hands': dict(self.showdown_hands.most_common()),
+        }
+
+
+HEADER = re.compile(r"^Hand #\d+: Table '.*' \(\$(\d+)/\$(\d+)\)")
+SEAT = re.compile(r'^Seat \d+: (.+) \(\$\d+ in chips\) \[(\S+)\]$')
+ACTION = re.compile(r'^(.+): (folds|checks|calls|raises)')
+SHOWS = re.compile(r'^(.+): shows \[.*\] \((.+)\)$')
+NET = re.compile(r'^(.+): net ([+-]\d+)$')
+
+
+def iter_hands(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Group a stream of lines into one list of lines per hand"""
+    hand: List[str] = []
+    for line in lines:
+        line = line.rstrip('\n')
+        if line.startswith('Hand #'):
+            if hand:
+                yield hand
+            hand = [line]
+        elif hand and line:
+            hand.append(line)
+    if hand:
+        yield hand
+
+
+def analyze_hand(lines: List[str], stats: Dict[str, PlayerStats]):
+    """Fold one hand's lines into the per-player stats"""
+    header = HEADER.match(lines[0])
+    if not header:
+        return
+    big_blind = int(header.group(2))
+    positions: Dict[str, str] = {}
+    vpip, pfr = set(), set()
+    street = 'PREFLOP'
+    for line in lines[1:]:
+        if line.startswith('*** '):
+            street = line.split()[1]
+            continue
+        seat = SEAT.match(line)
+        if seat:
+            positions[seat.group(1)] = seat.group(2)
+            continue
+        action = ACTION.match(line)
+        if action and street in ('PREFLOP', 'HOLE'):
+            name, verb = action.groups()
+            if verb in ('calls', 'raises'):
+                vpip.add(name)
+            if verb == 'raises':
+                pfr.add(name)
+            continue
+        if action and street in ('FLOP', 'TURN', 'RIVER'):
+            name, verb = action.groups()
+            if verb == 'raises':
+                stats.setdefault(name, PlayerStats()).postflop_raises += 1
+            elif verb == 'calls':
+                stats.setdefault(name, PlayerStats()).postflop_calls += 1
+            continue
+        shows = SHOWS.match(line)
+        if shows:
+            stats.setdefault(shows.group(1), PlayerStats()).showdown_hands[shows.group(2)] += 1
+            continue
+        net = NET.match(line)
+        if net:
+            name, amount = net.group(1), int(net.group(2)) / big_blind
+            player = stats.setdefault(name, PlayerStats())
+            position = positions.get(name, '?')
+            player.hands += 1
+            player.net_big_blinds += amount
+            player.hands_by_position[position] += 1
+            player.net_big_blinds_by_position[position] += amount
+    for name in vpip:
+        stats.setdefault(name, PlayerStats()).vpip_hands += 1
+    for name in pfr:
+        stats.setdefault(name, PlayerStats()).pfr_hands += 1
+
+
+def analyze_lines(lines: Iterable[str]) -> Dict[str, PlayerStats]:
+    """Stats over every hand in a stream of lines, holding one hand at a time"""
+    stats: Dict[str, PlayerStats] = {}
+    for hand in iter_hands(lines):
+        analyze_hand(hand, stats)
+    return stats
+
+
+def _read_chunk(path: str, start: int, end: int) -> Iterator[str]:
+    """Lines of the hands whose header starts in [start, end) of the file"""
+    with open(path, 'rb') as f:
+        if start:
+            # Skip to the first line that begins at or after `start`; the hand in
+            # progress there belongs to the previous chunk
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        in_range = False
+        for raw in iter(f.readline, b''):
+            if raw.startswith(b'Hand #'):
+                if position >= end:
+                    return
+                in_range = True
+            position += len(raw)
+            if in_range:
+                yield raw.decode('utf-8')
+
+
+def _analyze_chunk(path: str, start: int, end: int) -> Dict[str, PlayerStats]:
+    return analyze_lines(_read_chunk(path, start, end))
+
+
+def merge_stats(results: Iterable[Dict[str, PlayerStats]]) -> Dict[str, PlayerStats]:
+    merged: Dict[str, PlayerStats] = {}
+    for result in results:
+        for name, stats in result.items():
+            merged.setdefault(name, PlayerStats()).merge(stats)
+    return merged
+
+
+def chunk_ranges(paths: Iterable[str], chunk_size: int) -> List[Tuple[str, int, int]]:
+    """Split files into (path, start, end) byte ranges of about chunk_size bytes"""
+    ranges = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, size, chunk_size):
+            ranges.append((path, start, min(start + chunk_size, size)))
+    return ranges
+
+
+def analyze_files(paths: Iterable[str], workers: int = 1,
+                  chunk_size: int = 32 * 1024 * 1024) -> Dict[str, PlayerStats]:
+    """Stats over hand history files, split into chunks across a process pool"""
+    ranges = chunk_ranges(paths, chunk_size)
+    if workers == 1:
+        return merge_stats(_analyze_chunk(*r) for r in ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return merge_stats(executor.map(_analyze_chunk, *zip(*ranges)) if ranges else [])
+
+
+def write_from_log(log_paths: Iterable[str], output: IO[str]):
+    """Convert binary hand logs (see hand_log) into text hand histories"""
+    from hand_log import HandReplayer, read_records
+
+    writers: Dict[int, HandHistoryWriter] = {}
+    replayer = HandReplayer()
+    for game_id, event, details in read_records(log_paths):
+        game = replayer.apply(game_id, event, details)
+        if game is None:
+            continue
+        if game_id not in writers:
+            writers[game_id] = HandHistoryWriter(output, replayer.table_ids[game_id])
+        # Live listeners run right after each event, so feeding the replayed
+        # game the same way produces the same text
+        writers[game_id](game, event, details)
+
+
+if __name__ == '__main__':
+    import json
+    if sys.argv[1:2] == ['convert']:
+        write_from_log(sys.argv[2:], sys.stdout)
+    else:
+        pool_size = int(os.environ.get('WORKERS', os.cpu_count() or 1))
+        results = analyze_files(sys.argv[1:], workers=pool_size)
+        json.dump({name: stats.summary() for name, stats in sorted(results.items())}, sys.stdout, indent=2)
+        print()
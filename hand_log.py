@@ -0,0 +1,258 @@
+"""
+Append-only binary log of everything that happens at the tables, and a
+replayer that rebuilds PokerGame state from it.
+
+Every record is framed as
+
+    u16 length | u8 event | u32 game id | payload
+
+(little-endian; length counts everything after itself). Payloads:
+
+    START   u8 dealer, u32 small blind, u32 big blind, u8 table id length,
+            table id, u8 players, per player (u8 name length, name,
+            u32 chips before blinds), 52 card ids in deck order
+            (table ids and names are cut to 255 bytes of UTF-8)
+    ACTION  u8 seat, u8 action, u32 amount
+    DEAL    u8 count
+    END     u8 players, u32 chips after payouts per player
+
+A writer assigns each attached game its own id, so any number of tables can
+share one stream. Files only rotate before a START record, so every file
+starts on a hand boundary and can be replayed on its own.
+"""
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import atexit
+import glob
+import os
+import struct
+import time
+from card import CARDS
+from player import Player
+from poker_game import PokerGame
+
+START, ACTION, DEAL, END = 1, 2, 3, 4
+EVENTS = {'start_hand': START, 'action': ACTION, 'deal': DEAL, 'end_hand': END}
+EVENT_NAMES = {code: name for name, code in EVENTS.items()}
+ACTIONS = ('fold', 'check', 'call', 'raise')
+ACTION_CODES = {name: i for i, name in enumerate(ACTIONS)}
+
+FRAME = struct.Struct('<HBI')
+START_HEAD = struct.Struct('<BII')
+ACTION_BODY = struct.Struct('<BBI')
+FILE_PATTERN = '{prefix}-{index:06d}.log'
+
+Record = Tuple[int, str, Dict]  # (game id, event name, details)
+
+
+def encode_record(game_id: int, event: str, details: Dict, table_id: str = '') -> bytes:
+    """Encode one game event as a framed record"""
+    code = EVENTS[event]
+    if code == START:
+        table = table_id.encode('utf-8')[:255]
+        parts = [START_HEAD.pack(details['dealer_position'], details['small_blind'], details['big_blind']),
+                 bytes([len(table)]), table, bytes([len(details['players'])])]
+        for name, chips in details['players']:
+            encoded_name = name.encode('utf-8')[:255]
+            parts += [bytes([len(encoded_name)]), encoded_name, struct.pack('<I', chips)]
+        parts.append(bytes(int(card) for card in details['deck']))
+        payload = b''.join(parts)
+    elif code == ACTION:
+        # Only a raise carries an amount (the total bet raised to)
+        amount = details['amount'] if details['action'] == 'raise' else 0
+        payload = ACTION_BODY.pack(details['seat'], ACTION_CODES[details['action']], amount)
+    elif code == DEAL:
+        payload = bytes([details['count']])
+    else:
+        chips = details['chips']
+        payload = bytes([len(chips)]) + struct.pack(f'<{len(chips)}I', *chips)
+    return FRAME.pack(FRAME.size - 2 + len(payload), code, game_id) + payload
+
+
+def decode_payload(code: int, payload: bytes) -> Dict:
+    """Decode the payload of one record back into the listener's details dict"""
+    if code == START:
+        dealer, small_blind, big_blind = START_HEAD.unpack_from(payload)
+        offset = START_HEAD.size
+        table_length = payload[offset]
+        table_id = payload[offset + 1:offset + 1 + table_length].decode('utf-8', 'replace')
+        offset += 1 + table_length
+        players = []
+        count = payload[offset]
+        offset += 1
+        for _ in range(count):
+            length = payload[offset]
+            name = payload[offset + 1:offset + 1 + length].decode('utf-8', 'replace')
+            offset += 1 + length
+            players.append((name, struct.unpack_from('<I', payload, offset)[0]))
+            offset += 4
+        return {'table_id': table_id, 'dealer_position': dealer, 'small_blind': small_blind,
+                'big_blind': big_blind, 'players': players, 'deck': list(payload[offset:offset + 52])}
+    if code == ACTION:
+        seat, action, amount = ACTION_BODY.unpack(payload)
+        return {'seat': seat, 'action': ACTIONS[action], 'amount': amount}
+    if code == DEAL:
+        return {'count': payload[0]}
+    count = payload[0]
+    return {'chips': list(struct.unpack_from(f'<{count}I', payload, 1))}
+
+
+class HandLogWriter:
+    """
+    Buffered writer for the hand log.
+    Records accumulate in memory and are written in one call once the buffer
+    passes `buffer_size` bytes or `flush_interval` seconds have passed since
+    the last write (checked on each record, and by flush_periodically). Files in `directory` rotate after `max_file_size` bytes.
+    """
+
+    def __init__(self, directory: str, prefix: str = 'hands', max_file_size: int = 64 * 1024 * 1024,
+                 buffer_size: int = 64 * 1024, flush_interval: float = 1.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._file: Optional[BinaryIO] = None
+        self._file_size = 0
+        self._file_index = 0
+        self._next_game_id = 1
+        os.makedirs(directory, exist_ok=True)
+        existing = log_files(directory, prefix)
+        if existing:
+            self._file_index = int(os.path.basename(existing[-1])[len(prefix) + 1:-4])
+        atexit.register(self.close)
+
+    def attach(self, game: PokerGame, table_id: str = '') -> int:
+        """Start logging a game's events; returns the game id used in its records"""
+        game_id = self._next_game_id
+        self._next_game_id += 1
+
+        def listener(_game: PokerGame, event: str, details: Dict):
+            self.write(encode_record(game_id, event, details, table_id), event == 'start_hand')
+
+        game.add_listener(listener)
+        return game_id
+
+    def write(self, record: bytes, hand_boundary: bool = False):
+        """Buffer one encoded record"""
+        if hand_boundary and self._file_size + self._buffered >= self.max_file_size:
+            self.flush()
+            self._rotate()
+        self._buffer.append(record)
+        self._buffered += len(record)
+        if self._buffered >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush_periodically(self, sleep: Callable[[float], None] = time.sleep):
+        """
+        Run forever on a background task, writing out records that have
+        waited `flush_interval` seconds, so a quiet server does not keep the
+        last hands in memory until the next record arrives
+        """
+        while True:
+            sleep(self.flush_interval)
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        """Write out every buffered record"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._rotate()
+        self._file.write(b''.join(self._buffer))
+        self._file.flush()
+        self._file_size += self._buffered
+        self._buffer = []
+        self._buffered = 0
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._file_index += 1
+        path = os.path.join(self.directory, FILE_PATTERN.format(prefix=self.prefix, index=self._file_index))
+        self._file = open(path, 'ab')
+        self._file_size = self._file.tell()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def log_files(directory: str, prefix: str = 'hands') -> List[str]:
+    """Log files in write order"""
+    return sorted(glob.glob(os.path.join(directory, f'{prefix}-*.log')))
+
+
+def read_records(paths: Iterable[str]) -> Iterator[Record]:
+    """Stream (game id, event, details) from log files without loading them whole"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            while True:
+                frame = f.read(FRAME.size)
+                if len(frame) < FRAME.size:
+                    break
+                length, code, game_id = FRAME.unpack(frame)
+                payload = f.read(length - (FRAME.size - 2))
+                if len(payload) < length - (FRAME.size - 2):
+                    break  # torn final record from a crash mid-write
+                yield game_id, EVENT_NAMES[code], decode_payload(code, payload)
+
+
+class HandReplayer:
+    """
+    Rebuilds PokerGame state by re-applying logged events.
+    Each START record recreates the seats, stacks and dealer button and
+    replays the deal from the recorded deck order, so a game can be rebuilt
+    from any hand boundary without earlier history.
+    """
+
+    def __init__(self):
+        self.games: Dict[int, PokerGame] = {}
+        self.table_ids: Dict[int, str] = {}
+
+    def apply(self, game_id: int, event: str, details: Dict) -> Optional[PokerGame]:
+        """Apply one record and return the game it touched"""
+        if event == 'start_hand':
+            game = PokerGame([Player(name, chips) for name, chips in details['players']],
+                             details['small_blind'], details['big_blind'])
+            game.dealer_position = details['dealer_position']
+            game.start_hand(deck_order=[CARDS[card] for card in details['deck']])
+            self.games[game_id] = game
+            self.table_ids[game_id] = details['table_id']
+            return game
+
+        game = self.games.get(game_id)
+        if game is None:
+            return None  # hand started before the first file replayed
+        if event == 'action':
+            if not game.process_action(details['seat'], details['action'], details['amount']):
+                raise ValueError(f"Logged action does not replay for game {game_id}: {details}")
+        elif event == 'deal':
+            game.deal_community_cards(details['count'])
+        elif event == 'end_hand':
+            for player, chips in zip(game.players, details['chips']):
+                player.chips = chips
+            game.clear_pot()
+            game.end_hand()
+        return game
+
+
+def replay(records: Iterable[Record], game_id: Optional[int] = None,
+           stop_after: Optional[int] = None) -> HandReplayer:
+    """
+    Replay records (optionally only one game's) and return the replayer
+    holding the rebuilt games. `stop_after` limits how many records are applied.
+    """
+    replayer = HandReplayer()
+    for count, (record_game_id, event, details) in enumerate(records):
+        if stop_after is not None and count >= stop_after:
+            break
+        if game_id is None or record_game_id == game_id:
+            replayer.apply(record_game_id, event, details)
+    return replayer
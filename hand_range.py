@@ -0,0 +1,240 @@
+"""
+Hand ranges in the usual shorthand and range-vs-range equity.
+
+A range is written as comma-separated entries, each optionally followed by
+a weight ("30%" or "0.3", after a space or colon):
+
+    QQ+, AKs, AQo 50%, 76s-54s, KTs-K7s, A2s+, AxKx 30%, AhKh
+
+Pairs ("TT", "TT+", "TT-77"), suited or offsuit classes ("AKs", "AKo", or
+"AK" for both), "+" to raise the kicker up to the top card, dashed runs of
+connectors or kickers, and explicit cards where "x" stands for any suit.
+Later entries override earlier ones for the combos they cover.
+
+Ranges are stored as one weight per two-card combo in the 1326-combo order
+of preflop.COMBO_CARDS, so they stay compact numpy arrays throughout.
+"""
+from typing import Optional, Sequence, Tuple
+import re
+import numpy as np
+from card import Card
+from equity import EquityResult, tally_showdowns
+from hand_evaluator import HandEvaluator
+from preflop import COMBO_CARDS, COMBOS, VALUE_CHARS, combo_index
+
+SUIT_CHARS = 'hdcs'  # in card id order
+
+# (1326, 2) card ids and a 52-bit card mask for every combo
+COMBO_ARRAY = np.array(COMBO_CARDS, dtype=np.uint8)
+COMBO_MASKS = (np.uint64(1) << COMBO_ARRAY[:, 0].astype(np.uint64)) | \
+              (np.uint64(1) << COMBO_ARRAY[:, 1].astype(np.uint64))
+
+# Exact equities weigh each matchup by the product of integer weights in
+# units of 1/WEIGHT_UNITS, so results stay exact counts
+WEIGHT_UNITS = 10000
+# Runouts simulated per array pass in Monte Carlo estimates
+CHUNK_SIZE = 50000
+
+_CLASS = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$', re.IGNORECASE)
+_CARDS = re.compile(r'^([2-9TJQKA])([hdcsx])([2-9TJQKA])([hdcsx])$', re.IGNORECASE)
+_WEIGHT = re.compile(r'^(.*?)(?:\s+|:)(\d+(?:\.\d+)?)(%?)$')
+
+
+def _value(char: str) -> int:
+    """Value index 0-12 (deuce to ace) of a rank character"""
+    return VALUE_CHARS.index(char.upper())
+
+
+def _class_combos(high: int, low: int, suited: Optional[bool]):
+    """Combo indices of one hand class; suited None means both suited and offsuit"""
+    for first in range(4):
+        for second in range(4):
+            if high == low and second <= first:
+                continue
+            if high != low and suited is not None and (first == second) != suited:
+                continue
+            yield combo_index(high * 4 + first, low * 4 + second)
+
+
+def _parse_class(text: str) -> Tuple[int, int, Optional[bool], bool]:
+    match = _CLASS.match(text)
+    if not match:
+        raise ValueError(f"Unrecognized range entry: {text!r}")
+    high, low = _value(match.group(1)), _value(match.group(2))
+    if high < low:
+        high, low = low, high
+    suffix = match.group(3).lower()
+    if high == low and suffix:
+        raise ValueError(f"Pairs cannot be suited or offsuit: {text!r}")
+    suited = {'s': True, 'o': False}.get(suffix)
+    return high, low, suited, bool(match.group(4))
+
+
+def _expand(entry: str):
+    """Combo indices covered by one range entry (without its weight)"""
+    cards = _CARDS.match(entry)
+    if cards:
+        (first, first_suit), (second, second_suit) = (
+            (_value(cards.group(1)), cards.group(2).lower()), (_value(cards.group(3)), cards.group(4).lower()))
+        for a in range(4) if first_suit == 'x' else [SUIT_CHARS.index(first_suit)]:
+            for b in range(4) if second_suit == 'x' else [SUIT_CHARS.index(second_suit)]:
+                if first * 4 + a != second * 4 + b:
+                    yield combo_index(first * 4 + a, second * 4 + b)
+        return
+
+    if '-' in entry:
+        start, end = (_parse_class(part.strip()) for part in entry.split('-', 1))
+        if start[2] != end[2] or start[3] or end[3]:
+            raise ValueError(f"Both ends of a range must be the same kind of hand: {entry!r}")
+        if start[0] == start[1] and end[0] == end[1]:
+            steps = [(value, value) for value in range(min(start[0], end[0]), max(start[0], end[0]) + 1)]
+        elif start[0] == end[0]:
+            steps = [(start[0], low) for low in range(min(start[1], end[1]), max(start[1], end[1]) + 1)]
+        elif start[0] - start[1] == end[0] - end[1]:
+            gap = start[0] - start[1]
+            steps = [(high, high - gap) for high in range(min(start[0], end[0]), max(start[0], end[0]) + 1)]
+        else:
+            raise ValueError(f"Cannot interpolate between the ends of {entry!r}")
+        for high, low in steps:
+            yield from _class_combos(high, low, start[2])
+        return
+
+    high, low, suited, plus = _parse_class(entry)
+    if not plus:
+        yield from _class_combos(high, low, suited)
+    elif high == low:
+        for value in range(high, 13):
+            yield from _class_combos(value, value, None)
+    else:
+        for kicker in range(low, high):
+            yield from _class_combos(high, kicker, suited)
+
+
+class HandRange:
+    """Weight (0-1) of every two-card combo, in preflop.COMBO_CARDS order"""
+
+    def __init__(self, weights: Optional[np.ndarray] = None):
+        self.weights = np.zeros(COMBOS, dtype=np.float32) if weights is None else weights
+
+    @classmethod
+    def parse(cls, text: str) -> 'HandRange':
+        hand_range = cls()
+        for entry in text.split(','):
+            entry = entry.strip()
+            if not entry:
+                continue
+            weight = 1.0
+            weighted = _WEIGHT.match(entry)
+            if weighted:
+                entry = weighted.group(1).strip()
+                weight = float(weighted.group(2)) / (100 if weighted.group(3) else 1)
+                if not 0 <= weight <= 1:
+                    raise ValueError(f"Weights must be between 0 and 100%: {text!r}")
+            hand_range.weights[list(_expand(entry))] = weight
+        return hand_range
+
+    def __len__(self) -> int:
+        """Number of combos with a non-zero weight"""
+        return int(np.count_nonzero(self.weights))
+
+    def combos(self, dead: Sequence[Card] = ()) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (card ids of shape (k, 2), weights of shape (k,)) for every combo in
+        the range that does not use one of the `dead` cards.
+        """
+        blocked = np.uint64(sum(1 << int(card) for card in dead))
+        keep = (self.weights > 0) & ((COMBO_MASKS & blocked) == 0)
+        return COMBO_ARRAY[keep], self.weights[keep]
+
+
+def _combo_masks(cards: np.ndarray) -> np.ndarray:
+    cards = cards.astype(np.uint64)
+    return (np.uint64(1) << cards[:, 0]) | (np.uint64(1) << cards[:, 1])
+
+
+def _exact_river(hero: Tuple[np.ndarray, np.ndarray], villain: Tuple[np.ndarray, np.ndarray],
+                 board: np.ndarray) -> EquityResult:
+    """Every hero combo against every villain combo that shares no card"""
+    (hero_cards, hero_weights), (villain_cards, villain_weights) = hero, villain
+    hero_strength = HandEvaluator.evaluate_batch(hero_cards, board)
+    villain_strength = HandEvaluator.evaluate_batch(villain_cards, board)
+    weight = (np.rint(hero_weights * WEIGHT_UNITS).astype(np.int64)[:, None] *
+              np.rint(villain_weights * WEIGHT_UNITS).astype(np.int64)[None, :])
+    weight[(_combo_masks(hero_cards)[:, None] & _combo_masks(villain_cards)[None, :]) != 0] = 0
+
+    hero_wins = int(weight[hero_strength[:, None] > villain_strength[None, :]].sum())
+    villain_wins = int(weight[hero_strength[:, None] < villain_strength[None, :]].sum())
+    ties = int(weight[hero_strength[:, None] == villain_strength[None, :]].sum())
+    # samples counts the matchups; the weight total is the denominator
+    result = EquityResult(2)
+    result.add(int(np.count_nonzero(weight)), np.array([hero_wins, villain_wins]), np.array([ties, ties]),
+               np.array([hero_wins + ties / 2, villain_wins + ties / 2]),
+               np.array([hero_wins + ties / 4, villain_wins + ties / 4]), weight=int(weight.sum()))
+    return result
+
+
+def _sample_matchups(rng: np.random.Generator, hero_masks: np.ndarray, hero_p: np.ndarray,
+                     villain_masks: np.ndarray, villain_p: np.ndarray, samples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw (hero, villain) combo indices with probability proportional to the
+    product of their weights among pairs that share no card.
+    """
+    hero = rng.choice(len(hero_p), size=samples, p=hero_p)
+    villain = rng.choice(len(villain_p), size=samples, p=villain_p)
+    for _ in range(1000):
+        clash = np.flatnonzero(hero_masks[hero] & villain_masks[villain])
+        if not len(clash):
+            return hero, villain
+        hero[clash] = rng.choice(len(hero_p), size=len(clash), p=hero_p)
+        villain[clash] = rng.choice(len(villain_p), size=len(clash), p=villain_p)
+    raise ValueError("The ranges have (almost) no combos that do not share a card")
+
+
+def range_equity(hero: HandRange, villain: HandRange, board: Sequence[Card] = (),
+                 dead: Sequence[Card] = (), samples: int = 20000, seed=None) -> EquityResult:
+    """
+    All-in equity of the hero range against the villain range (players 0
+    and 1 of the result), weighting every matchup by both combos' weights.
+    On a complete board every matchup is counted exactly; otherwise matchups
+    and runouts are sampled together, `samples` of them.
+    """
+    if len(board) > 5:
+        raise ValueError("The board has at most five cards")
+    known = [int(card) for card in board] + [int(card) for card in dead]
+    if len(set(known)) != len(known):
+        raise ValueError("The same card appears more than once")
+    hero_combos, villain_combos = hero.combos(known), villain.combos(known)
+    if not len(hero_combos[0]) or not len(villain_combos[0]):
+        raise ValueError("A range has no combos left once the known cards are removed")
+
+    board_ids = np.array([int(card) for card in board], dtype=np.intp)
+    if len(board) == 5:
+        return _exact_river(hero_combos, villain_combos, board_ids)
+
+    rng = np.random.default_rng(seed)
+    hero_cards, villain_cards = hero_combos[0].astype(np.intp), villain_combos[0].astype(np.intp)
+    hero_masks, villain_masks = _combo_masks(hero_cards), _combo_masks(villain_cards)
+    hero_p = hero_combos[1] / hero_combos[1].sum(dtype=np.float64)
+    villain_p = villain_combos[1] / villain_combos[1].sum(dtype=np.float64)
+    missing = 5 - len(board)
+
+    result = EquityResult(2)
+    for start in range(0, samples, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, samples - start)
+        hero_index, villain_index = _sample_matchups(rng, hero_masks, hero_p, villain_masks, villain_p, size)
+        hero_hole, villain_hole = hero_cards[hero_index], villain_cards[villain_index]
+
+        # Deal the rest of the board from the cards nobody holds: the
+        # `missing` smallest of one uniform key per card, with known and
+        # held cards pushed out of reach
+        keys = rng.random((size, 52))
+        keys[:, known] = 2.0
+        np.put_along_axis(keys, hero_hole, 2.0, axis=1)
+        np.put_along_axis(keys, villain_hole, 2.0, axis=1)
+        drawn = np.argpartition(keys, missing - 1, axis=1)[:, :missing]
+        runout = np.concatenate([np.broadcast_to(board_ids, (size, len(board_ids))), drawn], axis=1)
+
+        strengths = np.stack([HandEvaluator.evaluate_batch(hero_hole, runout),
+                              HandEvaluator.evaluate_batch(villain_hole, runout)])
+        result.add(size, *tally_showdowns(strengths))
+    return result
@@ -0,0 +1,150 @@
+"""
+In-process counters, gauges and histograms for the server, rendered in the
+Prometheus text format.
+
+Metrics are off unless the server enables them. While off, every recording
+call returns after checking one attribute and timers are a shared no-op
+context manager, so instrumented hot paths cost next to nothing.
+"""
+from typing import Callable, Dict, List, Sequence, Tuple
+from bisect import bisect_left
+import time
+
+# Upper bounds in seconds, from sub-millisecond handlers to stalled ones
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Upper bounds in bytes for message payloads
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Bucketed observations with their count and sum"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('histogram', 'clock', 'start')
+
+    def __init__(self, histogram: Histogram, clock: Callable[[], float]):
+        self.histogram = histogram
+        self.clock = clock
+
+    def __enter__(self):
+        self.start = self.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(self.clock() - self.start)
+        return False
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format(name: str, labels: Labels, value: float) -> str:
+    if labels:
+        name += '{' + ','.join('%s="%s"' % (key, text.replace('\\', '\\\\').replace('"', '\\"'))
+                               for key, text in labels) + '}'
+    return '%s %s' % (name, repr(float(value)) if isinstance(value, float) else value)
+
+
+class Metrics:
+    """Registry of every metric the server records"""
+
+    def __init__(self, enabled: bool = False, clock: Callable[[], float] = time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.levels: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def adjust(self, name: str, delta: float, **labels):
+        """Move a gauge that is kept up to date as it changes"""
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        self.levels[key] = self.levels.get(key, 0) + delta
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        """Gauge whose value is read from `read` whenever metrics are rendered"""
+        self.gauges[name] = read
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS, **labels) -> Histogram:
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        return histogram
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels):
+        """Record one value in a histogram"""
+        if not self.enabled:
+            return
+        self.histogram(name, buckets, **labels).observe(value)
+
+    def timer(self, name: str, **labels):
+        """Context manager recording how long its block takes, in seconds"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(name, **labels), self.clock)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        lines: List[str] = []
+        typed = set()
+
+        def declare(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append('# TYPE %s %s' % (name, kind))
+
+        for (name, labels), value in sorted(self.counters.items()):
+            declare(name, 'counter')
+            lines.append(_format(name, labels, value))
+        for (name, labels), value in sorted(self.levels.items()):
+            declare(name, 'gauge')
+            lines.append(_format(name, labels, value))
+        for name, read in sorted(self.gauges.items()):
+            declare(name, 'gauge')
+            lines.append(_format(name, (), read()))
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(_format(name + '_bucket', labels + (('le', le),), cumulative))
+            lines.append(_format(name + '_sum', labels, histogram.sum))
+            lines.append(_format(name + '_count', labels, histogram.count))
+        return '\n'.join(lines) + '\n'
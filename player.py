@@ -16,7 +16,7 @@ class Player:
     
     def place_bet(self, amount: int) -> int:
         """Place a bet and return the actual amount bet"""
-        if amount > self.chips:
+        if amount >= self.chips:
             amount = self.chips
             self.is_all_in = True
         
@@ -1,14 +1,19 @@
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from card import Card, Deck
 from player import Player
 from hand_evaluator import HandEvaluator
 
 class PokerGame:
-    def __init__(self, players: List[Player], small_blind: int = 5, big_blind: int = 10):
+    def __init__(self, players: List[Player], small_blind: int = 5, big_blind: int = 10,
+                 deck: Optional[Deck] = None):
         self.players = players
-        self.deck = Deck()
+        self.deck = deck if deck is not None else Deck()
         self.community_cards: List[Card] = []
         self.pot = 0
+        # Chips each seat has put in this hand, and chips left behind by
+        # players who were removed mid-hand; together they make up the pot
+        self.contributions: List[int] = [0] * len(players)
+        self.dead_money = 0
         self.small_blind = small_blind
         self.big_blind = big_blind
         self.dealer_position = 0
@@ -20,95 +25,274 @@ class PokerGame:
         self.last_aggressive_actor_index = None
         self.current_betting_round = 0
         self.first_actor_index = 0
+        # Bumped on every state change so views of the game can be cached
+        self.version = 0
+        # Called as listener(game, event, details) after each state transition
+        self.listeners: List[Callable[['PokerGame', str, Dict], None]] = []
+        # Indexes kept up to date action by action, so no action rescans the table:
+        # bit i of acting_mask is set while seat i can still act (not folded or
+        # all-in), and of matched_mask while seat i's bet equals the highest bet
+        self.acting_mask = 0
+        self.matched_mask = 0
+        # Bit i is set once seat i has acted since the last full raise; such a
+        # seat may call or fold but not raise, so a short all-in does not
+        # reopen the betting
+        self.acted_mask = 0
+        self.seats: Dict[str, int] = {}  # player name -> seat index
+        self.rebuild_indexes()
 
-    def start_hand(self):
-        """Start a new hand"""
-        self.deck.reset()
+    def rebuild_indexes(self):
+        """Recompute the seat indexes from the players (after editing them directly)"""
+        self.seats = {player.name: i for i, player in enumerate(self.players)}
+        self.highest_bet_in_round = max((p.bet for p in self.players), default=0)
+        self.acting_mask = 0
+        self.matched_mask = 0
+        for i, player in enumerate(self.players):
+            if not player.folded and not player.is_all_in:
+                self.acting_mask |= 1 << i
+            if player.bet == self.highest_bet_in_round:
+                self.matched_mask |= 1 << i
+
+    def add_player(self, player: Player) -> int:
+        """Seat a player at the end of the table and return their seat"""
+        self.players.append(player)
+        self.contributions.append(0)
+        self.rebuild_indexes()
+        self.mark_changed()
+        return len(self.players) - 1
+
+    def remove_player(self, name: str) -> Optional[Player]:
+        """Remove the named player, closing the gap in the seat order"""
+        seat = self.seats.get(name)
+        if seat is None:
+            return None
+        player = self.players.pop(seat)
+        self.dead_money += self.contributions.pop(seat)
+        self.rebuild_indexes()
+
+        # Seats after the removed one move down by one
+        def shift(index: Optional[int]) -> Optional[int]:
+            return index - 1 if index is not None and index > seat else index
+
+        self.acted_mask = self.acted_mask & ((1 << seat) - 1) | self.acted_mask >> (seat + 1) << seat
+        seats = len(self.players) or 1
+        self.dealer_position = shift(self.dealer_position) % seats
+        self.first_actor_index = shift(self.first_actor_index) % seats
+        if self.last_aggressive_actor_index == seat:
+            self.last_aggressive_actor_index = None
+        self.last_aggressive_actor_index = shift(self.last_aggressive_actor_index)
+        if self.current_player_index == seat:
+            # The turn passes to the next seat that can act
+            following = self._next_acting_seat(seat - 1) if self.is_hand_in_progress else None
+            self.current_player_index = seat % seats if following is None else following
+        else:
+            self.current_player_index = shift(self.current_player_index)
+        self.mark_changed()
+        return player
+
+    def seat_of(self, name: str) -> Optional[int]:
+        """Seat index of the named player"""
+        return self.seats.get(name)
+
+    def _next_acting_seat(self, after: int) -> Optional[int]:
+        """First seat that can act after `after`, wrapping around to `after` itself"""
+        mask = self.acting_mask
+        if not mask:
+            return None
+        later = mask >> (after + 1)
+        if later:
+            return after + (later & -later).bit_length()
+        return (mask & -mask).bit_length() - 1
+
+    def _track_bet(self, player_index: int):
+        """Update the indexes after the player's bet or all-in status changed"""
+        player = self.players[player_index]
+        bit = 1 << player_index
+        if player.is_all_in:
+            self.acting_mask &= ~bit
+        if player.bet > self.highest_bet_in_round:
+            self.highest_bet_in_round = player.bet
+            self.matched_mask = bit
+        elif player.bet == self.highest_bet_in_round:
+            self.matched_mask |= bit
+
+    def mark_changed(self):
+        """Record a change made outside PokerGame's own methods (e.g. payouts)"""
+        self.version += 1
+
+    def add_listener(self, listener: Callable[['PokerGame', str, Dict], None]):
+        """
+        Subscribe to game events: 'start_hand' (chips before blinds, deck
+        order), 'action' (seat, action, amount), 'deal' (count) and 'end_hand'
+        (chips after payouts).
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[['PokerGame', str, Dict], None]):
+        self.listeners.remove(listener)
+
+    def _notify(self, event: str, details: Dict):
+        for listener in self.listeners:
+            listener(self, event, details)
+
+    def start_hand(self, deck_order: Optional[List[Card]] = None):
+        """
+        Start a new hand, optionally from a given deck order (used when
+        replaying). Players without chips sit the hand out.
+        """
+        if sum(1 for player in self.players if player.chips > 0) < 2:
+            raise ValueError("At least two players with chips are needed")
+        self.version += 1
+        if deck_order is None:
+            self.deck.reset()
+        else:
+            self.deck.set_order(deck_order)
+        if self.listeners:
+            self.deck.fix_order()  # listeners record the full deck order
+            details = {
+                'players': [(p.name, p.chips) for p in self.players],
+                'dealer_position': self.dealer_position,
+                'small_blind': self.small_blind,
+                'big_blind': self.big_blind,
+                'deck': list(self.deck.cards),
+            }
         self.community_cards = []
         self.pot = 0
+        self.contributions = [0] * len(self.players)
+        self.dead_money = 0
         self.actions_taken = 0
+        self.acted_mask = 0
         self.last_aggressive_actor_index = None
         self.current_betting_round = 0
-        self.highest_bet_in_round = self.big_blind
         for player in self.players:
             player.clear_hand()
+            if player.chips == 0:
+                player.folded = True  # busted: sits out, so never contests a pot
 
-        # Post blinds
-        if len(self.players) == 2:
-            sb_pos = self.dealer_position
-            bb_pos = (self.dealer_position + 1) % 2
-        else:
-            sb_pos = (self.dealer_position + 1) % len(self.players)
-            bb_pos = (self.dealer_position + 2) % len(self.players)
+        # Post blinds, skipping players who sit out
+        sb_pos, bb_pos, heads_up = self.blind_seats()
 
-        self.players[sb_pos].place_bet(self.small_blind)
-        self.players[bb_pos].place_bet(self.big_blind)
-        self.pot = self.small_blind + self.big_blind
+        # A short stack posts what it has, so only the chips actually posted count
+        self.contributions[sb_pos] = self.players[sb_pos].place_bet(self.small_blind)
+        self.contributions[bb_pos] = self.players[bb_pos].place_bet(self.big_blind)
+        self.pot = self.contributions[sb_pos] + self.contributions[bb_pos]
+        self.rebuild_indexes()
 
         # Deal cards
         for player in self.players:
-            player.receive_cards(self.deck.deal(2))
+            if not player.folded:
+                player.receive_cards(self.deck.deal(2))
 
         # Set first to act
-        if len(self.players) == 2:
+        if heads_up:
             self.current_player_index = sb_pos
-            self.first_actor_index = sb_pos
         else:
-            self.current_player_index = (bb_pos + 1) % len(self.players)
-            self.first_actor_index = (bb_pos + 1) % len(self.players)
+            self.current_player_index = self._next_live_seat(bb_pos)
+        self.first_actor_index = self.current_player_index
 
         self.is_hand_in_progress = True
+        if self.listeners:
+            self._notify('start_hand', details)
+
+    def _live_seats(self) -> int:
+        """Seats playing this hand: everyone but busted players sitting it out"""
+        return sum(1 for seat, player in enumerate(self.players) if player.chips or self.contributions[seat])
+
+    def blind_seats(self) -> Tuple[int, int, bool]:
+        """(small blind seat, big blind seat, heads-up) of the current hand, counting live seats only"""
+        heads_up = self._live_seats() == 2
+        sb_pos = self._next_live_seat(self.dealer_position - 1 if heads_up else self.dealer_position)
+        return sb_pos, self._next_live_seat(sb_pos), heads_up
+
+    def _next_live_seat(self, after: int) -> int:
+        """First seat after `after` dealt into the hand being started (busted seats are folded)"""
+        seats = len(self.players)
+        for step in range(1, seats + 1):
+            if not self.players[(after + step) % seats].folded:
+                return (after + step) % seats
+        return after % seats
 
     def deal_community_cards(self, count: int):
         """Deal community cards"""
+        self.version += 1
         self.community_cards.extend(self.deck.deal(count))
+        if self.listeners:
+            self._notify('deal', {'count': count})
         self.actions_taken = 0
+        self.acted_mask = 0
         self.last_aggressive_actor_index = None
         self.current_betting_round += 1
         self.highest_bet_in_round = 0
         for player in self.players:
             player.bet = 0
+        self.matched_mask = (1 << len(self.players)) - 1
 
         # Set first to act post-flop
-        if len(self.players) == 2:
-            bb_pos = (self.dealer_position + 1) % 2
+        _, bb_pos, heads_up = self.blind_seats()
+        if heads_up:
             self.current_player_index = bb_pos
             self.first_actor_index = bb_pos
         else:
-            self.current_player_index = (self.dealer_position + 1) % len(self.players)
+            start = (self.dealer_position + 1) % len(self.players)
+            # Skip folded and all-in seats; when nobody can act the board is
+            # simply run out
+            seat = self._next_acting_seat(start - 1)
+            self.current_player_index = start if seat is None else seat
             self.first_actor_index = self.current_player_index
-            while self.players[self.current_player_index].folded or self.players[self.current_player_index].is_all_in:
-                self.current_player_index = (self.current_player_index + 1) % len(self.players)
-                self.first_actor_index = self.current_player_index
 
     def next_player(self) -> Optional[Player]:
         """Move to the next active player"""
+        self.version += 1
         self.actions_taken += 1
-        start_index = self.current_player_index
-        while True:
-            self.current_player_index = (self.current_player_index + 1) % len(self.players)
-            player = self.players[self.current_player_index]
+        seat = self._next_acting_seat(self.current_player_index)
+        if seat is None:
+            return None
+        self.current_player_index = seat
+        return self.players[seat]
 
-            if not player.folded and not player.is_all_in:
-                return player
+    def amount_to_call(self, player_index: int) -> int:
+        """Chips the player must add to match the highest bet"""
+        return self.highest_bet_in_round - self.players[player_index].bet
+
+    def min_raise(self, player_index: int) -> int:
+        """Smallest total bet the player may raise to, unless going all in for less"""
+        highest_bet = self.highest_bet_in_round
+        min_raise = highest_bet + (highest_bet - self.players[player_index].bet)
+        if self.current_betting_round == 0 and highest_bet == self.big_blind:
+            min_raise = self.big_blind
+        # A raise adds at least a big blind, so it is never just a check or call
+        return max(min_raise, highest_bet + self.big_blind)
 
-            if self.current_player_index == start_index:
-                return None
+    def can_raise(self, player_index: int) -> bool:
+        """Whether the betting is open to the player and they have chips beyond a call"""
+        player = self.players[player_index]
+        return not self.acted_mask >> player_index & 1 and player.chips > self.amount_to_call(player_index)
 
     def process_action(self, player_index: int, action: str, amount: int = 0) -> bool:
         """Process a player's action (fold, call, check, raise)"""
+        if not self._apply_action(player_index, action, amount):
+            return False
+        if self.listeners:
+            self._notify('action', {'seat': player_index, 'action': action, 'amount': amount})
+        return True
+
+    def _apply_action(self, player_index: int, action: str, amount: int) -> bool:
         player = self.players[player_index]
         if player.folded or player.is_all_in or player_index != self.current_player_index:
             return False
 
-        highest_bet = max(p.bet for p in self.players) if self.players else 0
+        highest_bet = self.highest_bet_in_round
+        bit = 1 << player_index
 
         if action == "fold":
             player.fold()
+            self.acting_mask &= ~bit
+            self.acted_mask |= bit
             self.next_player()
             return True
         elif action == "check":
             if player.bet == highest_bet:
+                self.acted_mask |= bit
                 self.next_player()
                 return True
             return False
@@ -119,20 +303,25 @@ class PokerGame:
                 player.is_all_in = True
             player.place_bet(amount_to_call)
             self.pot += amount_to_call
+            self.contributions[player_index] += amount_to_call
+            self._track_bet(player_index)
+            self.acted_mask |= bit
             self.next_player()
             return True
         elif action == "raise":
-            min_raise = highest_bet + (highest_bet - player.bet)
-            if self.current_betting_round == 0 and highest_bet == self.big_blind:
-                min_raise = self.big_blind
-            if amount < min_raise:
+            if amount > player.chips + player.bet or amount <= highest_bet or not self.can_raise(player_index):
                 return False
-            if amount > player.chips + player.bet:
+            # Going all in for less than a full raise is allowed, but it does
+            # not let the players who already acted raise again
+            full_raise = amount >= self.min_raise(player_index)
+            if not full_raise and amount < player.chips + player.bet:
                 return False
             bet_increase = amount - player.bet
             player.place_bet(bet_increase)
             self.pot += bet_increase
-            self.highest_bet_in_round = player.bet
+            self.contributions[player_index] += bet_increase
+            self._track_bet(player_index)
+            self.acted_mask = bit if full_raise else self.acted_mask | bit
             self.last_aggressive_actor_index = player_index
             self.next_player()
             return True
@@ -140,29 +329,33 @@ class PokerGame:
 
     def is_betting_round_complete(self) -> bool:
         """Check if the current betting round is complete"""
-        active_players = [p for p in self.players if not p.folded and not p.is_all_in]
-        if len(active_players) <= 1:
-            return True
-
-        highest_bet = max(p.bet for p in self.players) if self.players else 0
-        all_matched_or_all_in = all(p.bet == highest_bet or p.is_all_in for p in active_players)
-
-        if not all_matched_or_all_in:
+        # A player still facing a bet must answer it, even when everyone
+        # else is all-in
+        if self.acting_mask & ~self.matched_mask:
             return False
 
+        acting = self.acting_mask.bit_count()
+        if acting <= 1:
+            return True
+
         if self.last_aggressive_actor_index is None:
-            return self.actions_taken >= len(active_players)
-        else:
-            return self.current_player_index == self.last_aggressive_actor_index
+            return self.actions_taken >= acting
+        # An all-in raiser never acts again: the round is over once everyone
+        # who can still act has matched the raise (checked above)
+        if not self.acting_mask >> self.last_aggressive_actor_index & 1:
+            return True
+        return self.current_player_index == self.last_aggressive_actor_index
 
     def end_hand(self):
         """End the current hand and move the dealer button"""
+        self.version += 1
+        if self.listeners:
+            self._notify('end_hand', {'chips': [p.chips for p in self.players]})
         self.dealer_position = (self.dealer_position + 1) % len(self.players)
         self.is_hand_in_progress = False
         self.actions_taken = 0
         self.last_aggressive_actor_index = None
         self.current_betting_round = 0
-        self.highest_bet_in_round = 0
 
     def get_active_players(self) -> List[Player]:
         """Get list of players who haven't folded"""
@@ -174,12 +367,13 @@ class PokerGame:
         if not active_players:
             return []
 
-        evaluated_hands = []
-        for player in active_players:
-            rank, kickers = HandEvaluator.evaluate_hand(player.hand, self.community_cards)
-            evaluated_hands.append((player, rank, kickers))
+        strengths = [
+            (HandEvaluator.evaluate_strength(player.hand, self.community_cards), player)
+            for player in active_players
+        ]
+        strengths.sort(key=lambda x: x[0], reverse=True)
 
-        return sorted(evaluated_hands, key=lambda x: (x[1], x[2]), reverse=True)
+        return [(player, *HandEvaluator.decode_strength(strength)) for strength, player in strengths]
 
     def get_winners(self) -> List[Player]:
         """Get list of winning players (handles ties)"""
@@ -191,4 +385,74 @@ class PokerGame:
         highest_kickers = evaluated_hands[0][2]
 
         return [player for player, rank, kickers in evaluated_hands
-                if rank == highest_rank and kickers == highest_kickers]
\ No newline at end of file
+                if rank == highest_rank and kickers == highest_kickers]
+
+    def side_pots(self) -> List[Tuple[int, List[int]]]:
+        """
+        Split the chips in the middle into the main pot and side pots, as
+        (amount, seats that can win it) from the main pot up. Each layer holds
+        what every contributor put in between two all-in levels; folded seats
+        feed the pots but cannot win them.
+        """
+        order = sorted(range(len(self.players)), key=lambda seat: self.contributions[seat], reverse=True)
+        eligible: List[int] = []
+        layers: List[Tuple[int, int]] = []  # (amount, number of eligible seats), top layer first
+        carry = 0
+        i = 0
+        while i < len(order) and self.contributions[order[i]]:
+            level = self.contributions[order[i]]
+            while i < len(order) and self.contributions[order[i]] == level:
+                if not self.players[order[i]].folded:
+                    eligible.append(order[i])
+                i += 1
+            below = self.contributions[order[i]] if i < len(order) else 0
+            amount = (level - below) * i + carry
+            if not eligible:
+                carry = amount  # only folded seats put this much in; it falls to the pot below
+            elif layers and layers[-1][1] == len(eligible):
+                layers[-1] = (layers[-1][0] + amount, len(eligible))
+                carry = 0
+            else:
+                layers.append((amount, len(eligible)))
+                carry = 0
+        if layers:
+            amount, count = layers[-1]
+            layers[-1] = (amount + carry + self.dead_money, count)
+        return [(amount, eligible[:count]) for amount, count in reversed(layers)]
+
+    def pay_out(self) -> List[Tuple[int, List[Player], Optional[int]]]:
+        """
+        Award every pot and return (amount, winners, winning strength) for
+        each, main pot first; the strength is None when nobody else was left
+        in the hand. Each hand is evaluated once and reused across all pots,
+        so call this once the board is complete. A pot that does not split
+        evenly gives its odd chips to the winners closest to the left of the
+        dealer.
+        """
+        in_hand = [seat for seat, player in enumerate(self.players)
+                   if not player.folded and self.contributions[seat]]
+        strengths: Dict[int, int] = {}
+        if len(in_hand) > 1:
+            strengths = {seat: HandEvaluator.evaluate_strength(self.players[seat].hand, self.community_cards)
+                         for seat in in_hand}
+
+        seats = len(self.players)
+        results = []
+        for amount, eligible in self.side_pots():
+            best = max(strengths[seat] for seat in eligible) if strengths else None
+            winners = [seat for seat in eligible if best is None or strengths[seat] == best]
+            winners.sort(key=lambda seat: (seat - self.dealer_position - 1) % seats)
+            share, odd_chips = divmod(amount, len(winners))
+            for position, seat in enumerate(winners):
+                self.players[seat].chips += share + (1 if position < odd_chips else 0)
+            results.append((amount, [self.players[seat] for seat in winners], best))
+
+        self.clear_pot()
+        return results
+
+    def clear_pot(self):
+        """Empty the pot once its chips have been handed out"""
+        self.pot = 0
+        self.contributions = [0] * len(self.players)
+        self.dead_money = 0
+        self.mark_changed()
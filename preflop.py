@@ -0,0 +1,207 @@
+from typing import List, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import numpy as np
+from canonical import SUIT_PERMUTATIONS, permute_suits
+from card import Card
+from equity import simulate_runouts
+
+# Heads-up preflop equity tables.
+#
+# File layout (little-endian): a 16-byte header of magic, version, sample
+# count and reserved word, then the 169 x 169 starting-hand class matrix,
+# then the 1326 x 1326 hole-card combo matrix. Every entry is a uint16 equity
+# scaled by EQUITY_SCALE; NO_EQUITY marks combos that share a card.
+MAGIC = b'PFEQ'
+VERSION = 1
+HEADER = np.dtype([('magic', 'S4'), ('version', '<u4'), ('samples', '<u4'), ('reserved', '<u4')])
+EQUITY_SCALE = 65534
+NO_EQUITY = 65535
+CLASSES = 169
+COMBOS = 1326
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_equity.bin')
+
+VALUE_CHARS = '23456789TJQKA'
+
+# All two-card combos, indexed so that combo_index(a, b) == b * (b - 1) // 2 + a for a < b
+COMBO_CARDS: List[Tuple[int, int]] = [(a, b) for b in range(52) for a in range(b)]
+
+
+def combo_index(first: Card, second: Card) -> int:
+    """Index of a two-card combo in the 1326-combo ordering, in either card order"""
+    a, b = (int(first), int(second)) if first < second else (int(second), int(first))
+    return b * (b - 1) // 2 + a
+
+
+def hand_class(first: Card, second: Card) -> int:
+    """
+    Index of the starting-hand class in the usual 13 x 13 grid: pairs on the
+    diagonal, suited hands at (high, low) and offsuit hands at (low, high).
+    """
+    high, low = (first >> 2, second >> 2) if first >> 2 >= second >> 2 else (second >> 2, first >> 2)
+    if high != low and first & 3 == second & 3:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_name(index: int) -> str:
+    """Name of a starting-hand class, e.g. 'AKs', 'AKo' or 'QQ'"""
+    row, col = divmod(index, 13)
+    if row == col:
+        return VALUE_CHARS[row] * 2
+    if row > col:
+        return f"{VALUE_CHARS[row]}{VALUE_CHARS[col]}s"
+    return f"{VALUE_CHARS[col]}{VALUE_CHARS[row]}o"
+
+
+def class_index(name: str) -> int:
+    """Inverse of class_name"""
+    high, low = VALUE_CHARS.index(name[0].upper()), VALUE_CHARS.index(name[1].upper())
+    if high < low:
+        high, low = low, high
+    if high == low:
+        return high * 13 + high
+    if name[2:].lower() == 's':
+        return high * 13 + low
+    if name[2:].lower() == 'o':
+        return low * 13 + high
+    raise ValueError(f"Non-pair hand classes need an 's' or 'o' suffix: {name!r}")
+
+
+def _permuted_combos() -> np.ndarray:
+    """(24, 1326) array mapping each combo to its image under every suit permutation"""
+    images = np.empty((len(SUIT_PERMUTATIONS), COMBOS), dtype=np.intp)
+    for p, perm in enumerate(SUIT_PERMUTATIONS):
+        for i, (a, b) in enumerate(COMBO_CARDS):
+            images[p, i] = combo_index(permute_suits(a, perm), permute_suits(b, perm))
+    return images
+
+
+def canonical_matchups() -> Tuple[List[Tuple[int, int]], np.ndarray]:
+    """
+    One representative (hero, villain) combo pair per suit-isomorphism class,
+    plus the permuted-combo table needed to expand each back to all its images.
+    """
+    images = _permuted_combos()
+    cards = [set(pair) for pair in COMBO_CARDS]
+    seen = np.zeros((COMBOS, COMBOS), dtype=bool)
+    representatives = []
+    for hero in range(COMBOS):
+        for villain in range(COMBOS):
+            if seen[hero, villain] or cards[hero] & cards[villain]:
+                continue
+            representatives.append((hero, villain))
+            seen[images[:, hero], images[:, villain]] = True
+            seen[images[:, villain], images[:, hero]] = True
+    return representatives, images
+
+
+def _simulate_matchups(matchups: List[Tuple[int, int]], samples: int, seeds) -> List[float]:
+    """Monte Carlo equity of the hero combo in each matchup"""
+    results = []
+    for (hero, villain), seed in zip(matchups, seeds):
+        hands = [list(COMBO_CARDS[hero]), list(COMBO_CARDS[villain])]
+        known = set(hands[0] + hands[1])
+        remaining = [card for card in range(52) if card not in known]
+        _, _, _, shares, _ = simulate_runouts(hands, [], remaining, samples, seed)
+        results.append(float(shares[0]) / samples)
+    return results
+
+
+def build_preflop_tables(path: str = DEFAULT_PATH, samples: int = 2000,
+                         workers: Optional[int] = None, seed: int = 0) -> str:
+    """
+    Compute both equity tables and write them to `path`.
+    Only one matchup per suit-isomorphism class is simulated; its equity is
+    copied to every suit relabelling and mirrored for the reversed matchup.
+    """
+    representatives, images = canonical_matchups()
+    seeds = np.random.SeedSequence(seed).spawn(len(representatives))
+    workers = workers or os.cpu_count() or 1
+    chunk = -(-len(representatives) // (workers * 8))
+    batches = [(representatives[i:i + chunk], samples, seeds[i:i + chunk])
+               for i in range(0, len(representatives), chunk)]
+    if workers == 1:
+        results = [_simulate_matchups(*batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_matchups, *zip(*batches)))
+    equities = [equity for batch in results for equity in batch]
+
+    combo_matrix = np.full((COMBOS, COMBOS), np.nan)
+    for (hero, villain), equity in zip(representatives, equities):
+        combo_matrix[images[:, hero], images[:, villain]] = equity
+        combo_matrix[images[:, villain], images[:, hero]] = 1.0 - equity
+
+    # Average the combo equities of each class matchup, skipping card conflicts
+    classes = np.array([hand_class(a, b) for a, b in COMBO_CARDS])
+    valid = ~np.isnan(combo_matrix)
+    pair_index = (classes[:, None] * CLASSES + classes[None, :])[valid]
+    totals = np.bincount(pair_index, weights=combo_matrix[valid], minlength=CLASSES * CLASSES)
+    counts = np.bincount(pair_index, minlength=CLASSES * CLASSES)
+    class_matrix = np.divide(totals, counts, out=np.full(totals.shape, np.nan), where=counts > 0)
+
+    header = np.array([(MAGIC, VERSION, samples, 0)], dtype=HEADER)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(_quantize(class_matrix).tobytes())
+        f.write(_quantize(combo_matrix).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _quantize(matrix: np.ndarray) -> np.ndarray:
+    scaled = np.rint(np.nan_to_num(matrix, nan=0.0) * EQUITY_SCALE).astype('<u2')
+    scaled[np.isnan(matrix)] = NO_EQUITY
+    return scaled
+
+
+class PreflopTable:
+    """Memory-mapped heads-up preflop equity lookups"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if len(header) != 1 or header['magic'][0] != MAGIC or header['version'][0] != VERSION:
+            raise ValueError(f"{path} is not a preflop equity table")
+        self.path = path
+        self.samples = int(header['samples'][0])
+        offset = HEADER.itemsize
+        self.classes = np.memmap(path, dtype='<u2', mode='r', offset=offset, shape=(CLASSES, CLASSES))
+        offset += CLASSES * CLASSES * 2
+        self.combos = np.memmap(path, dtype='<u2', mode='r', offset=offset, shape=(COMBOS, COMBOS))
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_PATH, **build_options) -> 'PreflopTable':
+        """Load the table, building it first if the file does not exist yet"""
+        if not os.path.exists(path):
+            build_preflop_tables(path, **build_options)
+        return cls(path)
+
+    def equity(self, hero: Sequence[Card], villain: Sequence[Card]) -> float:
+        """All-in preflop equity of one specific hand against another"""
+        value = int(self.combos[combo_index(*hero), combo_index(*villain)])
+        if value == NO_EQUITY:
+            raise ValueError("Hands share a card")
+        return value / EQUITY_SCALE
+
+    def class_equity(self, hero: Union[str, int], villain: Union[str, int]) -> float:
+        """Average equity of one starting-hand class (e.g. 'AKs') against another"""
+        hero = class_index(hero) if isinstance(hero, str) else hero
+        villain = class_index(villain) if isinstance(villain, str) else villain
+        value = int(self.classes[hero, villain])
+        if value == NO_EQUITY:
+            raise ValueError("Hand classes cannot be dealt together")
+        return value / EQUITY_SCALE
+
+    def hand_class_equity(self, hero: Sequence[Card], villain: Sequence[Card]) -> float:
+        """Class-average equity for the classes of two specific hands"""
+        return self.class_equity(hand_class(*hero), hand_class(*villain))
+
+
+if __name__ == '__main__':
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    runouts = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    print(f"Building preflop equity tables with {runouts} runouts per matchup...")
+    print(f"Wrote {build_preflop_tables(output, runouts)}")
@@ -0,0 +1,168 @@
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import random
+import sys
+import time
+from card import Deck
+from player import Player
+from poker_game import PokerGame
+from bots import Bot, CallingStation, RandomBot
+
+# Safety valve: a hand that needs more actions than this is reported as stalled
+MAX_ACTIONS_PER_HAND = 500
+
+
+class SimulationResult:
+    """Counters collected while simulating hands"""
+
+    def __init__(self, seats: int):
+        self.hands = 0
+        self.actions = 0
+        self.showdowns = 0
+        self.invalid_actions = 0
+        self.stalled_hands = 0
+        self.chip_errors = 0
+        self.seconds = 0.0
+        self.net_chips = [0] * seats
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.seconds if self.seconds else 0.0
+
+    def merge(self, other: 'SimulationResult'):
+        """Add another result's counters into this one"""
+        self.hands += other.hands
+        self.actions += other.actions
+        self.showdowns += other.showdowns
+        self.invalid_actions += other.invalid_actions
+        self.stalled_hands += other.stalled_hands
+        self.chip_errors += other.chip_errors
+        self.seconds = max(self.seconds, other.seconds)
+        self.net_chips = [a + b for a, b in zip(self.net_chips, other.net_chips)]
+
+    def __str__(self):
+        return (f"{self.hands} hands in {self.seconds:.2f}s ({self.hands_per_second:.0f} hands/s), "
+                f"{self.actions} actions, {self.showdowns} showdowns, "
+                f"{self.invalid_actions} invalid actions, {self.stalled_hands} stalled hands, "
+                f"{self.chip_errors} chip conservation errors")
+
+
+def play_hand(game: PokerGame, decide: Callable[[PokerGame, int], Tuple[str, int]], result: SimulationResult):
+    """
+    Play one hand of `game` from blinds to payout, asking decide(game, seat)
+    for every action, and count it in `result`
+    """
+    chips_before = [p.chips for p in game.players]
+    game.start_hand()
+    actions = 0
+    while True:
+        while not game.is_betting_round_complete():
+            if actions >= MAX_ACTIONS_PER_HAND:
+                result.stalled_hands += 1
+                break
+            index = game.current_player_index
+            action, amount = decide(game, index)
+            if not game.process_action(index, action, amount):
+                result.invalid_actions += 1
+                fallback = "check" if game.amount_to_call(index) == 0 else "fold"
+                if not game.process_action(index, fallback):
+                    result.stalled_hands += 1
+                    actions = MAX_ACTIONS_PER_HAND
+                    break
+            actions += 1
+        if actions >= MAX_ACTIONS_PER_HAND:
+            break
+        if len(game.get_active_players()) <= 1 or game.current_betting_round == 3:
+            break
+        game.deal_community_cards(3 if game.current_betting_round == 0 else 1)
+
+    if len(game.get_active_players()) > 1:
+        while len(game.community_cards) < 5:
+            game.deal_community_cards(1 if game.community_cards else 3)
+        result.showdowns += 1
+    game.pay_out()
+    game.end_hand()
+
+    result.hands += 1
+    result.actions += actions
+    for i, player in enumerate(game.players[:len(result.net_chips)]):
+        result.net_chips[i] += player.chips - chips_before[i]
+    if sum(p.chips for p in game.players) != sum(chips_before):
+        result.chip_errors += 1
+
+
+class HandSimulator:
+    """
+    Plays complete hands between bots by driving PokerGame directly,
+    following the same street and payout flow as the Socket.IO server.
+    Busted players are topped back up to the starting stack.
+    """
+
+    def __init__(self, bots: List[Bot], starting_chips: int = 1000,
+                 small_blind: int = 5, big_blind: int = 10, seed: Optional[int] = None):
+        if len(bots) < 2:
+            raise ValueError("At least two bots are required")
+        self.bots = bots
+        self.starting_chips = starting_chips
+        players = [Player(f"Bot {i + 1}", starting_chips) for i in range(len(bots))]
+        # A private generator keeps runs reproducible whatever else uses `random`
+        self.game = PokerGame(players, small_blind, big_blind, Deck(random.Random(seed), partial=True))
+        self.result = SimulationResult(len(bots))
+
+    def play_hand(self):
+        """Play one hand from blinds to payout"""
+        for player in self.game.players:
+            if player.chips == 0:
+                player.chips = self.starting_chips
+        play_hand(self.game, lambda game, index: self.bots[index].decide(game, index), self.result)
+
+    def run(self, hands: int) -> SimulationResult:
+        """Play `hands` hands and return the accumulated result"""
+        start = time.perf_counter()
+        for _ in range(hands):
+            self.play_hand()
+        self.result.seconds += time.perf_counter() - start
+        return self.result
+
+
+def _run_worker(make_bots: Callable[[int], List[Bot]], hands: int, seed: int) -> SimulationResult:
+    return HandSimulator(make_bots(seed), seed=seed).run(hands)
+
+
+def run_parallel(make_bots: Callable[[int], List[Bot]], hands: int,
+                 workers: int = 4, seed: int = 0) -> SimulationResult:
+    """
+    Split `hands` across a process pool. make_bots(seed) builds each
+    worker's lineup and must be picklable (a module-level function).
+    """
+    shares = [hands // workers + (1 if i < hands % workers else 0) for i in range(workers)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_run_worker, [make_bots] * workers, shares,
+                                    [seed + i for i in range(workers)]))
+    merged = SimulationResult(len(results[0].net_chips))
+    for result in results:
+        merged.merge(result)
+    merged.seconds = time.perf_counter() - start
+    return merged
+
+
+def default_lineup(seed: int) -> List[Bot]:
+    """Six-handed table of random bots and calling stations"""
+    return [RandomBot(seed=seed * 10 + i) for i in range(4)] + [CallingStation(), CallingStation()]
+
+
+if __name__ == '__main__':
+    total_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    pool_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    history_path = sys.argv[3] if len(sys.argv) > 3 else None
+    if history_path:
+        from hand_history import HandHistoryWriter
+        simulator = HandSimulator(default_lineup(0), seed=0)
+        with open(history_path, 'w', encoding='utf-8') as history:
+            HandHistoryWriter(history, 'sim').attach(simulator.game)
+            print(simulator.run(total_hands))
+    elif pool_size == 1:
+        print(HandSimulator(default_lineup(0), seed=0).run(total_hands))
+    else:
+        print(run_parallel(default_lineup, total_hands, pool_size))
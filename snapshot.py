@@ -0,0 +1,221 @@
+"""
+Crash-safe snapshots of PokerGame state, so a restarted (or another) server
+process can restore its tables and resume them mid-hand.
+
+Each table is stored as a full snapshot plus a journal of the events since:
+
+    <table>.snap             full game state, replaced atomically
+    <table>-<gen>.journal    hand_log records applied after snapshot <gen>
+
+A snapshot is taken at the start of every hand and whenever seats change;
+actions, deals and hand ends in between are appended to the journal as they
+happen. Restoring loads the snapshot and replays its journal on top.
+"""
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+import glob
+import os
+import struct
+from card import CARDS
+from hand_log import HandReplayer, encode_record, read_records
+from player import Player
+from poker_game import PokerGame
+
+MAGIC = b'PKSN'
+VERSION = 2
+HEAD = struct.Struct('<4sBI')  # magic, format version, journal generation
+GAME = struct.Struct('<IIIIIIIHbbbBBB')
+PLAYER = struct.Struct('<IIIB')
+FOLDED, ALL_IN, ACTED = 1, 2, 4  # ACTED: the seat's bit in PokerGame.acted_mask
+
+
+def _seat(index: Optional[int]) -> int:
+    return -1 if index is None else index
+
+
+def encode_game(game: PokerGame, generation: int = 0) -> bytes:
+    """Serialize the full game, including the undealt deck in order"""
+    parts = [
+        HEAD.pack(MAGIC, VERSION, generation),
+        GAME.pack(game.small_blind, game.big_blind, game.pot, game.dead_money, game.minimum_bet,
+                  game.highest_bet_in_round, game.version, game.actions_taken,
+                  _seat(game.current_player_index), _seat(game.first_actor_index),
+                  _seat(game.last_aggressive_actor_index), game.dealer_position,
+                  game.current_betting_round, game.is_hand_in_progress),
+        bytes([len(game.players)]),
+    ]
+    for seat, (player, contribution) in enumerate(zip(game.players, game.contributions)):
+        name = player.name.encode('utf-8')[:255]
+        flags = ((FOLDED if player.folded else 0) | (ALL_IN if player.is_all_in else 0) |
+                 (ACTED if game.acted_mask >> seat & 1 else 0))
+        parts += [bytes([len(name)]), name, PLAYER.pack(player.chips, player.bet, contribution, flags),
+                  bytes([len(player.hand)]), bytes(int(card) for card in player.hand)]
+    for cards in (game.community_cards, game.deck.cards):
+        parts += [bytes([len(cards)]), bytes(int(card) for card in cards)]
+    return b''.join(parts)
+
+
+def decode_game(data: bytes) -> Tuple[PokerGame, int]:
+    """Rebuild a game from encode_game's output; returns (game, generation)"""
+    magic, version, generation = HEAD.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a game snapshot")
+    (small_blind, big_blind, pot, dead_money, minimum_bet, highest_bet, game_version, actions_taken,
+     current, first_actor, last_aggressor, dealer, betting_round, in_progress) = GAME.unpack_from(data, HEAD.size)
+    offset = HEAD.size + GAME.size
+
+    def cards() -> List:
+        nonlocal offset
+        count = data[offset]
+        offset += 1 + count
+        return [CARDS[card] for card in data[offset - count:offset]]
+
+    players = []
+    contributions = []
+    acted_mask = 0
+    count = data[offset]
+    offset += 1
+    for seat in range(count):
+        length = data[offset]
+        name = data[offset + 1:offset + 1 + length].decode('utf-8', 'replace')
+        offset += 1 + length
+        chips, bet, contribution, flags = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        player = Player(name, chips)
+        player.bet = bet
+        player.folded = bool(flags & FOLDED)
+        player.is_all_in = bool(flags & ALL_IN)
+        if flags & ACTED:
+            acted_mask |= 1 << seat
+        player.hand = cards()
+        players.append(player)
+        contributions.append(contribution)
+
+    game = PokerGame(players, small_blind, big_blind)
+    game.community_cards = cards()
+    game.deck.set_order(cards())
+    game.pot = pot
+    game.contributions = contributions
+    game.dead_money = dead_money
+    game.minimum_bet = minimum_bet
+    game.highest_bet_in_round = highest_bet
+    game.version = game_version
+    game.actions_taken = actions_taken
+    game.current_player_index = None if current < 0 else current
+    game.first_actor_index = None if first_actor < 0 else first_actor
+    game.last_aggressive_actor_index = None if last_aggressor < 0 else last_aggressor
+    game.dealer_position = dealer
+    game.current_betting_round = betting_round
+    game.is_hand_in_progress = bool(in_progress)
+    game.acted_mask = acted_mask
+    game.rebuild_indexes()
+    return game, generation
+
+
+class SnapshotStore:
+    """
+    Directory of table snapshots and journals.
+    Journal records are flushed as they are written, and snapshots are
+    written to a temporary file and renamed into place, so a crash at any
+    point leaves a snapshot whose journal replays cleanly.
+    """
+
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = directory
+        self.fsync = fsync
+        self._generations: Dict[str, int] = {}
+        self._journals: Dict[str, object] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, table_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, quote(table_id, safe='') + suffix)
+
+    def _journal_path(self, table_id: str, generation: int) -> str:
+        return self._path(table_id, f'-{generation}.journal')
+
+    def attach(self, game: PokerGame, table_id: str):
+        """Snapshot the game now and keep it saved as it changes"""
+
+        def listener(_game: PokerGame, event: str, details: Dict):
+            if event == 'start_hand':
+                self.save(table_id, game)
+            else:
+                self._append(table_id, encode_record(0, event, details))
+
+        game.add_listener(listener)
+        self.save(table_id, game)
+
+    def save(self, table_id: str, game: PokerGame):
+        """Write a full snapshot and start a new, empty journal"""
+        old_generation = self._generations.get(table_id, 0)
+        generation = old_generation + 1
+        path = self._path(table_id, '.snap')
+        with open(path + '.tmp', 'wb') as f:
+            f.write(encode_game(game, generation))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        self._generations[table_id] = generation
+        self._close_journal(table_id)
+        self._remove(self._journal_path(table_id, old_generation))
+
+    def _append(self, table_id: str, record: bytes):
+        journal = self._journals.get(table_id)
+        if journal is None:
+            generation = self._generations.get(table_id, 0)
+            journal = self._journals[table_id] = open(self._journal_path(table_id, generation), 'ab')
+        journal.write(record)
+        journal.flush()
+        if self.fsync:
+            os.fsync(journal.fileno())
+
+    def _close_journal(self, table_id: str):
+        journal = self._journals.pop(table_id, None)
+        if journal is not None:
+            journal.close()
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def release(self, table_id: str):
+        """Stop writing a table that another process takes over, keeping its files"""
+        self._close_journal(table_id)
+        self._generations.pop(table_id, None)
+
+    def discard(self, table_id: str):
+        """Forget a table that no longer has a game"""
+        self._close_journal(table_id)
+        for path in glob.glob(glob.escape(self._path(table_id, '')) + '-*.journal'):
+            self._remove(path)
+        self._remove(self._path(table_id, '.snap'))
+        self._generations.pop(table_id, None)
+
+    def load(self, table_id: str) -> Optional[PokerGame]:
+        """Restore a table's game from its snapshot and journal"""
+        path = self._path(table_id, '.snap')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            game, generation = decode_game(f.read())
+        self._generations[table_id] = max(generation, self._generations.get(table_id, 0))
+        journal = self._journal_path(table_id, generation)
+        if os.path.exists(journal):
+            replayer = HandReplayer()
+            replayer.games[0] = game
+            for _, event, details in read_records([journal]):
+                replayer.apply(0, event, details)
+        return game
+
+    def table_ids(self) -> List[str]:
+        """Every table with a stored snapshot"""
+        return sorted(unquote(os.path.basename(path)[:-len('.snap')])
+                      for path in glob.glob(os.path.join(self.directory, '*.snap')))
+
+    def close(self):
+        for table_id in list(self._journals):
+            self._close_journal(table_id)
@@ -0,0 +1,96 @@
+from typing import Any, Dict, Optional
+
+# A patch maps each changed key of a dict (or index of a list, as a string)
+# to one operation:
+#   ['=', value]     replace the value
+#   ['+', [items]]   append items to a list
+#   ['~', patch]     apply a nested patch to a dict or list
+#   ['-']            delete the key
+# static/game.js applies the same format in applyPatch().
+Patch = Dict[str, list]
+
+
+def diff(old: Any, new: Any) -> Optional[Patch]:
+    """Patch that turns dict or list `old` into `new`, or None if they are equal"""
+    patch: Patch = {}
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                patch[key] = ['=', value]
+            elif old[key] != value:
+                patch[key] = _diff_value(old[key], value)
+        for key in old:
+            if key not in new:
+                patch[key] = ['-']
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for i, (before, after) in enumerate(zip(old, new)):
+            if before != after:
+                patch[str(i)] = _diff_value(before, after)
+    else:
+        raise TypeError("diff() needs two dicts or two lists of equal length")
+    return patch or None
+
+
+def _diff_value(old: Any, new: Any) -> list:
+    if isinstance(old, dict) and isinstance(new, dict):
+        return ['~', diff(old, new)]
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) > len(old) and new[:len(old)] == old:
+            return ['+', new[len(old):]]
+        if len(new) == len(old):
+            return ['~', diff(old, new)]
+    return ['=', new]
+
+
+def apply_patch(state: Any, patch: Patch) -> Any:
+    """Apply a patch in place; the server-side twin of applyPatch() in static/game.js"""
+    for key, op in patch.items():
+        index = int(key) if isinstance(state, list) else key
+        if op[0] == '=':
+            state[index] = op[1]
+        elif op[0] == '+':
+            state[index].extend(op[1])
+        elif op[0] == '~':
+            apply_patch(state[index], op[1])
+        elif op[0] == '-':
+            del state[index]
+    return state
+
+
+class StateSync:
+    """
+    Versioned game state for one table.
+    Every published state gets the next sequence number. Clients that hold
+    the previous version apply the patch; clients that see a gap, or that
+    just connected, ask for the full snapshot instead.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.state: Optional[Dict] = None
+
+    def publish(self, state: Optional[Dict]) -> Optional[Dict]:
+        """
+        Record a new state and return the patch message for it, or None when a
+        full snapshot must be sent instead (no previous state, or game reset).
+        The state must not be mutated afterwards. An unchanged state keeps its
+        sequence number and yields an empty patch that need not be sent.
+        """
+        previous = self.state
+        if state is previous and state is not None:
+            return {'seq': self.seq, 'changes': {}}
+        if previous is not None and state is not None:
+            changes = diff(previous, state)
+            if changes is None:
+                return {'seq': self.seq, 'changes': {}}
+        self.seq += 1
+        self.state = state
+        if previous is None or state is None:
+            return None
+        return {'seq': self.seq, 'changes': changes}
+
+    def snapshot(self) -> Optional[Dict]:
+        """Full copy of the latest state, stamped with its sequence number"""
+        if self.state is None:
+            return None
+        return dict(self.state, seq=self.seq)
@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional, Tuple
+from card import CARDS
+from poker_game import PokerGame
+
+# JSON form of every card, built once and shared by all states
+CARD_JSON = tuple({'suit': card.suit.name, 'value': card.value} for card in CARDS)
+
+
+def public_state(game: PokerGame) -> Optional[Dict]:
+    """
+    Table state that every observer may see. Opponents' hole cards are sent
+    as nulls (face down) while the hand is live and revealed at showdown.
+    """
+    if not game:
+        return None
+
+    showdown = not game.is_hand_in_progress and len(game.get_active_players()) > 1
+    return {
+        'pot': game.pot,
+        'community_cards': [CARD_JSON[card] for card in game.community_cards],
+        'players': [
+            {
+                'name': player.name,
+                'chips': player.chips,
+                'bet': player.bet,
+                'hand': [] if player.folded else
+                        [CARD_JSON[card] for card in player.hand] if showdown else
+                        [None] * len(player.hand),
+                'is_current': i == game.current_player_index
+            }
+            for i, player in enumerate(game.players)
+        ],
+        'dealer_position': game.dealer_position,
+        'current_player_index': game.current_player_index,
+        'minimum_bet': game.minimum_bet
+    }
+
+
+def private_state(game: PokerGame, seat: int) -> Dict:
+    """The part of the state only the player in `seat` may see"""
+    return {'seat': seat, 'hand': [CARD_JSON[card] for card in game.players[seat].hand]}
+
+
+class StateView:
+    """
+    Per-table cache of the serialized views.
+    The public state is rebuilt only when PokerGame.version moves, so every
+    recipient and every resync of one version share a single dict; only the
+    small private part is built per seat.
+    """
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._game: Optional[PokerGame] = None
+        self._public: Optional[Dict] = None
+        self._private: Dict[int, Dict] = {}
+        self._sent: Dict[str, Dict] = {}  # sid -> private state last sent to it
+
+    def public_state(self, game: Optional[PokerGame]) -> Optional[Dict]:
+        if game is not self._game or game is None or game.version != self._version:
+            self._game = game
+            self._version = game.version if game else None
+            self._public = public_state(game)
+            self._private = {}
+        return self._public
+
+    def private_state(self, game: PokerGame, seat: int) -> Dict:
+        self.public_state(game)
+        private = self._private.get(seat)
+        if private is None:
+            private = self._private[seat] = private_state(game, seat)
+        return private
+
+    def view_for(self, game: Optional[PokerGame], seat: Optional[int]) -> Optional[Dict]:
+        """Full state as seen from one seat (or by an observer when seat is None)"""
+        public = self.public_state(game)
+        if public is None or seat is None:
+            return public
+        return dict(public, private=self.private_state(game, seat))
+
+    def private_updates(self, game: PokerGame, players: Dict[str, str]) -> List[Tuple[str, Dict]]:
+        """
+        (sid, private state) pairs for every seated socket whose private state
+        differs from the one it was last sent.
+        """
+        updates = []
+        for sid, name in players.items():
+            seat = game.seat_of(name)
+            if seat is None:
+                continue
+            private = self.private_state(game, seat)
+            if self._sent.get(sid) != private:
+                self._sent[sid] = private
+                updates.append((sid, private))
+        return updates
+
+    def mark_sent(self, sid: str, private: Optional[Dict]):
+        """Record the private state included in a full snapshot sent to `sid`"""
+        if private is None:
+            self._sent.pop(sid, None)
+        else:
+            self._sent[sid] = private
@@ -6,8 +6,15 @@ const socket = io({
 });
 
 let playerName = '';
+// Table to join, taken from the page URL (e.g. /?table=high-stakes)
+const tableId = new URLSearchParams(window.location.search).get('table') || 'main';
 let isMyTurn = false;
 let isGameStarted = false;
+// Latest full game state and its sequence number, kept in sync by patches
+let currentState = null;
+let lastSeq = 0;
+// This client's seat and hole cards, sent only to us
+let privateState = null;
 
 // Debug logging
 function log(message) {
@@ -21,6 +28,7 @@ const gameControlsLobby = document.getElementById('game-controls-lobby');
 const gameMessages = document.getElementById('game-messages');
 const playerList = document.getElementById('player-list');
 const startGameBtn = document.getElementById('start-game-btn');
+const addBotBtn = document.getElementById('add-bot-btn');
 const raiseSlider = document.getElementById('raise-slider');
 const raiseAmount = document.getElementById('raise-amount');
 const potAmount = document.getElementById('pot-amount');
@@ -44,6 +52,9 @@ socket.on('connect_error', (error) => {
 
 socket.on('disconnect', () => {
     console.log('Disconnected from server');
+    // Patches sent while offline are lost; wait for a fresh snapshot
+    currentState = null;
+    privateState = null;
     showMessage('Disconnected from server');
     gameControls.style.display = 'none';
     gameControlsLobby.style.display = 'none';
@@ -53,7 +64,7 @@ socket.on('reconnect', (attemptNumber) => {
     console.log('Reconnected after', attemptNumber, 'attempts');
     showMessage('Reconnected to server');
     if (playerName) {
-        socket.emit('join_game', { name: playerName });
+        socket.emit('join_game', { name: playerName, table: tableId });
     }
 });
 
@@ -65,8 +76,8 @@ document.getElementById('login-form').addEventListener('submit', (e) => {
         showMessage('Please enter a name');
         return;
     }
-    console.log(`Attempting to join game as ${playerName}`);
-    socket.emit('join_game', { name: playerName });
+    console.log(`Attempting to join table ${tableId} as ${playerName}`);
+    socket.emit('join_game', { name: playerName, table: tableId });
     loginModal.hide();
 });
 
@@ -75,6 +86,11 @@ startGameBtn.addEventListener('click', () => {
     socket.emit('start_game');
 });
 
+// Add bot button handler: fills an empty seat with a computer player
+addBotBtn.addEventListener('click', () => {
+    socket.emit('add_bot');
+});
+
 // Game control buttons
 document.getElementById('fold-btn').addEventListener('click', () => {
     if (isMyTurn) {
@@ -115,9 +131,51 @@ socket.on('game_state', (state) => {
         return;
     }
     console.log('Valid game state received, updating UI.');
-    updateGameState(state);
+    currentState = state;
+    lastSeq = state.seq;
+    privateState = state.private || null;
+    renderState();
+});
+
+socket.on('private_state', (state) => {
+    console.log('Received private state:', state);
+    privateState = state;
+    if (currentState) {
+        renderState();
+    }
 });
 
+socket.on('game_state_patch', (patch) => {
+    console.log('Received game state patch:', patch);
+    if (!currentState || patch.seq !== lastSeq + 1) {
+        // Missed an update (or never had a snapshot): ask for a full one
+        console.warn(`State sequence gap: have ${lastSeq}, got ${patch.seq}`);
+        socket.emit('sync_state');
+        return;
+    }
+    applyPatch(currentState, patch.changes);
+    lastSeq = patch.seq;
+    renderState();
+});
+
+// Everything the server sent us while handling one batch of table events,
+// as [event, data] pairs: hand each to its usual handler, in order
+socket.on('batch', (messages) => {
+    messages.forEach(([event, data]) => {
+        socket.listeners(event).forEach((handler) => handler(data));
+    });
+});
+
+// Render the shared state with our own hole cards filled in
+function renderState() {
+    const players = currentState.players.map((player, index) =>
+        privateState && index === privateState.seat && player.hand.length > 0
+            ? { ...player, hand: privateState.hand }
+            : player
+    );
+    updateGameState({ ...currentState, players });
+}
+
 socket.on('lobby_update', (players) => {
     console.log('Lobby update received:', players);
     updateLobby(players);
@@ -148,6 +206,28 @@ socket.on('game_message', (message) => {
     showMessage(message);
 });
 
+// Apply a state patch in place (same format as state_sync.py on the server):
+// each key maps to ['=', value], ['+', items], ['~', nestedPatch] or ['-']
+function applyPatch(target, patch) {
+    Object.entries(patch).forEach(([key, op]) => {
+        const index = Array.isArray(target) ? Number(key) : key;
+        switch (op[0]) {
+            case '=':
+                target[index] = op[1];
+                break;
+            case '+':
+                target[index].push(...op[1]);
+                break;
+            case '~':
+                applyPatch(target[index], op[1]);
+                break;
+            case '-':
+                delete target[index];
+                break;
+        }
+    });
+}
+
 // Update game state
 function updateGameState(state) {
     console.log('Executing updateGameState with state:', state);
@@ -250,7 +330,10 @@ function updatePlayers(players, dealerPosition) {
 
 function createCardHTML(card) {
      console.log('Executing createCardHTML for card:', card);
-    if (!card) return ''; // Return empty string for empty slots in player hands
+    if (!card) {
+        // Face-down card: an opponent's hole card before showdown
+        return '<div class="card back"></div>';
+    }
     
     const suitSymbols = {
         'HEARTS': '♥',
@@ -296,15 +379,17 @@ function updateLobby(players) {
         const playerDiv = document.createElement('div');
         playerDiv.className = `player-list-item ${player.ready ? 'ready' : ''}`;
         playerDiv.innerHTML = `
-            <span>${player.name}</span>
+            <span>${player.name}${player.bot ? ' (bot)' : ''}</span>
             <span>${player.ready ? 'Ready' : 'Waiting'}</span>
         `;
         playerList.appendChild(playerDiv);
     });
 
-    // Show start game button if player is the first one and game hasn't started
-    if (!isGameStarted && players.length >= 2 && players[0].name === playerName) {
+    // Show the lobby controls if player is the first one and game hasn't started;
+    // bots can be added alone, but starting needs a second player
+    if (!isGameStarted && players.length >= 1 && players[0].name === playerName) {
         gameControlsLobby.style.display = 'block';
+        startGameBtn.style.display = players.length >= 2 ? '' : 'none';
     } else {
         gameControlsLobby.style.display = 'none';
     }
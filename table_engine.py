@@ -0,0 +1,195 @@
+"""
+Actor-style processing for table events.
+
+Every table gets a mailbox and a single worker that runs the jobs posted to
+it one at a time, so events for one table never interleave and a slow table
+never holds up another. Jobs that arrive together are drained as one batch
+and followed by a single broadcast. While a hand is running the worker also
+keeps a deadline for the player to act, and acts for them (check if free,
+otherwise fold) when it passes.
+
+Given an `emit` function, each table also gets an outbox for the duration
+of a batch: messages sent to its players meanwhile are held there and go
+out together when the batch is done, one frame per recipient (see Outbox).
+
+The engine is independent of the async framework: the server passes in how
+to start a background task and create a queue (Socket.IO's eventlet ones),
+and it defaults to threads and the stdlib queue.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import queue
+import threading
+import time
+from table_manager import Table, TableManager
+
+# A job runs on the table's worker and returns True when the table's state
+# should be broadcast once the current batch is done
+Job = Callable[[], bool]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TURN_TIMEOUT = 30.0
+MAX_BATCH = 64
+IDLE_TIMEOUT = 60.0
+
+
+class Outbox:
+    """
+    Messages for one table's sockets, collected during a batch of jobs.
+    On flush every recipient gets its messages in order as a single 'batch'
+    event of [event, data] pairs (or the message itself when it has just
+    one), and recipients due the same messages share one emit.
+    """
+
+    def __init__(self):
+        self.messages: List[Tuple[str, object]] = []
+        self.recipients: Dict[str, List[int]] = {}  # sid -> indices into messages
+
+    def add(self, event: str, data, sids: Sequence[str]):
+        index = len(self.messages)
+        self.messages.append((event, data))
+        for sid in sids:
+            self.recipients.setdefault(sid, []).append(index)
+
+    def flush(self, emit: Callable[[str, object, List[str]], None]):
+        """Send everything with emit(event, data, sids) and empty the outbox"""
+        groups: Dict[Tuple[int, ...], List[str]] = {}
+        for sid, indices in self.recipients.items():
+            groups.setdefault(tuple(indices), []).append(sid)
+        for indices, sids in groups.items():
+            if len(indices) == 1:
+                emit(*self.messages[indices[0]], sids)
+            else:
+                emit('batch', [list(self.messages[i]) for i in indices], sids)
+        self.messages = []
+        self.recipients = {}
+
+
+def _spawn_thread(target: Callable, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+class TableEngine:
+    """Mailboxes and workers for every table in a TableManager"""
+
+    def __init__(self, tables: TableManager,
+                 on_batch: Callable[[Table], None],
+                 on_timeout: Callable[[Table, int], None],
+                 turn_timeout: float = DEFAULT_TURN_TIMEOUT,
+                 spawn: Callable = _spawn_thread,
+                 create_queue: Callable = queue.Queue,
+                 queue_empty: type = queue.Empty,
+                 clock: Callable[[], float] = time.monotonic,
+                 emit: Optional[Callable[[str, object, List[str]], None]] = None):
+        self.tables = tables
+        self.on_batch = on_batch
+        self.on_timeout = on_timeout
+        self.turn_timeout = turn_timeout
+        self.spawn = spawn
+        self.create_queue = create_queue
+        self.queue_empty = queue_empty
+        self.clock = clock
+        self.emit = emit
+        self.mailboxes: Dict[str, object] = {}
+        self.outboxes: Dict[str, Outbox] = {}  # tables whose batch is running
+        self._lock = threading.Lock()
+
+    def submit(self, table_id: str, job: Job):
+        """Queue a job for a table, starting its worker if it has none"""
+        with self._lock:
+            mailbox = self.mailboxes.get(table_id)
+            if mailbox is None:
+                mailbox = self.mailboxes[table_id] = self.create_queue()
+                self.spawn(self._run, table_id, mailbox)
+            mailbox.put(job)
+
+    def outbox(self, table_id: str) -> Optional[Outbox]:
+        """Where messages for the table's sockets go while its batch runs; None outside one"""
+        return self.outboxes.get(table_id)
+
+    def _turn_key(self, table: Optional[Table]) -> Optional[Tuple]:
+        """Identifies one player's turn; None when nobody is due to act"""
+        game = table.game if table else None
+        if game is None or not game.is_hand_in_progress or game.current_player_index is None:
+            return None
+        return id(game), game.version, game.current_player_index
+
+    def _run(self, table_id: str, mailbox):
+        try:
+            self._serve(table_id, mailbox)
+        finally:
+            # _serve deregisters its mailbox before returning normally. If it
+            # died instead, hand the jobs still queued to a fresh worker rather
+            # than leaving the table stalled behind a dead one.
+            self.outboxes.pop(table_id, None)
+            with self._lock:
+                stranded = self.mailboxes.get(table_id) is mailbox
+                if stranded:
+                    del self.mailboxes[table_id]
+            if stranded:
+                logger.error('Worker for table %s stopped unexpectedly', table_id)
+                while True:
+                    try:
+                        self.submit(table_id, mailbox.get(block=False))
+                    except self.queue_empty:
+                        break
+
+    def _serve(self, table_id: str, mailbox):
+        turn, deadline = None, None
+        while True:
+            wait = IDLE_TIMEOUT if deadline is None else max(0.0, deadline - self.clock())
+            try:
+                batch = [mailbox.get(timeout=wait)]
+            except self.queue_empty:
+                batch = []
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(mailbox.get(block=False))
+                except self.queue_empty:
+                    break
+
+            if self.emit is not None:
+                self.outboxes[table_id] = Outbox()
+            broadcast = False
+            for job in batch:
+                try:
+                    broadcast = job() or broadcast
+                except Exception:
+                    logger.exception('Job failed at table %s', table_id)
+            table = self.tables.get(table_id)
+
+            if not batch and table is not None and deadline is not None and self.clock() >= deadline:
+                if self._turn_key(table) == turn:
+                    try:
+                        self.on_timeout(table, table.game.current_player_index)
+                    except Exception:
+                        logger.exception('Turn timeout failed at table %s', table_id)
+                    broadcast = True
+            try:
+                if broadcast and table is not None:
+                    self.on_batch(table)
+            except Exception:
+                logger.exception('Broadcast failed at table %s', table_id)
+            finally:
+                outbox = self.outboxes.pop(table_id, None)
+                if outbox is not None:
+                    try:
+                        outbox.flush(self.emit)
+                    except Exception:
+                        logger.exception('Sending messages failed at table %s', table_id)
+
+            key = self._turn_key(table)
+            if key != turn:
+                turn = key
+                deadline = None if key is None else self.clock() + self.turn_timeout
+            elif key is not None and deadline is not None and self.clock() >= deadline:
+                deadline = self.clock() + self.turn_timeout  # timeout action was rejected; retry later
+
+            if table is None or (not batch and deadline is None):
+                with self._lock:
+                    if mailbox.empty():
+                        del self.mailboxes[table_id]
+                        return
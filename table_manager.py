@@ -0,0 +1,215 @@
+from typing import Callable, Dict, List, Optional
+import secrets
+from bots import Bot
+from player import Player
+from hand_log import HandLogWriter
+from poker_game import PokerGame
+from snapshot import SnapshotStore
+from state_sync import StateSync
+from state_view import StateView
+
+MAX_PLAYERS = 6
+DEFAULT_TABLE_ID = 'main'
+ROOM_PREFIX = 'table:'
+
+# Live tables shuffle from the operating system's CSPRNG
+SHUFFLE_RNG = secrets.SystemRandom()
+
+
+class Table:
+    """One poker table: its game plus the sockets seated at it"""
+
+    def __init__(self, table_id: str, max_players: int = MAX_PLAYERS,
+                 hand_log: Optional[HandLogWriter] = None, snapshots: Optional[SnapshotStore] = None):
+        self.table_id = table_id
+        self.max_players = max_players
+        self.hand_log = hand_log
+        self.snapshots = snapshots
+        self.game: Optional[PokerGame] = None
+        self.players: Dict[str, str] = {}  # sid -> player name
+        self.sids: Dict[str, str] = {}  # player name -> sid
+        self.bots: Dict[str, Bot] = {}  # player name -> bot, for seats played by the server
+        self.sync = StateSync()
+        self.view = StateView()
+
+    @property
+    def room(self) -> str:
+        """Socket.IO room that every client at this table joins"""
+        return ROOM_PREFIX + self.table_id
+
+    def is_full(self) -> bool:
+        seats = len(self.game.players) if self.game else len(self.players)
+        return seats >= self.max_players
+
+    def is_unclaimed(self, name: str) -> bool:
+        """Whether `name` holds a restored seat that no socket has claimed yet"""
+        return (self.game is not None and name not in self.sids and name not in self.bots and
+                self.game.seat_of(name) is not None)
+
+    def attach(self, game: PokerGame):
+        """Make `game` this table's game and start recording it"""
+        self.game = game
+        game.deck.rng = SHUFFLE_RNG
+        if self.hand_log:
+            self.hand_log.attach(game, self.table_id)
+        if self.snapshots:
+            self.snapshots.attach(game, self.table_id)
+
+    def seat(self, sid: str, name: str):
+        """Seat a new player (or reclaim a restored seat), creating the game for the first one"""
+        reclaim = self.is_unclaimed(name)
+        self.players[sid] = name
+        self.sids[name] = sid
+        if reclaim:
+            return
+        try:
+            if not self.game:
+                self.attach(PokerGame([Player(name)]))
+            else:
+                self.game.add_player(Player(name))
+                if self.snapshots:
+                    self.snapshots.save(self.table_id, self.game)
+        except Exception:
+            # e.g. the snapshot could not be written: leave no half-seated player behind
+            del self.players[sid]
+            del self.sids[name]
+            if self.game and self.game.seat_of(name) is not None:
+                self.game.remove_player(name)
+            if self.game and not self.game.players:
+                self.game = None
+            raise
+
+    def seat_bot(self, name: str, bot: Bot):
+        """Seat a bot in the game a human player created"""
+        self.bots[name] = bot
+        self.game.add_player(Player(name))
+        if self.snapshots:
+            self.snapshots.save(self.table_id, self.game)
+
+    def unseat(self, sid: str) -> Optional[str]:
+        """Remove a player's seat and return their name; bots are not left playing alone"""
+        name = self.players.pop(sid, None)
+        if name is not None:
+            self.sids.pop(name, None)
+        if name is not None and self.game:
+            self.game.remove_player(name)
+            if len(self.game.players) < 2 or all(player.name in self.bots for player in self.game.players):
+                self.game = None
+                self.bots.clear()
+                if self.snapshots:
+                    self.snapshots.discard(self.table_id)
+            elif self.snapshots:
+                self.snapshots.save(self.table_id, self.game)
+        return name
+
+    def seat_of(self, sid: str) -> Optional[int]:
+        """Seat index of the socket's player in the current game"""
+        name = self.players.get(sid)
+        if name is None or not self.game:
+            return None
+        return self.game.seat_of(name)
+
+    def sid_for(self, name: str) -> Optional[str]:
+        """Socket id of the named player"""
+        return self.sids.get(name)
+
+    def lobby(self) -> List[Dict]:
+        ready = self.game is not None and self.game.is_hand_in_progress
+        return ([{'name': name, 'ready': ready} for name in self.players.values()] +
+                [{'name': name, 'ready': ready, 'bot': True} for name in self.bots])
+
+
+class TableManager:
+    """Registry of every table hosted by this process, keyed by table id"""
+
+    def __init__(self, max_players: int = MAX_PLAYERS, hand_log: Optional[HandLogWriter] = None,
+                 snapshots: Optional[SnapshotStore] = None):
+        self.max_players = max_players
+        self.hand_log = hand_log
+        self.snapshots = snapshots
+        self.tables: Dict[str, Table] = {}
+        self.sid_tables: Dict[str, str] = {}  # sid -> table id
+
+    def get(self, table_id: str) -> Optional[Table]:
+        return self.tables.get(table_id)
+
+    def get_or_create(self, table_id: str) -> Table:
+        table = self.tables.get(table_id)
+        if table is None:
+            table = self.tables[table_id] = Table(table_id, self.max_players, self.hand_log, self.snapshots)
+        return table
+
+    def restore(self, owns: Callable[[str], bool] = lambda table_id: True) -> List[Table]:
+        """
+        Recreate every table saved in the snapshot store (that `owns` accepts).
+        Their seats wait for players to rejoin under the same name.
+        """
+        restored = []
+        for table_id in self.snapshots.table_ids() if self.snapshots else []:
+            if not owns(table_id):
+                continue
+            try:
+                game = self.snapshots.load(table_id)
+            except ValueError:
+                game = None  # written by an incompatible version
+            if game is None or table_id in self.tables:
+                continue
+            table = self.get_or_create(table_id)
+            table.attach(game)
+            restored.append(table)
+        return restored
+
+    def table_for(self, sid: str) -> Optional[Table]:
+        """Table the socket is seated at, if any"""
+        table_id = self.sid_tables.get(sid)
+        return self.tables.get(table_id) if table_id is not None else None
+
+    def join(self, sid: str, table_id: str, name: str) -> Table:
+        table = self.get_or_create(table_id)
+        try:
+            table.seat(sid, name)
+        except Exception:
+            if not table.players and table.game is None:
+                del self.tables[table_id]
+            raise
+        self.sid_tables[sid] = table_id
+        return table
+
+    def leave(self, sid: str) -> Optional[Table]:
+        """Unseat the socket and return its table; tables left without a game are dropped"""
+        table = self.table_for(sid)
+        if table is None:
+            return None
+        del self.sid_tables[sid]
+        table.unseat(sid)
+        if not table.players and table.game is None:
+            del self.tables[table.table_id]
+        return table
+
+    def release(self, table_id: str) -> Dict[str, str]:
+        """
+        Save a table and stop hosting it, so another process can adopt it;
+        returns its seated sockets (sid -> name)
+        """
+        table = self.tables.pop(table_id, None)
+        if table is None:
+            return {}
+        for sid in table.players:
+            self.sid_tables.pop(sid, None)
+        if self.snapshots and table.game:
+            self.snapshots.save(table_id, table.game)
+            self.snapshots.release(table_id)
+        return dict(table.players)
+
+    def adopt(self, table_id: str, players: Dict[str, str], bots: Optional[Dict[str, Bot]] = None) -> Table:
+        """Host a table released by another process, with its seated sockets and bots"""
+        table = self.get_or_create(table_id)
+        game = self.snapshots.load(table_id) if self.snapshots else None
+        if game is not None:
+            table.attach(game)
+            table.bots.update(bots or {})
+        for sid, name in players.items():
+            table.players[sid] = name
+            table.sids[name] = sid
+            self.sid_tables[sid] = table_id
+        return table
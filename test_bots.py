@@ -0,0 +1,14 @@
+from card import Card
+from bots import DRAW, NOTHING, postflop_bucket
+
+
+def cards(text):
+    return [Card.from_str(token) for token in text.split()]
+
+
+def test_straight_draws_count_a_hole_ace_low_and_high():
+    assert postflop_bucket(cards('Ah 9c'), cards('2d 3s 4c')) == DRAW  # A-2-3-4, wheel draw
+    assert postflop_bucket(cards('Ah 9c'), cards('Kd Qs Jc')) == DRAW  # A-K-Q-J
+    assert postflop_bucket(cards('Ah 9c'), cards('Kd Qs 2c')) == NOTHING
+    # Four to a straight on the board alone is not the hand's own draw
+    assert postflop_bucket(cards('Kh 9c'), cards('Ad 2s 3c 4d')) == NOTHING
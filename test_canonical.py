@@ -0,0 +1,37 @@
+import random
+from itertools import combinations
+from canonical import SUIT_PERMUTATIONS, canonical_hand_key, canonical_key, canonicalize, permute_suits
+from card import Card
+from preflop import hand_class
+
+
+def ids(text):
+    return [int(Card.from_str(token)) for token in text.split()]
+
+
+def test_keys_and_canonical_forms_ignore_suit_relabelling():
+    rng = random.Random(4)
+    for _ in range(300):
+        cards = rng.sample(range(52), rng.choice((5, 6, 7)))
+        hole, board = cards[:2], cards[2:]
+        key, form, hand_key = canonical_key(hole, board), canonicalize(hole, board), canonical_hand_key(cards)
+        for permutation in SUIT_PERMUTATIONS:
+            new_hole = [permute_suits(card, permutation) for card in hole]
+            new_board = [permute_suits(card, permutation) for card in board]
+            assert canonical_key(new_hole, new_board) == key
+            assert canonicalize(new_hole, new_board) == form
+            assert canonical_hand_key(new_hole + new_board) == hand_key
+        assert tuple(signature[0] for signature in canonical_key(cards)) == hand_key
+
+
+def test_keys_tell_apart_hands_that_are_not_relabellings():
+    # Two-card hands fall into exactly the 169 starting-hand classes
+    keys = {}
+    for hole in combinations(range(52), 2):
+        keys.setdefault(canonical_key(hole), set()).add(hand_class(*hole))
+    assert len(keys) == 169 and all(len(classes) == 1 for classes in keys.values())
+
+    # Suitedness and which cards are hole cards both matter
+    board = ids('2h 3h 4h')
+    assert canonical_key(ids('Ah Kh'), board) != canonical_key(ids('Ah Kd'), board)
+    assert canonical_key(ids('Ah Kh'), board) != canonical_key(ids('2h 3h'), ids('Ah Kh 4h'))
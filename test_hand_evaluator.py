@@ -0,0 +1,98 @@
+from collections import Counter
+from itertools import combinations
+import random
+import numpy as np
+from hand_evaluator import HandEvaluator
+
+
+def reference_rank(cards):
+    """
+    Straightforward ranking of exactly five card ids as a comparable tuple:
+    category (0 high card to 8 straight flush), then values by group size
+    """
+    values = sorted((card // 4 + 2 for card in cards), reverse=True)
+    flush = len({card % 4 for card in cards}) == 1
+    counts = Counter(values)
+    ordered = sorted(counts, key=lambda value: (counts[value], value), reverse=True)
+    shape = sorted(counts.values(), reverse=True)
+    straight_high = None
+    if len(counts) == 5:
+        if values[0] - values[4] == 4:
+            straight_high = values[0]
+        elif values == [14, 5, 4, 3, 2]:
+            straight_high = 5
+    if straight_high and flush:
+        return (8, straight_high)
+    if shape == [4, 1]:
+        return (7, *ordered)
+    if shape == [3, 2]:
+        return (6, *ordered)
+    if flush:
+        return (5, *values)
+    if straight_high:
+        return (4, straight_high)
+    if shape == [3, 1, 1]:
+        return (3, *ordered)
+    if shape == [2, 2, 1]:
+        return (2, *ordered)
+    if shape == [2, 1, 1, 1]:
+        return (1, *ordered)
+    return (0, *values)
+
+
+def reference_best(cards):
+    """Best reference rank among every five-card subset (21 for seven cards)"""
+    return max(reference_rank(five) for five in combinations(cards, 5))
+
+
+def _all_five_card_hands():
+    flat = np.fromiter((card for hand in combinations(range(52), 5) for card in hand), dtype=np.intp)
+    return flat.reshape(-1, 5)
+
+
+def _strength_by_reference():
+    """Evaluate every five-card hand and map each reference rank to its strength"""
+    hands = _all_five_card_hands()
+    assert len(hands) == 2598960
+    strengths = HandEvaluator.evaluate_batch(hands[:, :2], hands[:, 2:])
+
+    # A five-card hand's rank only depends on its sorted values and whether it is a flush
+    values = np.sort(hands // 4, axis=1)
+    flush = (hands % 4 == hands[:, :1] % 4).all(axis=1)
+    keys = (values * 13 ** np.arange(5)).sum(axis=1) * 2 + flush
+    unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    # Hands of one class must all get the same strength
+    assert (strengths == strengths[first][inverse]).all()
+    ranks = [reference_rank(hands[i].tolist()) for i in first]
+    return dict(zip(ranks, strengths[first].tolist()))
+
+
+STRENGTHS = _strength_by_reference()
+
+
+def test_every_five_card_hand_orders_like_the_reference():
+    assert len(STRENGTHS) == 7462  # distinct five-card hand values
+    by_reference = [STRENGTHS[rank] for rank in sorted(STRENGTHS)]
+    assert by_reference == sorted(by_reference)
+    assert len(set(by_reference)) == len(by_reference)
+
+
+def test_random_seven_card_hands_match_best_of_21():
+    rng = random.Random(1)
+    hands = [rng.sample(range(52), 7) for _ in range(20000)]
+    expected = [STRENGTHS[reference_best(hand)] for hand in hands]
+
+    cards = np.array(hands, dtype=np.intp)
+    assert HandEvaluator.evaluate_batch(cards[:, :2], cards[:, 2:]).tolist() == expected
+    assert [HandEvaluator.hand_strength(hand) for hand in hands] == expected
+    for hand, strength in zip(hands[:2000], expected):
+        assert HandEvaluator.evaluate_hand_cached(hand[:2], hand[2:]) == HandEvaluator.decode_strength(strength)
+
+
+def test_six_card_hands_match_best_of_6():
+    rng = random.Random(2)
+    hands = [rng.sample(range(52), 6) for _ in range(5000)]
+    cards = np.array(hands, dtype=np.intp)
+    expected = [STRENGTHS[reference_best(hand)] for hand in hands]
+    assert HandEvaluator.evaluate_batch(cards[:, :2], cards[:, 2:]).tolist() == expected
@@ -0,0 +1,27 @@
+import io
+from hand_history import HandHistoryWriter, analyze_lines
+from player import Player
+from poker_game import PokerGame
+
+
+def test_busted_seats_sit_out_and_short_blinds_post_what_they_have():
+    game = PokerGame([Player('busted', 0), Player('short', 3), Player('a', 100), Player('b', 100)])
+    stream = io.StringIO()
+    HandHistoryWriter(stream, 'main').attach(game)
+    game.start_hand()
+    assert game.process_action(3, 'fold')
+    assert game.is_betting_round_complete()  # the small blind is all-in
+    game.deal_community_cards(5)
+    game.pay_out()
+    game.end_hand()
+
+    lines = stream.getvalue().splitlines()
+    assert 'Seat 1: busted ($0 in chips) is sitting out' in lines
+    assert 'Seat 4: b ($100 in chips) [BTN]' in lines
+    assert 'short: posts small blind $3' in lines
+    assert 'a: posts big blind $10' in lines
+    assert not any(line.startswith('Dealt to busted') or line.startswith('busted: net') for line in lines)
+
+    stats = analyze_lines(stream.getvalue().splitlines(True))
+    assert sorted(stats) == ['a', 'b', 'short']
+    assert sum(player.net_big_blinds for player in stats.values()) == 0
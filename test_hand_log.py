@@ -0,0 +1,44 @@
+from bots import RandomBot
+from hand_log import FRAME, EVENTS, HandLogWriter, decode_payload, encode_record, log_files, read_records, replay
+from simulator import HandSimulator
+
+
+def test_every_record_decodes_to_what_was_encoded():
+    simulator = HandSimulator([RandomBot(seed=seat) for seat in range(3)], seed=1)
+    events = []
+    simulator.game.add_listener(lambda _game, event, details: events.append((event, dict(details))))
+    for _ in range(20):
+        simulator.play_hand()
+
+    assert {event for event, _ in events} == set(EVENTS)
+    for event, details in events:
+        record = encode_record(7, event, details, 'main')
+        length, code, game_id = FRAME.unpack_from(record)
+        assert (length + 2, code, game_id) == (len(record), EVENTS[event], 7)
+        decoded = decode_payload(code, record[FRAME.size:])
+        if event == 'start_hand':
+            details = dict(details, table_id='main', deck=[int(card) for card in details['deck']])
+        elif event == 'action' and details['action'] != 'raise':
+            details = dict(details, amount=0)
+        assert decoded == details
+
+
+def test_replaying_the_log_rebuilds_every_table(tmp_path):
+    writer = HandLogWriter(str(tmp_path), max_file_size=2048)
+    simulators = [HandSimulator([RandomBot(seed=seat) for seat in range(seats)], seed=seats)
+                  for seats in (2, 6)]
+    game_ids = [writer.attach(simulator.game, f'table {i}') for i, simulator in enumerate(simulators)]
+    for _ in range(30):
+        for simulator in simulators:
+            simulator.play_hand()
+    writer.close()
+
+    paths = log_files(str(tmp_path))
+    assert len(paths) > 1  # the log rotated, and files are read in order
+    replayer = replay(read_records(paths))
+    for game_id, simulator in zip(game_ids, simulators):
+        game = replayer.games[game_id]
+        assert [(p.name, p.chips) for p in game.players] == [(p.name, p.chips) for p in simulator.game.players]
+        assert game.community_cards == simulator.game.community_cards
+        assert game.dealer_position == simulator.game.dealer_position
+    assert sorted(replayer.table_ids.values()) == ['table 0', 'table 1']
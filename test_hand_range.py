@@ -0,0 +1,58 @@
+from card import CARDS, Card
+from hand_range import HandRange, range_equity
+from preflop import COMBO_CARDS
+
+
+def cards(text):
+    return [Card.from_str(token) for token in text.split()]
+
+
+def combos(hand_range):
+    """Weight of every combo in the range, keyed like 'AhKh' (higher card first)"""
+    return {''.join(CARDS[card].to_str() for card in sorted(COMBO_CARDS[i], reverse=True)): float(weight)
+            for i, weight in enumerate(hand_range.weights) if weight}
+
+
+def test_plus_extends_pairs_up_and_kickers_up_to_the_top_card():
+    assert len(HandRange.parse('QQ+')) == 3 * 6
+    assert len(HandRange.parse('A2s+')) == 12 * 4
+    assert len(HandRange.parse('KTo+')) == 3 * 12
+    assert len(HandRange.parse('AK')) == 16
+
+
+def test_dashes_run_pairs_kickers_and_connectors():
+    assert len(HandRange.parse('TT-77')) == 4 * 6
+    assert len(HandRange.parse('KTs-K7s')) == 4 * 4
+    connectors = HandRange.parse('76s-54s')
+    assert len(connectors) == 3 * 4
+    assert {hand[::2] for hand in combos(connectors)} == {'76', '65', '54'}
+    for bad in ('AKs-T8s', 'AKs-AQo', 'QQ+-99', 'QQs'):
+        try:
+            HandRange.parse(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{bad!r} parsed')
+
+
+def test_weights_apply_per_entry_and_later_entries_override():
+    hand_range = HandRange.parse('AA, AKs 50%, AQo:0.25, AxKx 30%, AhKh')
+    weights = combos(hand_range)
+    assert len(weights) == 6 + 16 + 12
+    assert weights['AcAd'] == 1
+    assert round(weights['AsKs'], 6) == round(weights['AsKd'], 6) == 0.3
+    assert weights['AhKh'] == 1
+    assert weights['AsQd'] == 0.25
+    try:
+        HandRange.parse('AA 150%')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('a weight over 100% parsed')
+
+
+def test_exact_river_counts_matchups_not_weight():
+    hero, villain = HandRange.parse('AhAd, KhKd 50%'), HandRange.parse('QhQd, JhJd')
+    result = range_equity(hero, villain, cards('2c 7s 9h 3d 4c'))
+    assert result.samples == 4
+    assert result.equity == [1.0, 0.0]
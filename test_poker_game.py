@@ -0,0 +1,143 @@
+from card import Card
+from player import Player
+from poker_game import PokerGame
+
+
+def cards(text):
+    return [Card.from_str(token) for token in text.split()]
+
+
+def check_down(game):
+    """Call or check every remaining decision through the river"""
+    while True:
+        while not game.is_betting_round_complete():
+            seat = game.current_player_index
+            assert game.process_action(seat, 'call' if game.amount_to_call(seat) else 'check')
+        if len(game.community_cards) == 5:
+            return
+        game.deal_community_cards(3 if not game.community_cards else 1)
+
+
+def test_busted_player_sits_out_and_the_pot_is_contested():
+    game = PokerGame([Player('busted', 0), Player('a', 100), Player('b', 100)])
+    game.start_hand()
+    assert game.players[0].folded and not game.players[0].hand
+    assert game.contributions == [0, 5, 10]
+    assert game.current_player_index == 1  # heads-up: the small blind acts first
+
+    check_down(game)
+    game.players[1].hand, game.players[2].hand = cards('Ah Ad'), cards('Kh Kd')
+    game.community_cards = cards('2c 7d 9h Js 3c')
+    payouts = game.pay_out()
+
+    assert len(payouts) == 1
+    amount, winners, strength = payouts[0]
+    assert amount == 20 and [p.name for p in winners] == ['a'] and strength is not None
+    assert [p.chips for p in game.players] == [0, 110, 90]
+
+
+def test_big_blind_acts_first_after_the_flop_when_a_bust_leaves_two_players():
+    game = PokerGame([Player('busted', 0), Player('a', 100), Player('b', 100)])
+    game.start_hand()
+    assert game.current_player_index == 1  # the button posts the small blind and acts first
+    assert game.process_action(1, 'call')
+    assert game.process_action(2, 'check')
+    assert game.is_betting_round_complete()
+
+    game.deal_community_cards(3)
+    assert game.current_player_index == game.first_actor_index == 2
+    assert game.process_action(2, 'check')
+    assert game.process_action(1, 'check')
+    assert game.is_betting_round_complete()
+
+
+def test_start_hand_needs_two_players_with_chips():
+    game = PokerGame([Player('a', 0), Player('b', 100)])
+    try:
+        game.start_hand()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('a hand started with one player holding chips')
+
+
+def test_multiway_side_pots_are_split_by_all_in_level():
+    game = PokerGame([Player('short', 50), Player('middle', 100), Player('tall', 200), Player('twin', 200)])
+    game.start_hand()  # dealer 0, blinds 1 and 2, seat 3 first to act
+    assert game.process_action(3, 'raise', 200)
+    for seat in (0, 1, 2):
+        assert game.process_action(seat, 'call')
+    assert game.is_betting_round_complete()
+    assert game.contributions == [50, 100, 200, 200]
+
+    hands = ['As Ad', 'Ks Kd', 'Qs Qd', 'Qh Qc']
+    for player, hand in zip(game.players, hands):
+        player.hand = cards(hand)
+    game.community_cards = cards('2c 7d 9h Js 3c')
+    payouts = game.pay_out()
+
+    assert [(amount, [p.name for p in winners]) for amount, winners, _ in payouts] == [
+        (200, ['short']), (150, ['middle']), (200, ['tall', 'twin'])]
+    assert [p.chips for p in game.players] == [200, 150, 100, 100]
+    assert game.pot == 0
+
+
+def test_three_uneven_all_ins_and_a_folded_caller():
+    game = PokerGame([Player('short', 30), Player('middle', 80), Player('big', 150),
+                      Player('cover', 600), Player('folder', 500)])
+    game.start_hand()  # dealer 0, blinds 1 and 2, seat 3 first to act
+    assert game.process_action(3, 'raise', 200)
+    for seat in (4, 0, 1, 2):
+        assert game.process_action(seat, 'call')
+    assert [p.is_all_in for p in game.players] == [True, True, True, False, False]
+    assert game.is_betting_round_complete()
+    game.deal_community_cards(3)
+    assert game.process_action(3, 'raise', 100)
+    assert game.process_action(4, 'fold')
+    assert game.contributions == [30, 80, 150, 300, 200]
+
+    hands = ['As Ad', 'Ks Kd', 'Qs Qd', 'Qh Qc', 'Ah Ac']
+    for player, hand in zip(game.players, hands):
+        player.hand = cards(hand)
+    game.community_cards = cards('2c 7d 9h Js 3c')
+    payouts = game.pay_out()
+
+    # The folder's chips feed the pots up to their level but can't win any
+    assert [(amount, [p.name for p in winners]) for amount, winners, _ in payouts] == [
+        (150, ['short']), (200, ['middle']), (210, ['big', 'cover']), (200, ['cover'])]
+    assert [p.chips for p in game.players] == [150, 200, 105, 605, 300]
+    assert sum(p.chips for p in game.players) == 30 + 80 + 150 + 600 + 500
+
+
+def test_short_all_in_raise_does_not_reopen_the_betting():
+    game = PokerGame([Player('short', 55), Player('sb', 1000), Player('bb', 1000), Player('utg', 1000)])
+    game.start_hand()  # dealer 0, blinds 1 and 2, seat 3 first to act
+    assert game.process_action(3, 'raise', 30)
+    assert game.min_raise(0) == 60
+    assert not game.process_action(0, 'raise', 50)  # under the minimum and not all in
+    assert game.process_action(0, 'raise', 55)  # all in for less than a full raise
+    assert game.can_raise(1)  # has not acted yet
+    assert game.process_action(1, 'call')
+    assert game.process_action(2, 'call')
+    assert not game.can_raise(3)
+    assert not game.process_action(3, 'raise', 100)
+    assert game.process_action(3, 'call')
+    assert game.is_betting_round_complete()
+    assert game.contributions == [55, 55, 55, 55]
+
+
+def test_short_stack_can_bet_all_in_for_less_than_a_big_blind():
+    game = PokerGame([Player('a', 1000), Player('b', 1000), Player('short', 16)])
+    game.start_hand()  # dealer 0, blinds 1 and 2
+    assert game.process_action(0, 'call')
+    assert game.process_action(1, 'call')
+    assert game.process_action(2, 'check')
+    game.deal_community_cards(3)
+    assert game.process_action(1, 'check')
+    assert game.process_action(2, 'raise', 6)
+    assert game.can_raise(0) and not game.can_raise(1)
+    assert game.process_action(0, 'call')
+    assert not game.process_action(1, 'raise', 30)
+    assert game.process_action(1, 'call')
+    assert game.is_betting_round_complete()
+    assert game.contributions == [16, 16, 16]
@@ -0,0 +1,46 @@
+from card import Card
+import preflop
+from preflop import COMBO_CARDS, PreflopTable, build_preflop_tables, class_index, class_name, hand_class
+
+
+def cards(text):
+    return [Card.from_str(token) for token in text.split()]
+
+
+def test_class_names_and_indexes_invert_each_other():
+    assert [class_index(class_name(i)) for i in range(169)] == list(range(169))
+    assert class_name(hand_class(*cards('As Ks'))) == 'AKs'
+    assert class_name(hand_class(*cards('Kd Ah'))) == 'AKo'
+    assert class_name(hand_class(*cards('7c 7h'))) == '77'
+    assert len({hand_class(a, b) for a, b in COMBO_CARDS}) == 169
+
+
+def test_built_table_expands_each_representative_to_every_suit_relabelling(tmp_path, monkeypatch):
+    # A made-up equity that depends only on the hand classes, so it must come
+    # back the same for every relabelling and mirror for the reversed matchup
+    def fake_equity(hero, villain):
+        return 0.5 + (hand_class(*COMBO_CARDS[hero]) - hand_class(*COMBO_CARDS[villain])) / 1000
+
+    simulated = []
+
+    def simulate(matchups, samples, seeds):
+        simulated.extend(matchups)
+        return [fake_equity(hero, villain) for hero, villain in matchups]
+
+    monkeypatch.setattr(preflop, '_simulate_matchups', simulate)
+    table = PreflopTable(build_preflop_tables(str(tmp_path / 'preflop.bin'), samples=7, workers=1))
+    assert len(simulated) == 47008  # heads-up preflop matchups up to suit relabelling
+    assert table.samples == 7
+
+    for hero, villain in [('As Ks', 'Qd Qh'), ('Ah Kh', 'Qs Qc'), ('Qd Qh', 'As Ks'), ('7c 2d', 'Ts 9s')]:
+        hero, villain = cards(hero), cards(villain)
+        expected = 0.5 + (hand_class(*hero) - hand_class(*villain)) / 1000
+        assert abs(table.equity(hero, villain) - expected) < 1e-4
+        assert abs(table.hand_class_equity(hero, villain) - expected) < 1e-4
+    assert abs(table.class_equity('AKs', 'QQ') + table.class_equity('QQ', 'AKs') - 1) < 1e-4
+    try:
+        table.equity(cards('As Ks'), cards('As Qd'))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('hands sharing a card got an equity')
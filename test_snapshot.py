@@ -0,0 +1,55 @@
+from bots import CallingStation, RandomBot
+from player import Player
+from poker_game import PokerGame
+from snapshot import SnapshotStore, decode_game, encode_game
+
+
+def game_state(game):
+    """Everything a snapshot has to keep, in comparable form"""
+    return (
+        [(p.name, p.chips, p.bet, p.folded, p.is_all_in, p.hand) for p in game.players],
+        game.community_cards, game.deck.cards, game.pot, game.contributions, game.dead_money,
+        game.small_blind, game.big_blind, game.minimum_bet, game.highest_bet_in_round, game.version,
+        game.actions_taken, game.current_player_index, game.first_actor_index,
+        game.last_aggressive_actor_index, game.dealer_position, game.current_betting_round,
+        game.is_hand_in_progress, game.acting_mask, game.matched_mask, game.acted_mask,
+    )
+
+
+def mid_hand_game():
+    game = PokerGame([Player('a', 1000), Player('b', 40), Player('c', 1000), Player('d', 1000)])
+    game.dealer_position = 1
+    game.start_hand()
+    bot = RandomBot(seed=5)
+    for _ in range(3):
+        seat = game.current_player_index
+        action, amount = bot.decide(game, seat)
+        if not game.process_action(seat, action, amount):
+            game.process_action(seat, 'call')
+    return game
+
+
+def test_encode_then_decode_gives_back_the_game():
+    game = mid_hand_game()
+    restored, generation = decode_game(encode_game(game, 9))
+    assert generation == 9
+    assert game_state(restored) == game_state(game)
+
+
+def test_snapshot_and_journal_restore_the_game_mid_hand(tmp_path):
+    game = mid_hand_game()
+    store = SnapshotStore(str(tmp_path))
+    store.attach(game, 'table/1')  # snapshot now, journal from here on
+
+    bot = CallingStation()
+    while not game.is_betting_round_complete():
+        seat = game.current_player_index
+        assert game.process_action(seat, *bot.decide(game, seat))
+    game.deal_community_cards(3)
+    seat = game.current_player_index
+    assert game.process_action(seat, *bot.decide(game, seat))
+    store.close()
+
+    restored = SnapshotStore(str(tmp_path)).load('table/1')
+    assert game_state(restored) == game_state(game)
+    assert SnapshotStore(str(tmp_path)).table_ids() == ['table/1']
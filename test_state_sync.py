@@ -0,0 +1,40 @@
+import copy
+import json
+from bots import RandomBot
+from simulator import HandSimulator
+from state_sync import StateSync, apply_patch, diff
+from state_view import public_state
+
+
+def test_diff_then_apply_patch_gives_back_the_new_state():
+    old = {'pot': 0, 'board': [1, 2], 'players': [{'chips': 10, 'hand': [None, None]}, {'chips': 5}],
+           'gone': True, 'nested': {'a': {'b': 1}}, 'shrinks': [1, 2, 3]}
+    new = {'pot': 15, 'board': [1, 2, 3, 4], 'players': [{'chips': 0, 'hand': []}, {'chips': 5, 'bet': 5}],
+           'nested': {'a': {'b': 2, 'c': [3]}}, 'shrinks': [1], 'added': None}
+    patch = diff(old, new)
+    # Patches travel as JSON, so apply one that has been through it
+    assert apply_patch(copy.deepcopy(old), json.loads(json.dumps(patch))) == new
+    assert diff(new, copy.deepcopy(new)) is None
+
+
+def test_patches_keep_a_client_in_step_through_whole_hands():
+    simulator = HandSimulator([RandomBot(seed=seat) for seat in range(4)], seed=3)
+    sync = StateSync()
+    client = {}
+
+    def publish(game, _event, _details):
+        state = public_state(game)
+        seq = sync.seq
+        message = sync.publish(state)
+        if message is None:
+            client.update(json.loads(json.dumps(sync.snapshot())))
+        elif message['changes']:
+            assert message['seq'] == seq + 1 == client['seq'] + 1
+            apply_patch(client, json.loads(json.dumps(message['changes'])))
+            client['seq'] = message['seq']
+        assert client == sync.snapshot()
+
+    simulator.game.add_listener(publish)
+    for _ in range(50):
+        simulator.play_hand()
+    assert sync.seq > 50
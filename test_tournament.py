@@ -0,0 +1,62 @@
+from tournament import Tournament
+
+
+def test_busting_a_player_before_the_button_keeps_the_button():
+    tournament = Tournament([f'p{i}' for i in range(5)], seed=0)
+    game = tournament.games[0]
+    game.dealer_position = 3
+    button = game.players[3].name
+    assert tournament.next_hand(0)
+
+    busted = game.players[1]
+    game.players[0].chips += busted.chips
+    busted.chips = 0
+    tournament.hand_finished(0)
+
+    assert busted not in game.players
+    assert game.players[game.dealer_position].name == button
+
+
+def test_a_whole_tournament_conserves_chips_and_keeps_tables_balanced():
+    from bots import RandomBot
+    from simulator import SimulationResult, play_hand
+
+    entrants, starting_chips = 40, 1000
+    tournament = Tournament([f'p{i}' for i in range(entrants)], starting_chips, table_size=6, seed=1)
+    bot = RandomBot(fold=0.3, raise_=0.2, seed=1)
+    result = SimulationResult(0)
+    assert sorted(len(game.players) for game in tournament.games.values()) == [5] * 2 + [6] * 5
+
+    ready = tournament.start()
+    queue = []
+    moved = set()
+    while True:
+        for table_id in ready:
+            if tournament.next_hand(table_id):
+                play_hand(tournament.games[table_id], bot.decide, result)
+                queue.append(table_id)
+        if not queue:
+            break
+        table_id = queue.pop(0)
+        tables_before = dict(tournament.table_of)
+        ready = tournament.hand_finished(table_id)
+        moved |= {name for name, table in tournament.table_of.items() if tables_before[name] != table}
+
+        seated = [player for table, game in tournament.games.items()
+                  for player in game.players + tournament.arrivals[table]]
+        assert sum(p.chips for p in seated) == entrants * starting_chips
+        if tournament.is_finished:
+            break
+        # Players busted in a hand-for-hand round keep a zero stack until the round is placed
+        assert sorted(p.name for p in seated) == sorted(name for name, chips in tournament.chips.chips.items() if chips)
+        if table_id in tournament.games:
+            sizes = tournament.sizes.sizes
+            assert sizes[table_id] - min(sizes.values()) <= 1
+
+    assert result.invalid_actions == result.stalled_hands == result.chip_errors == 0
+    assert tournament.is_finished and len(tournament.games) == 1
+    assert len(moved) > 10  # tables were balanced and broken along the way
+    places = tournament.results()
+    assert [place for place, _ in places] == list(range(1, entrants + 1))
+    [game] = tournament.games.values()
+    assert [(p.name, p.chips) for p in game.players] == [(places[0][1], entrants * starting_chips)]
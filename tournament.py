@@ -0,0 +1,396 @@
+"""
+Multi-table tournament director.
+
+The director seats every entrant across PokerGame tables, raises the blinds
+on a clock, eliminates busted players, breaks and balances tables, and plays
+hand-for-hand on the bubble. It does not play hands itself: whoever runs the
+tables asks next_hand(table) before each hand and starts it only if that
+returns True, calls hand_finished(table) after end_hand, and then tries the
+tables hand_finished says are ready.
+
+Everything is updated per finished hand from that table alone. Table sizes
+sit in buckets by player count (SizeIndex) and stacks in one sorted list
+(ChipIndex), so finding the shortest or longest table, or a player's rank,
+never scans all the tables.
+"""
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from bisect import bisect_left, bisect_right, insort
+import heapq
+import random
+import sys
+import time
+from card import Deck
+from player import Player
+from poker_game import PokerGame
+
+DEFAULT_TABLE_SIZE = 9
+
+
+class BlindLevel:
+    def __init__(self, small_blind: int, big_blind: int, minutes: float):
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.minutes = minutes
+
+    def __repr__(self):
+        return f"BlindLevel({self.small_blind}, {self.big_blind}, {self.minutes})"
+
+
+def standard_schedule(levels: int = 20, minutes: float = 15, big_blind: int = 100) -> List[BlindLevel]:
+    """Levels growing by about half each time, rounded to tidy amounts"""
+    schedule = []
+    for _ in range(levels):
+        schedule.append(BlindLevel(big_blind // 2, big_blind, minutes))
+        step = 10 ** max(len(str(big_blind)) - 2, 0) * 5
+        big_blind = max(step, int(big_blind * 1.5) // step * step)
+    return schedule
+
+
+class BlindSchedule:
+    """Blind levels on a clock; the last level lasts forever"""
+
+    def __init__(self, levels: Sequence[BlindLevel], clock=time.monotonic):
+        if not levels:
+            raise ValueError("A schedule needs at least one level")
+        self.levels = list(levels)
+        self.clock = clock
+        self.started_at: Optional[float] = None
+        # Seconds after the start at which each level ends
+        self.ends = []
+        elapsed = 0.0
+        for level in self.levels:
+            elapsed += level.minutes * 60
+            self.ends.append(elapsed)
+
+    def start(self):
+        self.started_at = self.clock()
+
+    def level_index(self) -> int:
+        if self.started_at is None:
+            return 0
+        return min(bisect_right(self.ends, self.clock() - self.started_at), len(self.levels) - 1)
+
+    def current(self) -> BlindLevel:
+        return self.levels[self.level_index()]
+
+    def seconds_left(self) -> Optional[float]:
+        """Time until the blinds go up; None on the last level"""
+        index = self.level_index()
+        if index == len(self.levels) - 1:
+            return None
+        return self.ends[index] - (self.clock() - self.started_at if self.started_at is not None else 0.0)
+
+
+class SizeIndex:
+    """Tables bucketed by player count, for the shortest and longest table without a scan"""
+
+    def __init__(self, capacity: int):
+        self.buckets: List[Set[int]] = [set() for _ in range(capacity + 1)]
+        self.sizes: Dict[int, int] = {}
+
+    def set(self, table_id: int, size: int):
+        old = self.sizes.get(table_id)
+        if old is not None:
+            self.buckets[old].discard(table_id)
+        self.buckets[size].add(table_id)
+        self.sizes[table_id] = size
+
+    def remove(self, table_id: int):
+        self.buckets[self.sizes.pop(table_id)].discard(table_id)
+
+    def shortest(self, exclude: Optional[int] = None) -> Optional[int]:
+        for bucket in self.buckets:
+            for table_id in bucket:
+                if table_id != exclude:
+                    return table_id
+        return None
+
+    def longest(self) -> Optional[int]:
+        for bucket in reversed(self.buckets):
+            for table_id in bucket:
+                return table_id
+        return None
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+
+class ChipIndex:
+    """Stacks of the players still in, kept sorted for standings"""
+
+    def __init__(self):
+        self.order: List[Tuple[int, str]] = []  # (-chips, name), chip leader first
+        self.chips: Dict[str, int] = {}
+        self.total = 0
+
+    def update(self, name: str, chips: int):
+        old = self.chips.get(name)
+        if old == chips:
+            return
+        if old is not None:
+            self._discard(name, old)
+        self.chips[name] = chips
+        self.total += chips
+        insort(self.order, (-chips, name))
+
+    def remove(self, name: str):
+        old = self.chips.pop(name, None)
+        if old is not None:
+            self._discard(name, old)
+
+    def _discard(self, name: str, chips: int):
+        del self.order[bisect_left(self.order, (-chips, name))]
+        self.total -= chips
+
+    def rank(self, name: str) -> int:
+        """1 for the chip leader"""
+        return bisect_left(self.order, (-self.chips[name], name)) + 1
+
+    def leaders(self, count: int) -> List[Tuple[str, int]]:
+        return [(name, -chips) for chips, name in self.order[:count]]
+
+    def average(self) -> float:
+        return self.total / len(self.chips) if self.chips else 0.0
+
+    def __len__(self) -> int:
+        return len(self.chips)
+
+
+class Tournament:
+    """
+    Director for one multi-table tournament. Tables are PokerGame
+    instances keyed by number; players are Player objects moved between them.
+    """
+
+    def __init__(self, entrants: Sequence[str], starting_chips: int = 10000,
+                 schedule: Optional[BlindSchedule] = None, table_size: int = DEFAULT_TABLE_SIZE,
+                 paid_places: Optional[int] = None, seed: Optional[int] = None):
+        if len(entrants) < 2:
+            raise ValueError("A tournament needs at least two entrants")
+        if len(set(entrants)) != len(entrants):
+            raise ValueError("Entrant names must be unique")
+        self.schedule = schedule if schedule is not None else BlindSchedule(standard_schedule())
+        self.table_size = table_size
+        self.paid_places = paid_places if paid_places is not None else max(1, len(entrants) // 10)
+        self.rng = random.Random(seed)
+        self.games: Dict[int, PokerGame] = {}
+        self.sizes = SizeIndex(table_size)
+        self.chips = ChipIndex()
+        self.table_of: Dict[str, int] = {}
+        self.arrivals: Dict[int, List[Player]] = {}  # players moved to a table during its hand
+        self.in_hand: Set[int] = set()
+        self.places: Dict[str, int] = {}  # finishing place of every eliminated player
+        self.hand_for_hand = False
+        self.round_done: Set[int] = set()  # tables that played this hand-for-hand round
+        self.round_busts: List[Tuple[int, str]] = []  # (stack at the start of the hand, name)
+        self.stacks_at_start: Dict[int, Dict[str, int]] = {}
+
+        names = list(entrants)
+        self.rng.shuffle(names)
+        table_count = -(-len(names) // table_size)
+        level = self.schedule.current()
+        for table_id in range(table_count):
+            players = [Player(name, starting_chips) for name in names[table_id::table_count]]
+            game = PokerGame(players, level.small_blind, level.big_blind,
+                             Deck(random.Random(self.rng.random()), partial=True))
+            game.dealer_position = self.rng.randrange(len(players))
+            self.games[table_id] = game
+            self.arrivals[table_id] = []
+            self.sizes.set(table_id, len(players))
+            for player in players:
+                self.table_of[player.name] = table_id
+                self.chips.update(player.name, starting_chips)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.chips)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.remaining <= 1
+
+    def start(self) -> List[int]:
+        """Start the blind clock; returns the tables to deal first"""
+        self.schedule.start()
+        return sorted(self.games)
+
+    def next_hand(self, table_id: int) -> bool:
+        """
+        Prepare a table's next hand: seat players moved there and set the
+        current blinds. True if the caller should now start it with
+        game.start_hand(); False if the table must not deal (broken, short of
+        players, waiting for the hand-for-hand round, or the tournament is over).
+        """
+        game = self.games.get(table_id)
+        if game is None or table_id in self.in_hand or self.is_finished:
+            return False
+        if self.hand_for_hand and table_id in self.round_done:
+            return False
+        for player in self.arrivals[table_id]:
+            game.add_player(player)
+        self.arrivals[table_id] = []
+        if len(game.players) < 2:
+            return False
+        level = self.schedule.current()
+        game.small_blind, game.big_blind, game.minimum_bet = level.small_blind, level.big_blind, level.big_blind
+        self.stacks_at_start[table_id] = {p.name: p.chips for p in game.players}
+        self.in_hand.add(table_id)
+        return True
+
+    def hand_finished(self, table_id: int) -> List[int]:
+        """
+        Account for a table's finished hand (after end_hand): update stacks,
+        eliminate busted players, break or balance tables. Returns the
+        tables that can deal their next hand now.
+        """
+        game = self.games[table_id]
+        self.in_hand.discard(table_id)
+        stacks = self.stacks_at_start.pop(table_id, {})
+        busted = sorted(((stacks.get(p.name, 0), p.name) for p in game.players if p.chips == 0), reverse=True)
+        for player in game.players:
+            if player.chips:
+                self.chips.update(player.name, player.chips)
+        for _, name in busted:
+            self._unseat(table_id, name)
+            self.table_of.pop(name)
+        if self.hand_for_hand:
+            # Players busting in the same hand-for-hand round are placed together
+            self.round_busts.extend(busted)
+            for _, name in busted:
+                self.chips.update(name, 0)
+        else:
+            self._place(busted)
+        self._update_size(table_id)
+
+        ready = {table_id}
+        if len(self.games) > 1 and self.remaining <= (len(self.games) - 1) * self.table_size:
+            ready = self._break(table_id)
+        else:
+            ready |= self._balance(table_id)
+
+        if self.hand_for_hand:
+            self.round_done.add(table_id)
+            if self.in_hand:
+                return []
+            self._place(self.round_busts)
+            self.round_busts = []
+            ready = set(self.round_done) | ready
+            self.round_done = set()
+        self.hand_for_hand = self.paid_places < self.remaining <= self.paid_places + 1 and len(self.games) > 1
+        if self.is_finished:
+            self._place([(0, name) for name in list(self.chips.chips)])
+            return []
+        return sorted(t for t in ready if t in self.games and t not in self.in_hand)
+
+    def _place(self, busted: List[Tuple[int, str]]):
+        """Eliminate players; those who started the hand with more chips finish higher"""
+        for _, name in sorted(busted):
+            self.places[name] = self.remaining
+            self.chips.remove(name)
+
+    def _unseat(self, table_id: int, name: str) -> Player:
+        # remove_player keeps the button on the same player (or the next seat)
+        return self.games[table_id].remove_player(name)
+
+    def _update_size(self, table_id: int):
+        self.sizes.set(table_id, len(self.games[table_id].players) + len(self.arrivals[table_id]))
+
+    def _move(self, player: Player, to_table: int) -> Optional[int]:
+        """Seat a player at another table, now if it is between hands; returns it if so"""
+        self.table_of[player.name] = to_table
+        if to_table in self.in_hand:
+            self.arrivals[to_table].append(player)
+            self._update_size(to_table)
+            return None
+        self.games[to_table].add_player(player)
+        self._update_size(to_table)
+        return to_table
+
+    def _break(self, table_id: int) -> Set[int]:
+        """Close a table between hands, seating each of its players at the shortest table"""
+        game = self.games.pop(table_id)
+        self.sizes.remove(table_id)
+        players = game.players + self.arrivals.pop(table_id)
+        self.round_done.discard(table_id)
+        ready = set()
+        for player in players:
+            to_table = self._move(player, self.sizes.shortest())
+            if to_table is not None:
+                ready.add(to_table)
+        return ready
+
+    def _balance(self, table_id: int) -> Set[int]:
+        """
+        Move players from this table, which is between hands, while it has
+        two more than the shortest table. Short tables are topped up as the
+        long ones finish their hands.
+        """
+        ready = set()
+        game = self.games[table_id]
+        while True:
+            shortest = self.sizes.shortest(exclude=table_id)
+            if shortest is None or self.sizes.sizes[table_id] - self.sizes.sizes[shortest] <= 1:
+                return ready
+            # Move the player due the big blind next, as the rules usually ask
+            seat = (game.dealer_position + (1 if len(game.players) == 2 else 2)) % len(game.players)
+            player = self._unseat(table_id, game.players[seat].name)
+            self._update_size(table_id)
+            to_table = self._move(player, shortest)
+            if to_table is not None:
+                ready.add(to_table)
+
+    def standings(self, count: int = 10) -> List[Tuple[str, int]]:
+        return self.chips.leaders(count)
+
+    def results(self) -> List[Tuple[int, str]]:
+        """(place, name) of every finished player, winner first"""
+        return sorted((place, name) for name, place in self.places.items())
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def simulate(entrants: int, seed: int = 0, table_size: int = DEFAULT_TABLE_SIZE) -> Tuple[Tournament, float]:
+    """
+    Play a whole tournament between bots with every table dealing in
+    parallel on a simulated clock: each hand is played out as it starts and
+    reported finished one to three minutes later. Returns the tournament
+    and the wall-clock seconds it took.
+    """
+    from bots import RandomBot
+    from simulator import SimulationResult, play_hand
+
+    clock = SimulatedClock()
+    tournament = Tournament([f"Player {i + 1}" for i in range(entrants)], schedule=BlindSchedule(
+        standard_schedule(), clock), table_size=table_size, seed=seed)
+    bot = RandomBot(fold=0.3, raise_=0.15, seed=seed)
+    result = SimulationResult(0)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    pending = []  # (time the hand ends, table)
+
+    def deal(table_ids: List[int]):
+        for table_id in table_ids:
+            if tournament.next_hand(table_id):
+                play_hand(tournament.games[table_id], bot.decide, result)
+                heapq.heappush(pending, (clock.now + rng.uniform(60, 180), table_id))
+
+    deal(tournament.start())
+    while pending:
+        clock.now, table_id = heapq.heappop(pending)
+        deal(tournament.hand_finished(table_id))
+    if result.chip_errors or result.stalled_hands:
+        raise RuntimeError(f"Simulation went wrong: {result}")
+    return tournament, time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    finished, seconds = simulate(count)
+    print(f"{count} entrants, {len(finished.places)} placed in {seconds:.2f}s; "
+          f"winner {finished.results()[0][1]}")